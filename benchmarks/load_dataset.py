@@ -0,0 +1,118 @@
+"""
+Benchmark load_dataset_from_json và load_columnar_dataset trên dataset tổng hợp lớn
+(mặc định 5k node, 100k request).
+
+Usage:
+    python -m benchmarks.load_dataset --nodes 5000 --requests 100000
+"""
+import argparse
+import gc
+import json
+import os
+import random
+import shutil
+import tempfile
+import time
+
+from src.utils import load_dataset_from_json as loader
+from src.utils.columnar_dataset import json_to_columnar, load_columnar_dataset
+
+
+def synthetic_dataset(num_nodes: int, num_domains: int, avg_degree: float, num_requests: int, seed: int) -> dict:
+    """Dataset dạng JSON schema của dataset_to_json, sinh trực tiếp (không qua object) cho nhanh."""
+    rnd = random.Random(seed)
+    domains = []
+    node_id = 0
+    per_domain = num_nodes // num_domains
+    for d in range(num_domains):
+        ids = list(range(node_id, node_id + per_domain))
+        node_id += per_domain
+        nodes = [{"node_id": i, "cpu_capacity": rnd.uniform(100, 300), "cost_per_unit": rnd.uniform(1, 10),
+                  "delay": rnd.uniform(1, 10)} for i in ids]
+        links = []
+        for _ in range(int(per_domain * avg_degree / 2)):
+            src, dst = rnd.sample(ids, 2)
+            links.append({"src": src, "dst": dst, "bandwidth": rnd.uniform(1000, 3000),
+                          "cost_per_unit": rnd.uniform(1, 10), "delay": rnd.uniform(1, 10)})
+        domains.append({"domain_id": d, "nodes": nodes, "links": links, "boundary_nodes": rnd.sample(ids, 4)})
+
+    inter_links = []
+    for i in range(num_domains):
+        for j in range(i + 1, num_domains):
+            for src in domains[i]["boundary_nodes"]:
+                for dst in domains[j]["boundary_nodes"]:
+                    inter_links.append({"src_domain": i, "dst_domain": j, "src": src, "dst": dst,
+                                        "bandwidth": rnd.uniform(1000, 3000), "cost_per_unit": rnd.uniform(5, 15),
+                                        "delay": rnd.uniform(10, 30)})
+
+    requests = []
+    for _ in range(num_requests):
+        n = rnd.randint(2, 10)
+        vnodes = [{"id": i, "cpu_demand": rnd.uniform(1, 10), "domains": rnd.sample(range(num_domains), rnd.randint(1, num_domains))}
+                  for i in range(n)]
+        vlinks = [{"src": i, "dst": j, "bandwidth": rnd.uniform(1, 10)}
+                  for i in range(n) for j in range(i + 1, n) if rnd.random() < 0.5]
+        requests.append({"vnetwork": {"nodes": vnodes, "links": vlinks},
+                         "arrival_time": rnd.uniform(0, 10000), "lifetime": rnd.expovariate(1 / 1000)})
+
+    return {"substrate_network": {"domains": domains, "inter_domain_links": inter_links}, "virtual_requests": requests}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--nodes", type=int, default=5000)
+    parser.add_argument("--domains", type=int, default=8)
+    parser.add_argument("--degree", type=float, default=8)
+    parser.add_argument("--requests", type=int, default=100000)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    data = synthetic_dataset(args.nodes, args.domains, args.degree, args.requests, args.seed)
+    fd, path = tempfile.mkstemp(suffix=".json")
+    columnar_path = tempfile.mkdtemp(suffix=".cols")
+    try:
+        with os.fdopen(fd, "w") as f:
+            json.dump(data, f)
+        del data
+        size_mb = os.path.getsize(path) / 1e6
+        print(f"dataset: {args.nodes} nodes, {args.requests} requests, {size_mb:.1f} MB "
+              f"(parser: {'orjson' if loader.orjson is not None else 'json'})")
+
+        for i in range(args.repeat):
+            # Tách thời gian từng pha, cùng điều kiện với loader (tắt cyclic GC)
+            gc.disable()
+            t0 = time.perf_counter()
+            raw = loader.parse_json_file(path)
+            t1 = time.perf_counter()
+            loader.substrate_network_from_dict(raw["substrate_network"])
+            t2 = time.perf_counter()
+            for req in raw["virtual_requests"]:
+                loader.virtual_request_from_dict(req)
+            t3 = time.perf_counter()
+            gc.enable()
+            del raw
+            dataset = loader.load_dataset_from_json(path)
+            print(f"run {i + 1}: parse {t1 - t0:.2f}s, substrate {t2 - t1:.2f}s, requests {t3 - t2:.2f}s, "
+                  f"load_dataset_from_json {dataset['load_time']:.2f}s "
+                  f"({args.requests / dataset['load_time']:,.0f} requests/s)")
+            del dataset
+
+        # Định dạng columnar: mở mmap + dựng substrate, request dựng lazy khi duyệt
+        json_to_columnar(path, columnar_path)
+        for i in range(args.repeat):
+            dataset = load_columnar_dataset(columnar_path)
+            t0 = time.perf_counter()
+            for _ in dataset["virtual_requests"]:
+                pass
+            t1 = time.perf_counter()
+            print(f"columnar run {i + 1}: load_columnar_dataset {dataset['load_time'] * 1000:.1f}ms, "
+                  f"iterate all requests {t1 - t0:.2f}s")
+            del dataset
+    finally:
+        os.remove(path)
+        shutil.rmtree(columnar_path, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,241 @@
+"""
+Benchmark MP_VNE và MC_VNM trên nhiều kích thước substrate, tái lập được theo seed.
+
+Mỗi scale sinh substrate + trace request cố định từ seed, chạy từng thuật toán qua
+Simulator trong một process riêng (để đo peak RSS độc lập) và ghi kết quả ra JSON:
+throughput (request/s), latency p50/p90/p99 (kể cả request bị từ chối), peak RSS,
+acceptance ratio, tổng cost.
+
+Usage:
+    python -m benchmarks.scale_suite run --scales s30 s200 --output bench.json
+    python -m benchmarks.scale_suite compare base.json bench.json --threshold 0.2
+"""
+import argparse
+import json
+import os
+import platform
+import resource
+import subprocess
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+
+from src.algorithms.MC_VNM.mc_vnm import MC_VNM
+from src.algorithms.MP_VNE.mp_vne import MP_VNE
+from src.algorithms.MP_VNE.pso_config import PSOConfig
+from src.simulation.simulator import Simulator
+from src.utils.generate_dataset import generate_dataset
+from src.utils.generate_substrate_network import generate_substrate_network
+from src.utils.generate_virtual_network import generate_virtual_network_test
+
+FORMAT_VERSION = 1
+
+# Tham số mỗi scale. link_degree: bậc trung bình mong muốn của node trong domain (Erdős–Rényi).
+# requests: số request trung bình của trace; scale lớn ít request hơn vì MP_VNE xét mọi cặp
+# ứng viên cho mỗi virtual link (s1000 mất vài giây / request).
+SCALES: Dict[str, Dict[str, Any]] = {
+    "s30": {"num_nodes": 30, "num_domains": 4, "num_boundary_nodes": 2, "link_degree": 3.5,
+            "vnodes": 6, "vlink_rate": 50, "requests": 200},
+    "s200": {"num_nodes": 200, "num_domains": 4, "num_boundary_nodes": 4, "link_degree": 6,
+             "vnodes": 6, "vlink_rate": 50, "requests": 60},
+    "s1000": {"num_nodes": 1000, "num_domains": 8, "num_boundary_nodes": 4, "link_degree": 6,
+              "vnodes": 8, "vlink_rate": 40, "requests": 40},
+    "s5000": {"num_nodes": 5000, "num_domains": 16, "num_boundary_nodes": 8, "link_degree": 6,
+              "vnodes": 8, "vlink_rate": 40, "requests": 20},
+}
+DEFAULT_SCALES = ["s30", "s200"]
+ALGORITHM_NAMES = ["MP_VNE", "MC_VNM"]
+
+# Chỉ số so sánh: (key, True nếu lớn hơn là tốt hơn)
+COMPARED_METRICS = [("throughput_rps", True), ("latency_ms.p99", False), ("peak_rss_mb", False)]
+
+
+def build_dataset(scale: Dict[str, Any], seed: int):
+    per_domain = scale["num_nodes"] / scale["num_domains"]
+    link_rate = min(100.0, 100.0 * scale["link_degree"] / max(per_domain - 1, 1))
+    # Luồng ngẫu nhiên độc lập cho substrate, virtual network và arrival/lifetime
+    substrate_rng, virtual_rng, arrival_rng = (np.random.default_rng(s) for s in np.random.SeedSequence(seed).spawn(3))
+    return generate_dataset(
+        substrate_generator=partial(
+            generate_substrate_network,
+            num_domains=scale["num_domains"],
+            num_nodes=scale["num_nodes"],
+            num_boundary_nodes=scale["num_boundary_nodes"],
+            link_connection_rate=link_rate,
+            inter_link_connection_rate=50,
+            seed=substrate_rng,
+        ),
+        virtual_generator=partial(
+            generate_virtual_network_test,
+            num_nodes=scale["vnodes"],
+            num_domains=scale["num_domains"],
+            link_connection_rate=scale["vlink_rate"],
+            rng=virtual_rng,
+        ),
+        total_time_units=10000,
+        avg_requests=scale["requests"],
+        avg_lifetime=1000,
+        seed=arrival_rng,
+    )
+
+
+def _peak_rss_mb() -> float:
+    # ru_maxrss: KB trên Linux, byte trên macOS
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+
+
+def run_case(scale_name: str, algorithm: str, seed: int, pso: Dict[str, int],
+             requests: Optional[int] = None) -> Dict[str, Any]:
+    """Chạy một (scale, thuật toán); gọi trong process riêng để peak RSS không lẫn giữa các case."""
+    scale = dict(SCALES[scale_name])
+    if requests is not None:
+        scale["requests"] = requests
+    dataset = build_dataset(scale, seed)
+    snetwork = dataset["substrate_network"]
+    if algorithm == "MP_VNE":
+        instance = MP_VNE(snetwork, pso_config=PSOConfig(**pso), seed=seed)
+    else:
+        instance = MC_VNM(snetwork)
+
+    latencies: List[float] = []
+    simulator = Simulator({algorithm: instance}, on_result=lambda name, req, ok, elapsed, cost: latencies.append(elapsed))
+    t0 = time.perf_counter()
+    stats = simulator.run(dataset["virtual_requests"])[algorithm]
+    wall_time = time.perf_counter() - t0
+
+    total = stats["accepted"] + stats["failed"]
+    latency_ms = np.array(latencies) * 1000
+    return {
+        "scale": scale_name,
+        "algorithm": algorithm,
+        "params": scale,
+        "substrate_nodes": len(snetwork.node_store.entities),
+        "substrate_links": len(snetwork.link_store.entities),
+        "requests": total,
+        "accepted": stats["accepted"],
+        "acceptance_ratio": stats["accepted"] / total if total else 0.0,
+        "total_cost": float(sum(stats["costs"])),
+        "wall_time_s": wall_time,
+        "throughput_rps": total / wall_time if wall_time > 0 else 0.0,
+        "latency_ms": {
+            "mean": float(latency_ms.mean()) if total else 0.0,
+            "p50": float(np.percentile(latency_ms, 50)) if total else 0.0,
+            "p90": float(np.percentile(latency_ms, 90)) if total else 0.0,
+            "p99": float(np.percentile(latency_ms, 99)) if total else 0.0,
+            "max": float(latency_ms.max()) if total else 0.0,
+        },
+        "peak_rss_mb": _peak_rss_mb(),
+    }
+
+
+def _git_commit() -> str:
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True,
+                              check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+def run_suite(scales: List[str], algorithms: List[str], seed: int, pso: Dict[str, int],
+              requests: Optional[int] = None) -> Dict[str, Any]:
+    results = []
+    for scale_name in scales:
+        for algorithm in algorithms:
+            # Mỗi case một process mới: peak RSS và cache của thuật toán không bị dồn từ case trước
+            with ProcessPoolExecutor(max_workers=1) as executor:
+                result = executor.submit(run_case, scale_name, algorithm, seed, pso, requests).result()
+            results.append(result)
+            print(f"{scale_name:>6} {algorithm:>7}: {result['throughput_rps']:9.1f} req/s, "
+                  f"p50 {result['latency_ms']['p50']:8.2f} ms, p99 {result['latency_ms']['p99']:8.2f} ms, "
+                  f"accept {result['acceptance_ratio']:.3f}, peak RSS {result['peak_rss_mb']:.0f} MB")
+    return {
+        "format_version": FORMAT_VERSION,
+        "meta": {
+            "commit": _git_commit(),
+            "seed": seed,
+            "pso": pso,
+            "python": platform.python_version(),
+            "numpy": np.__version__,
+            "platform": platform.platform(),
+            "cpu_count": os.cpu_count(),
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        },
+        "results": results,
+    }
+
+
+def _metric(result: Dict[str, Any], key: str) -> float:
+    value: Any = result
+    for part in key.split("."):
+        value = value[part]
+    return value
+
+
+def compare(base: Dict[str, Any], new: Dict[str, Any], threshold: float) -> List[str]:
+    """In bảng so sánh base -> new; trả về danh sách regression vượt threshold (tỉ lệ, vd 0.2 = 20%)."""
+    base_results = {(r["scale"], r["algorithm"]): r for r in base["results"]}
+    regressions = []
+    print(f"base {base['meta']['commit']} -> new {new['meta']['commit']}")
+    for r in new["results"]:
+        key = (r["scale"], r["algorithm"])
+        b = base_results.get(key)
+        if b is None:
+            continue
+        cells = []
+        for metric, higher_is_better in COMPARED_METRICS:
+            old_value, new_value = _metric(b, metric), _metric(r, metric)
+            change = (new_value - old_value) / old_value if old_value else 0.0
+            cells.append(f"{metric} {old_value:.2f} -> {new_value:.2f} ({change:+.1%})")
+            worse = -change if higher_is_better else change
+            if worse > threshold:
+                regressions.append(f"{key[0]}/{key[1]} {metric} {change:+.1%}")
+        accept_delta = r["acceptance_ratio"] - b["acceptance_ratio"]
+        cells.append(f"acceptance {accept_delta:+.3f}")
+        print(f"{key[0]:>6} {key[1]:>7}: " + ", ".join(cells))
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    run_parser = sub.add_parser("run", help="chạy suite và ghi JSON")
+    run_parser.add_argument("--scales", nargs="+", default=DEFAULT_SCALES, choices=list(SCALES))
+    run_parser.add_argument("--algorithms", nargs="+", default=ALGORITHM_NAMES, choices=ALGORITHM_NAMES)
+    run_parser.add_argument("--seed", type=int, default=42)
+    run_parser.add_argument("--pso-particles", type=int, default=20)
+    run_parser.add_argument("--pso-iterations", type=int, default=10)
+    run_parser.add_argument("--requests", type=int, default=None, help="ghi đè số request trung bình của mọi scale")
+    run_parser.add_argument("--output", default="benchmark_results.json")
+
+    compare_parser = sub.add_parser("compare", help="so sánh hai file kết quả")
+    compare_parser.add_argument("base")
+    compare_parser.add_argument("new")
+    compare_parser.add_argument("--threshold", type=float, default=0.2,
+                                help="tỉ lệ xấu đi tối đa trước khi báo regression (mặc định 0.2)")
+
+    args = parser.parse_args()
+    if args.command == "run":
+        pso = {"num_particles": args.pso_particles, "num_iterations": args.pso_iterations}
+        report = run_suite(args.scales, args.algorithms, args.seed, pso, args.requests)
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=4)
+        print(f"Benchmark results saved to {args.output}")
+    else:
+        with open(args.base) as f:
+            base = json.load(f)
+        with open(args.new) as f:
+            new = json.load(f)
+        regressions = compare(base, new, args.threshold)
+        if regressions:
+            print("Regressions:\n  " + "\n  ".join(regressions))
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,97 @@
+"""
+Benchmark LocalController.shortest_path: adjacency index vs. quét toàn bộ link.
+
+Usage:
+    python -m benchmarks.shortest_path --sizes 100 500 1000 2000 --degree 20
+"""
+import argparse
+import heapq
+import random
+import time
+from typing import List
+
+from src.algorithms.MP_VNE.local_controller import LocalController
+from src.types.substrate import SubstrateDomain, SubstrateLink, SubstrateNode
+from src.utils.generate_substrate_network import generate_substrate_network
+
+
+def legacy_shortest_path(domain: SubstrateDomain, src: SubstrateNode, dst: SubstrateNode, bw_required: float = 0.0) -> List[SubstrateLink]:
+    """Dijkstra cũ: duyệt toàn bộ domain.links cho mỗi node pop khỏi heap (O(V·E))."""
+    if src.node_id == dst.node_id:
+        return []
+
+    dist = {node: float('inf') for node in domain.nodes}
+    prev = {node: None for node in domain.nodes}
+    dist[src] = 0
+    pq = [(0, src.node_id, src)]
+
+    while pq:
+        _, _, u = heapq.heappop(pq)
+        if u == dst:
+            break
+        for link in domain.links:
+            if link.src == u:
+                v = link.dst
+            elif link.dst == u:
+                v = link.src
+            else:
+                continue
+            if link.available_bw < bw_required:
+                continue
+            alt = dist[u] + link.delay + link.cost_per_unit
+            if alt < dist[v]:
+                dist[v] = alt
+                prev[v] = link
+                heapq.heappush(pq, (alt, v.node_id, v))
+
+    path = []
+    node = dst
+    while node != src:
+        link = prev[node]
+        if link is None:
+            return []
+        path.append(link)
+        node = link.src if link.dst == node else link.dst
+    path.reverse()
+    return path
+
+
+def time_queries(fn, queries) -> float:
+    t0 = time.perf_counter()
+    for src, dst in queries:
+        fn(src, dst)
+    return (time.perf_counter() - t0) / len(queries)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[100, 250, 500, 1000, 2000])
+    parser.add_argument("--degree", type=float, default=20, help="Bậc trung bình của node trong domain")
+    parser.add_argument("--queries", type=int, default=5)
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    print(f"{'nodes':>6} {'links':>8} {'legacy (ms)':>12} {'adjacency (ms)':>15} {'speedup':>8}")
+    for n in args.sizes:
+        rate = min(100.0, 100.0 * args.degree / max(n - 1, 1))
+        network = generate_substrate_network(num_domains=1, num_nodes=n, num_boundary_nodes=1,
+                                             link_connection_rate=rate, seed=args.seed)
+        domain = network.domains[0]
+        lc = LocalController(domain)
+
+        rnd = random.Random(args.seed)
+        queries = [tuple(rnd.sample(domain.nodes, 2)) for _ in range(args.queries)]
+
+        # Kiểm tra hai cài đặt cho cùng chi phí đường đi
+        for src, dst in queries:
+            new_cost = sum(l.delay + l.cost_per_unit for l in lc.shortest_path(src, dst))
+            old_cost = sum(l.delay + l.cost_per_unit for l in legacy_shortest_path(domain, src, dst))
+            assert abs(new_cost - old_cost) < 1e-9, (new_cost, old_cost)
+
+        t_legacy = time_queries(lambda s, d: legacy_shortest_path(domain, s, d), queries)
+        t_adj = time_queries(lc.shortest_path, queries)
+        print(f"{n:>6} {len(domain.links):>8} {t_legacy * 1e3:>12.2f} {t_adj * 1e3:>15.3f} {t_legacy / t_adj:>7.0f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,12 +1,16 @@
 import os
-from src.utils.generate_virtual_network import generate_virtual_network_test
+import argparse
 from src.utils.dataset_to_json import dataset_to_json
-from src.utils.generate_dataset import generate_dataset
-from src.utils.generate_substrate_network import generate_substrate_network
+from src.utils.generate_dataset import PRESETS, generate_preset_dataset
 
-seed = 42
+parser = argparse.ArgumentParser(description="Sinh dataset theo preset kích thước")
+parser.add_argument("--preset", default="small", choices=list(PRESETS))
+parser.add_argument("--seed", type=int, default=42)
+args = parser.parse_args()
+
+seed = args.seed
 datasets_dir = "./datasets"
-base_name = "small"
+base_name = args.preset
 
 os.makedirs(datasets_dir, exist_ok=True)
 
@@ -21,14 +25,7 @@ for f in existing_files:
             continue
 next_test_number = max(test_numbers, default=0) + 1
 
-dataset = generate_dataset(
-    substrate_generator=generate_substrate_network,
-    virtual_generator=generate_virtual_network_test,
-    total_time_units=10000,
-    avg_requests=200,
-    avg_lifetime=1000,
-    seed=seed
-)
+dataset = generate_preset_dataset(args.preset, seed=seed)
 
 output_file = os.path.join(datasets_dir, f"{base_name}_{next_test_number}.json")
 dataset_to_json(dataset, output_file)
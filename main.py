@@ -1,110 +1,58 @@
-import sys
-import time
-import matplotlib.pyplot as plt
-import os
-import json
-import copy
+import argparse
 
-from src.algorithms.MC_VNM.mc_vnm import MC_VNM
-from src.algorithms.MP_VNE.mp_vne import MP_VNE
-from src.utils.load_dataset_from_json import load_dataset_from_json
+from src.simulation.runner import ALGORITHMS, ExperimentRunner
 
 # ================================
-#       FILE JSON KẾT QUẢ
+#       THAM SỐ DÒNG LỆNH
 # ================================
-os.makedirs("./assets/result", exist_ok=True)
-json_path = "./assets/result/simulation_data.json"
-
-# Load cũ nếu tồn tại, nếu không tạo mảng mới
-if os.path.exists(json_path):
-    with open(json_path, "r") as f:
-        old_data = json.load(f)
-else:
-    old_data = []
-
-# ================================
-#       CHẠY 50 DATASETS
-# ================================
-for i in range(1, 101):
-    print(f"\n================= RUN DATASET {i} =================")
-    dataset_file = f"./datasets/small_{i}.json"
-
-    dataset = load_dataset_from_json(dataset_file)
-
-    snetwork_mp = copy.deepcopy(dataset["substrate_network"])
-    snetwork_mc = copy.deepcopy(dataset["substrate_network"])
-
-    virtual_requests = dataset["virtual_requests"]
-    virtual_requests.sort(key=lambda r: r["arrival_time"])
-
-    mp_vne = MP_VNE(snetwork_mp)
-    mc_vnm = MC_VNM(snetwork_mc)
-
-    current_time = 0.0
-    time_step = 1.0
-    pending_requests = virtual_requests.copy()
-
-    # Stats: lưu data dạng time series
-    stats = {
-        "dataset": dataset_file,
-        "MP_VNE": {"accepted": 0, "failed": 0, "times": [], "costs": [], "per_request_time": [], "per_request_cost": [], "success": []},
-        "MC_VNM": {"accepted": 0, "failed": 0, "times": [], "costs": [], "per_request_time": [], "per_request_cost": [], "success": []}
-    }
-
-    while pending_requests:
-        new_arrivals = [r for r in pending_requests if r["arrival_time"] <= current_time]
-
-        for req in new_arrivals:
-            # -------------------- MP-VNE --------------------
-            try:
-                t0 = time.time()
-                rid_mp, cost_mp, mapping_mp = mp_vne.handle_mapping_request(req, current_time)
-                t1 = time.time()
-
-                stats["MP_VNE"]["accepted"] += 1
-                stats["MP_VNE"]["times"].append(t1 - t0)
-                stats["MP_VNE"]["costs"].append(cost_mp)
-                stats["MP_VNE"]["per_request_time"].append(t1 - t0)
-                stats["MP_VNE"]["per_request_cost"].append(cost_mp)
-                stats["MP_VNE"]["success"].append(True)
-
-            except Exception as e:
-                stats["MP_VNE"]["failed"] += 1
-                stats["MP_VNE"]["per_request_time"].append(None)
-                stats["MP_VNE"]["per_request_cost"].append(None)
-                stats["MP_VNE"]["success"].append(False)
-
-            # -------------------- MC-VNE --------------------
-            try:
-                t0 = time.time()
-                rid_mc, cost_mc, mapping_mc = mc_vnm.handle_mapping_request(req["vnetwork"], current_time, req["lifetime"])
-                t1 = time.time()
-
-                stats["MC_VNM"]["accepted"] += 1
-                stats["MC_VNM"]["times"].append(t1 - t0)
-                stats["MC_VNM"]["costs"].append(cost_mc)
-                stats["MC_VNM"]["per_request_time"].append(t1 - t0)
-                stats["MC_VNM"]["per_request_cost"].append(cost_mc)
-                stats["MC_VNM"]["success"].append(True)
-
-            except Exception as e:
-                stats["MC_VNM"]["failed"] += 1
-                stats["MC_VNM"]["per_request_time"].append(None)
-                stats["MC_VNM"]["per_request_cost"].append(None)
-                stats["MC_VNM"]["success"].append(False)
-
-            pending_requests.remove(req)
-
-        # Release expired
-        mc_vnm.release_expired_requests(current_time)
-        current_time += time_step
-
-    # Append kết quả lần chạy này
-    old_data.append(stats)
-    print(f"Finished dataset {i}")
-
-# Ghi lại tất cả kết quả
-with open(json_path, "w") as f:
-    json.dump(old_data, f, indent=4)
-
-print(f"Appended all 50 datasets simulation data to {json_path}")
+parser = argparse.ArgumentParser(description="Chạy mô phỏng VNE trên nhiều dataset, song song theo process")
+parser.add_argument("--datasets", nargs="+", default=[f"./datasets/small_{i}.json" for i in range(1, 101)],
+                    help="file JSON, trace .jsonl hoặc thư mục columnar (mặc định small_1..100)")
+parser.add_argument("--algorithms", nargs="+", default=list(ALGORITHMS), choices=list(ALGORITHMS))
+parser.add_argument("--workers", type=int, default=None, help="số process (mặc định: số CPU)")
+parser.add_argument("--shard-dir", default="./assets/result/shards", help="thư mục chứa kết quả từng (dataset, thuật toán)")
+parser.add_argument("--no-resume", action="store_true", help="bắt đầu run mới (hoặc chạy lại toàn bộ run --run-id)")
+parser.add_argument("--seed", type=int, default=None, help="seed cho MP_VNE")
+parser.add_argument("--records-dir", default="./assets/result/records",
+                    help="kho JSONL append-only, một record mỗi request mỗi thuật toán")
+parser.add_argument("--no-records", action="store_true", help="không ghi kho record theo request")
+parser.add_argument("--run-id", default=None, help="run_id ghi vào record (mặc định: sinh theo thời gian, giữ nguyên khi resume)")
+parser.add_argument("--summary-only", action="store_true",
+                    help="stats chỉ giữ aggregate, không giữ list theo request (bộ nhớ hằng số với trace dài)")
+parser.add_argument("--export", default=None, metavar="PATH",
+                    help="ghi thêm stats đã gộp của run này ra PATH (schema simulation_data.json); "
+                         "mặc định chỉ có shard và kho record")
+parser.add_argument("--profile", action="store_true", help="đo thời gian / đếm theo phase, xuất trong stats[\"profile\"]")
+
+
+def main():
+    args = parser.parse_args()
+
+    # ================================
+    #       CHẠY CÁC DATASETS
+    # ================================
+    runner = ExperimentRunner(
+        datasets=args.datasets,
+        algorithms=args.algorithms,
+        shard_dir=args.shard_dir,
+        max_workers=args.workers,
+        resume=not args.no_resume,
+        seed=args.seed,
+        profile=args.profile,
+        records_dir=None if args.no_records else args.records_dir,
+        run_id=args.run_id,
+        keep_series=not args.summary_only,
+    )
+    runner.run()
+
+    # ================================
+    #       XUẤT KẾT QUẢ (TUỲ CHỌN)
+    # ================================
+    # Kết quả từng request đã nằm trong kho record (đọc bằng result.py); chỉ gộp khi được yêu cầu
+    if args.export is not None:
+        results = runner.merge(args.export)
+        print(f"Exported {len(results)} datasets simulation data of run {runner.run_id} to {args.export}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,16 +1,49 @@
-import json
 import os
+import json
+import argparse
+from itertools import groupby
+
 import numpy as np
 import matplotlib.pyplot as plt
 
+from src.utils.results_store import iter_records
+from src.utils.streaming_stats import IndexedStats
+
+# ================================
+#       THAM SỐ DÒNG LỆNH
+# ================================
+parser = argparse.ArgumentParser(description="Tổng hợp kết quả mô phỏng (một lượt, bộ nhớ không phụ thuộc số lần chạy)")
+parser.add_argument("--records", default="./assets/result/records",
+                    help="kho record JSONL (file hoặc thư mục) do main.py ghi")
+parser.add_argument("--simulation-data", default="./assets/result/simulation_data.json",
+                    help="dùng khi không có kho record: file stats đã gộp (main.py --export, schema cũ)")
+parser.add_argument("--algorithms", nargs="+", default=["MP_VNE", "MC_VNM"])  # Có thể thêm thuật toán khác sau này
+parser.add_argument("--run-id", default=None, help="chỉ lấy record của run_id này")
+parser.add_argument("--confidence", type=float, default=0.95, help="mức tin cậy của dải quanh đường trung bình")
+parser.add_argument("--output-dir", default="./assets/result")
+parser.add_argument("--no-show", action="store_true", help="chỉ lưu ảnh, không mở cửa sổ")
+
+
 # ================================
 #      HÀM VISUALIZE CHUNG
 # ================================
-def visualize(x_arrays, y_arrays, labels=None, title="", xlabel="", ylabel="", save_path=None, figsize=(8,5)):
+def visualize(x_arrays, y_arrays, labels=None, title="", xlabel="", ylabel="", save_path=None, figsize=(8,5),
+              bands=None, extra_lines=None, show=True):
+    """
+    bands:       [(low, high)] cùng thứ tự với y_arrays, vẽ dải tô mờ (khoảng tin cậy).
+    extra_lines: [(y, label)] cùng thứ tự với y_arrays, vẽ nét đứt cùng màu (vd: p90).
+    """
     plt.figure(figsize=figsize)
     for i, (x, y) in enumerate(zip(x_arrays, y_arrays)):
         label = labels[i] if labels else None
-        plt.plot(x, y, marker='o', label=label)
+        line, = plt.plot(x, y, marker='o', markersize=3, label=label)
+        if bands:
+            low, high = bands[i]
+            plt.fill_between(x, low, high, color=line.get_color(), alpha=0.2)
+        if extra_lines:
+            extra_y, extra_label = extra_lines[i]
+            plt.plot(x, extra_y, linestyle='--', color=line.get_color(),
+                     label=f"{label} {extra_label}" if label else extra_label)
     plt.title(title)
     plt.xlabel(xlabel)
     plt.ylabel(ylabel)
@@ -21,93 +54,162 @@ def visualize(x_arrays, y_arrays, labels=None, title="", xlabel="", ylabel="", s
         os.makedirs(os.path.dirname(save_path), exist_ok=True)
         plt.savefig(save_path, bbox_inches='tight')
         print(f"Saved plot to {save_path}")
-    plt.show()
+    if show:
+        plt.show()
+    plt.close()
 
-# ================================
-#      ĐỌC DỮ LIỆU JSON
-# ================================
-json_path = "./assets/result/simulation_data.json"
-algorithm_names = ["MP_VNE", "MC_VNM"]  # Có thể thêm thuật toán khác sau này
 
-with open(json_path, "r") as f:
-    all_runs = json.load(f)  # list of dicts, mỗi dict là 1 lần chạy
-print(all_runs[0].keys())
 # ================================
-#      HÀM TÍNH TRUNG BÌNH
+#      TỔNG HỢP MỘT LƯỢT
 # ================================
-
-def average_time_series(all_runs, alg_key, field):
-    series_list = []
-
-    for i, run in enumerate(all_runs):
-        if alg_key not in run:
-            print(f"[WARN] Run {i} missing algorithm {alg_key}, skipped")
+class AlgorithmAggregate:
+    """
+    Thống kê theo chỉ số request của một thuật toán, cập nhật từng lần chạy một:
+    time, cost (chỉ request được chấp nhận) và acceptance ratio tích luỹ tới request i.
+    """
+
+    def __init__(self):
+        # Chỉ time có quantile (p90 / p50 / p99), cost và acceptance chỉ cần mean / CI
+        self.time = IndexedStats(quantiles=True)
+        self.cost = IndexedStats()
+        self.acceptance = IndexedStats()
+        self.overall_time = IndexedStats(quantiles=True)  # mọi request dồn vào chỉ số 0
+        self.runs = 0
+        self.requests = 0
+        self.accepted = 0
+
+    def add_run(self, times, costs, accepted):
+        accepted = np.asarray(accepted, dtype=bool)
+        index = np.arange(len(accepted))
+        self.time.update(index, np.asarray(times, dtype=float))
+        self.cost.update(index, np.asarray(costs, dtype=float))
+        self.acceptance.update(index, np.cumsum(accepted) / (index + 1))
+        self.overall_time.update(np.zeros(len(index), dtype=np.int64), np.asarray(times, dtype=float))
+        self.runs += 1
+        self.requests += len(accepted)
+        self.accepted += int(accepted.sum())
+
+
+def aggregate_records(path, algorithm_names, run_id=None):
+    """
+    Đọc kho record theo từng dòng. Record của một lần chạy (run_id, dataset, thuật toán)
+    nằm liền nhau trong file nên mỗi lúc chỉ giữ một lần chạy trong bộ nhớ.
+    Thời gian ở đây gồm cả request bị từ chối.
+    """
+    aggregates = {alg: AlgorithmAggregate() for alg in algorithm_names}
+    key = lambda r: (r["run_id"], r["dataset"], r["algorithm"])
+    for (_, _, alg), group in groupby(iter_records(path, run_id=run_id), key=key):
+        if alg not in aggregates:
             continue
-        if field not in run[alg_key]:
-            print(f"[WARN] Run {i} missing field {field} in {alg_key}, skipped")
+        records = sorted(group, key=lambda r: r["seq"])
+        aggregates[alg].add_run(
+            [r["time"] for r in records],
+            [r["cost"] if r["cost"] is not None else np.nan for r in records],
+            [r["accepted"] for r in records],
+        )
+    return aggregates
+
+
+def aggregate_simulation_data(json_path, algorithm_names):
+    """
+    Schema cũ: list stats theo dataset; per_request_time của request bị từ chối là None.
+    Stats chạy với --summary-only không có list theo request nên được bỏ qua.
+    """
+    with open(json_path, "r") as f:
+        all_runs = json.load(f)  # list of dicts, mỗi dict là 1 lần chạy
+    aggregates = {alg: AlgorithmAggregate() for alg in algorithm_names}
+    for run in all_runs:
+        for alg in algorithm_names:
+            stats = run.get(alg)
+            if stats is None or "per_request_time" not in stats:
+                continue
+            aggregates[alg].add_run(
+                [v if v is not None else np.nan for v in stats["per_request_time"]],
+                [v if v is not None else np.nan for v in stats["per_request_cost"]],
+                stats["success"],
+            )
+    return aggregates
+
+
+def print_summary(aggregates):
+    for alg, agg in aggregates.items():
+        if agg.runs == 0:
+            print(f"{alg}: no data")
             continue
+        t = agg.overall_time
+        print(f"{alg}: {agg.runs} runs, {agg.requests} requests, "
+              f"acceptance {agg.accepted / max(agg.requests, 1):.3f}, "
+              f"time mean {t.mean[0] * 1000:.3f} ms, p50 {t.quantile(0.5)[0] * 1000:.3f} ms, "
+              f"p99 {t.quantile(0.99)[0] * 1000:.3f} ms")
 
-        series = run[alg_key][field]
-
-        # Replace None with np.nan
-        series = [v if v is not None else np.nan for v in series]
-        series_list.append(series)
-
-    if not series_list:
-        raise ValueError(f"No valid data found for {alg_key}.{field}")
-
-    # Pad tất cả series thành cùng độ dài bằng np.nan
-    max_len = max(len(s) for s in series_list)
-    padded = [s + [np.nan] * (max_len - len(s)) for s in series_list]
-
-    arr = np.array(padded, dtype=float)
-
-    # Tính mean theo cột, bỏ qua nan
-    avg = np.nanmean(arr, axis=0)
-
-    return avg.tolist()
-
-
-# ================================
-#      TÍNH TRUNG BÌNH CHO TẤT CẢ
-# ================================
-avg_per_request_time = {}
-avg_per_request_cost = {}
-
-for alg in algorithm_names:
-    avg_per_request_time[alg] = average_time_series(all_runs, alg, "per_request_time")
-    avg_per_request_cost[alg] = average_time_series(all_runs, alg, "per_request_cost")
 
 # ================================
 #      VẼ BIỂU ĐỒ
 # ================================
-x_arrays = []
-y_arrays_time = []
-y_arrays_cost = []
-
-for alg in algorithm_names:
-    x_arrays.append(list(range(1, len(avg_per_request_time[alg]) + 1)))
-    y_arrays_time.append(avg_per_request_time[alg])
-    y_arrays_cost.append(avg_per_request_cost[alg])
-
-# --- Average Time per Request ---
-visualize(
-    x_arrays=x_arrays,
-    y_arrays=y_arrays_time,
-    labels=algorithm_names,
-    title="Average Mapping Time per Request",
-    xlabel="Request Index",
-    ylabel="Time (s)",
-    save_path="./assets/result/avg_time_per_request.png"
-)
-
-# --- Average Cost per Request ---
-visualize(
-    x_arrays=x_arrays,
-    y_arrays=y_arrays_cost,
-    labels=algorithm_names,
-    title="Average Cost per Request",
-    xlabel="Request Index",
-    ylabel="Cost",
-    save_path="./assets/result/avg_cost_per_request.png"
-)
+def plot(aggregates, output_dir, confidence, show):
+    algs = [alg for alg, agg in aggregates.items() if agg.runs > 0]
+    if not algs:
+        raise ValueError("No valid data found")
+    level = f"{confidence:.0%} CI"
+
+    def series(field):
+        stats = [getattr(aggregates[alg], field) for alg in algs]
+        x_arrays = [list(range(1, s.size + 1)) for s in stats]
+        return stats, x_arrays
+
+    # --- Average Time per Request ---
+    stats, x_arrays = series("time")
+    visualize(
+        x_arrays=x_arrays,
+        y_arrays=[s.mean for s in stats],
+        labels=algs,
+        title=f"Average Mapping Time per Request ({level})",
+        xlabel="Request Index",
+        ylabel="Time (s)",
+        save_path=os.path.join(output_dir, "avg_time_per_request.png"),
+        bands=[s.confidence_interval(confidence) for s in stats],
+        extra_lines=[(s.quantile(0.9), "p90") for s in stats],
+        show=show,
+    )
+
+    # --- Average Cost per Request ---
+    stats, x_arrays = series("cost")
+    visualize(
+        x_arrays=x_arrays,
+        y_arrays=[s.mean for s in stats],
+        labels=algs,
+        title=f"Average Cost per Request ({level})",
+        xlabel="Request Index",
+        ylabel="Cost",
+        save_path=os.path.join(output_dir, "avg_cost_per_request.png"),
+        bands=[s.confidence_interval(confidence) for s in stats],
+        show=show,
+    )
+
+    # --- Acceptance Ratio over Time ---
+    stats, x_arrays = series("acceptance")
+    visualize(
+        x_arrays=x_arrays,
+        y_arrays=[s.mean for s in stats],
+        labels=algs,
+        title=f"Cumulative Acceptance Ratio ({level})",
+        xlabel="Request Index",
+        ylabel="Acceptance Ratio",
+        save_path=os.path.join(output_dir, "acceptance_ratio.png"),
+        bands=[s.confidence_interval(confidence) for s in stats],
+        show=show,
+    )
+
+
+def main():
+    args = parser.parse_args()
+    if os.path.exists(args.records):
+        aggregates = aggregate_records(args.records, args.algorithms, args.run_id)
+    else:
+        aggregates = aggregate_simulation_data(args.simulation_data, args.algorithms)
+    print_summary(aggregates)
+    plot(aggregates, args.output_dir, args.confidence, show=not args.no_show)
+
+
+if __name__ == "__main__":
+    main()
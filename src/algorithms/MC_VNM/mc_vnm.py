@@ -1,45 +1,166 @@
+import heapq
+import math
 import uuid
-from typing import List, Dict
+from typing import List, Dict, Optional, Tuple
 from collections import OrderedDict, deque
-from copy import deepcopy
 
+from src.algorithms.admission import AdmissionControl
+from src.algorithms.bottleneck_index import BottleneckIndex
 from src.types.virtual import VirtualNetwork, VirtualNode, VirtualLink
 from src.types.substrate import SubstrateNetwork, SubstrateDomain, SubstrateNode, SubstrateLink, InterLink
+from src.utils.profiler import NULL_PROFILER, Profiler
+
+
+class _SpanningForest:
+    """
+    Kruskal spanning forest trên các link có available_bw >= threshold, theo thứ tự cost tăng dần.
+
+    Mỗi cây được root và lưu parent pointer + depth, nên path giữa hai node là đường đi
+    trong cây, tìm bằng cách leo từ hai đầu lên tổ tiên chung (không cần BFS copy path).
+    """
+
+    def __init__(self, sorted_links: List, threshold: float):
+        self.threshold = threshold
+        parent: Dict[SubstrateNode, SubstrateNode] = {}
+
+        def find(u):
+            root = u
+            while parent.setdefault(root, root) != root:
+                root = parent[root]
+            while parent[u] != root:
+                parent[u], u = root, parent[u]
+            return root
+
+        adj: Dict[SubstrateNode, List] = {}
+        self.tree_links = set()
+        for link in sorted_links:
+            if link.available_bw < threshold:
+                continue
+            ru, rv = find(link.src), find(link.dst)
+            if ru == rv:
+                continue
+            parent[ru] = rv
+            self.tree_links.add(link)
+            adj.setdefault(link.src, []).append(link)
+            adj.setdefault(link.dst, []).append(link)
+
+        # Root từng cây: parent_link, depth, root
+        self._parent_link: Dict[SubstrateNode, Optional[SubstrateLink]] = {}
+        self._depth: Dict[SubstrateNode, int] = {}
+        self._root: Dict[SubstrateNode, SubstrateNode] = {}
+        for start in adj:
+            if start in self._root:
+                continue
+            self._parent_link[start] = None
+            self._depth[start] = 0
+            self._root[start] = start
+            queue = deque([start])
+            while queue:
+                node = queue.popleft()
+                for link in adj[node]:
+                    neighbor = link.dst if link.src == node else link.src
+                    if neighbor in self._root:
+                        continue
+                    self._parent_link[neighbor] = link
+                    self._depth[neighbor] = self._depth[node] + 1
+                    self._root[neighbor] = start
+                    queue.append(neighbor)
+
+    def path(self, src: SubstrateNode, dst: SubstrateNode) -> Optional[List[SubstrateLink]]:
+        if src == dst:
+            return []
+        root = self._root.get(src)
+        if root is None or root != self._root.get(dst):
+            return None
+
+        up: List[SubstrateLink] = []    # src -> tổ tiên chung
+        down: List[SubstrateLink] = []  # dst -> tổ tiên chung
+        u, v = src, dst
+        while self._depth[u] > self._depth[v]:
+            u = self._step(u, up)
+        while self._depth[v] > self._depth[u]:
+            v = self._step(v, down)
+        while u != v:
+            u = self._step(u, up)
+            v = self._step(v, down)
+        down.reverse()
+        return up + down
+
+    def _step(self, node: SubstrateNode, path: List) -> SubstrateNode:
+        link = self._parent_link[node]
+        path.append(link)
+        return link.dst if link.src == node else link.src
 
 
 class MC_VNM:
-    def __init__(self, substrate_network: SubstrateNetwork):
+    def __init__(self, substrate_network: SubstrateNetwork, bw_bucket_size: float = 1.0, profiler: Optional[Profiler] = None,
+                 admission: bool = True):
         self.substrate: SubstrateNetwork = substrate_network
-        # request_id -> {"node_mapping", "link_mapping", "expire_time"}
+        # Timer / counter theo phase (tắt mặc định)
+        self.profiler: Profiler = profiler if profiler is not None else NULL_PROFILER
+        # Loại các vlink không nối được ở ngưỡng bandwidth trước khi dựng Kruskal forest
+        self.bottleneck = BottleneckIndex(substrate_network, self.profiler)
+        # Loại request chắc chắn không map được trước node / link mapping (None = tắt).
+        # Mỗi vnode được chọn node độc lập nên CPU không cộng dồn giữa các vnode. Không kiểm tra
+        # liên thông ở đây: kruskal_path đã loại vlink bằng bottleneck index trên đúng node được chọn.
+        self.admission: Optional[AdmissionControl] = (
+            AdmissionControl(substrate_network, respect_domains=True, accumulate_cpu=False) if admission else None
+        )
+        # request_id -> {"node_mapping": [(node idx, cpu)], "link_mapping": [(link idx, bw)], "expire_time"}
+        # idx là chỉ số dense trong substrate.node_store / link_store
         self._active_mappings: Dict[str, Dict] = OrderedDict()
+        # Min-heap (expire_time, seq, request_id): release chỉ tốn chi phí cho các mapping thực sự hết hạn
+        self._expiry_heap: List[Tuple[float, int, str]] = []
+        self._expiry_seq: int = 0
+
+        # Cost của link không đổi -> thứ tự sort theo cost chỉ cần tính một lần
+        self._sorted_links: List = []
+        # Spanning forest dùng lại cho các vlink cùng bandwidth bucket: bucket -> forest
+        self.bw_bucket_size = bw_bucket_size
+        self._forests: Dict[int, _SpanningForest] = {}
 
     # ---------------- MAIN ENTRY ----------------
     def handle_mapping_request(self, vnetwork: VirtualNetwork, current_time: float, lifetime: float = 1000):
+        with self.profiler.phase("handle_mapping_request"):
+            return self._handle_mapping_request(vnetwork, current_time, lifetime)
+
+    def _handle_mapping_request(self, vnetwork: VirtualNetwork, current_time: float, lifetime: float):
         request_id = str(uuid.uuid4())
+        profiler = self.profiler
+
+        # Admission check (raise AdmissionRejected)
+        if self.admission is not None:
+            with profiler.phase("admission"):
+                self.admission.check(vnetwork)
 
         # Node mapping
-        node_mapping = self.node_mapping(vnetwork)
+        with profiler.phase("node_mapping"):
+            node_mapping = self.node_mapping(vnetwork)
         if not node_mapping:
             raise ValueError("Node mapping failed")
 
         # Link mapping (Kruskal)
-        link_mapping = self.link_mapping(vnetwork, node_mapping)
+        with profiler.phase("link_mapping"):
+            link_mapping = self.link_mapping(vnetwork, node_mapping)
         if link_mapping is None:
             raise ValueError("Link mapping failed")
 
         # Reserve resources
-        self.reserve_resources(node_mapping, link_mapping)
+        with profiler.phase("reserve_resources"):
+            self.reserve_resources(node_mapping, link_mapping)
 
         # Compute cost
         cost = self.compute_cost(node_mapping, link_mapping)
 
-        # Save snapshot
+        # Save snapshot: chỉ số node / link và lượng tài nguyên đã cấp, đủ để giải phóng
         mapping_info = {
-            "node_mapping": deepcopy(node_mapping),
-            "link_mapping": deepcopy(link_mapping),
+            "node_mapping": [(snode._idx, vnode.cpu_demand) for vnode, snode in node_mapping.items()],
+            "link_mapping": [(link._idx, vlink.bandwidth) for vlink, path in link_mapping.items() for link in path],
             "expire_time": current_time + lifetime
         }
         self._active_mappings[request_id] = mapping_info
+        heapq.heappush(self._expiry_heap, (mapping_info["expire_time"], self._expiry_seq, request_id))
+        self._expiry_seq += 1
 
         return request_id, cost, mapping_info
 
@@ -47,16 +168,18 @@ class MC_VNM:
     def node_mapping(self, vnetwork: VirtualNetwork) -> Dict[VirtualNode, SubstrateNode]:
         mapping: Dict[VirtualNode, SubstrateNode] = {}
         for vnode in vnetwork.nodes:
-            candidates: List[SubstrateNode] = []
+            # Node nhiều CPU nhất của mỗi domain được phép, lấy từ capacity index của domain
+            chosen: Optional[SubstrateNode] = None
             for domain in self.substrate.domains:
                 if vnode.domains and domain.domain_id not in vnode.domains:
                     continue
-                for snode in domain.nodes:
-                    if snode.available_cpu >= vnode.cpu_demand:
-                        candidates.append(snode)
-            if not candidates:
+                snode = domain.max_cpu_node()
+                if snode is None or snode.available_cpu < vnode.cpu_demand:
+                    continue
+                if chosen is None or snode.available_cpu > chosen.available_cpu:
+                    chosen = snode
+            if chosen is None:
                 return {}
-            chosen = max(candidates, key=lambda n: n.available_cpu)
             mapping[vnode] = chosen
         return mapping
     
@@ -70,95 +193,102 @@ class MC_VNM:
                 src_snode = node_mapping[vlink.src]
                 dst_snode = node_mapping[vlink.dst]
 
-                # tìm path với bandwidth >= vlink.bandwidth
-                path = self.kruskal_path(src_snode, dst_snode, vlink.bandwidth, used_bw_links)
+                # tìm path với bandwidth >= vlink.bandwidth (available_bw đã tạm trừ các vlink trước)
+                path = self.kruskal_path(src_snode, dst_snode, vlink.bandwidth)
                 if path is None:
                     raise ValueError(f"Cannot map virtual link {vlink.src.id}->{vlink.dst.id}")
 
                 # tạm trừ băng thông trên path
                 for link in path:
-                    link.available_bw -= vlink.bandwidth
+                    self._adjust_bw(link, -vlink.bandwidth)
                     used_bw_links[link] = used_bw_links.get(link, 0) + vlink.bandwidth
 
                 result[vlink] = path
 
         except Exception as e:
-            # rollback tạm trừ nếu mapping thất bại
-            for link, bw in used_bw_links.items():
-                link.available_bw += bw
             return None
 
+        finally:
+            # hoàn lại phần tạm trừ; reserve_resources mới thực sự trừ băng thông
+            for link, bw in used_bw_links.items():
+                self._adjust_bw(link, bw)
+
         return result
 
-    # ---------------- KRUSKAL PATH (thêm param used_bw_links) ----------------
+    # ---------------- KRUSKAL PATH ----------------
     def kruskal_path(self, src: SubstrateNode, dst: SubstrateNode, bandwidth: float, used_bw_links: Dict = None) -> List[SubstrateLink]:
         """
-        Kruskal + BFS tìm path, xét available_bw - used_bw_links >= bandwidth
+        Path src->dst trong Kruskal spanning forest của các link có available_bw >= bandwidth.
+
+        Forest được cache theo bandwidth bucket (ngưỡng ceil(bandwidth / bw_bucket_size) * bw_bucket_size)
+        và dùng lại cho các vlink cùng bucket; nếu forest của bucket không nối được src-dst thì
+        tính lại với đúng ngưỡng bandwidth. used_bw_links (link -> bw đã dùng tạm) bỏ qua cache.
         """
         if src == dst:
             return []
 
-        if used_bw_links is None:
-            used_bw_links = {}
-
-        # 1. Gather valid links
-        valid_links: List[SubstrateLink] = []
-        for domain in self.substrate.domains:
-            for link in domain.links:
-                avail = link.available_bw - used_bw_links.get(link, 0)
-                if avail >= bandwidth:
-                    valid_links.append(link)
-        for ilink in self.substrate.links:
-            avail = ilink.available_bw - used_bw_links.get(ilink, 0)
-            if avail >= bandwidth:
-                valid_links.append(ilink)
-
-        if not valid_links:
-            return None
+        with self.profiler.phase("kruskal_path"):
+            # Bottleneck index chỉ được hỏi trước khi phải dựng forest mới (chi phí cùng bậc O(L)):
+            # forest có sẵn trả lời rẻ hơn, còn index được dựng lại sau mỗi lần đổi bandwidth trên forest của nó.
+            # used_bw_links chỉ làm bandwidth giảm, nên không nối được lúc này thì cũng không nối được sau khi trừ.
+            if used_bw_links:
+                if not self._bottleneck_connected(src, dst, bandwidth):
+                    return None
+                return self._fresh_path(src, dst, bandwidth, used_bw_links)
 
-        # 2. Kruskal MST
-        parent = {}
-        def find(u):
-            parent.setdefault(u, u)
-            if parent[u] != u:
-                parent[u] = find(parent[u])
-            return parent[u]
-
-        def union(u, v):
-            pu, pv = find(u), find(v)
-            if pu == pv:
-                return False
-            parent[pu] = pv
-            return True
+            bucket = math.ceil(bandwidth / self.bw_bucket_size) if bandwidth > 0 else 0
+            forest = self._forests.get(bucket)
+            if forest is None:
+                if not self._bottleneck_connected(src, dst, bandwidth):
+                    return None
+                self.profiler.count("forest_builds")
+                forest = self._forests[bucket] = _SpanningForest(self._get_sorted_links(), bucket * self.bw_bucket_size)
+            else:
+                self.profiler.count("forest_cache_hits")
+            path = forest.path(src, dst)
+            if path is None and forest.threshold > bandwidth and self._bottleneck_connected(src, dst, bandwidth):
+                self.profiler.count("forest_exact_rebuilds")
+                path = _SpanningForest(self._get_sorted_links(), bandwidth).path(src, dst)
+            return path
 
-        valid_links.sort(key=lambda l: getattr(l, "cost_per_unit", 1.0))
-        tree_links: List[SubstrateLink] = []
-        for link in valid_links:
-            if union(link.src, link.dst):
-                tree_links.append(link)
-            if find(src) == find(dst):
-                break
-
-        # 3. BFS tìm path src->dst trong tree_links
-        adj: Dict[SubstrateNode, List[SubstrateLink]] = {}
-        for link in tree_links:
-            adj.setdefault(link.src, []).append(link)
-            adj.setdefault(link.dst, []).append(link)
+    def _bottleneck_connected(self, src: SubstrateNode, dst: SubstrateNode, bandwidth: float) -> bool:
+        if self.bottleneck.connected(src, dst, bandwidth):
+            return True
+        self.profiler.count("bottleneck_pruned")
+        return False
 
-        visited = set()
-        queue = deque([(src, [])])
-        while queue:
-            node, path = queue.popleft()
-            if node == dst:
-                return path
-            visited.add(node)
-            for link in adj.get(node, []):
-                neighbor = link.dst if link.src == node else link.src
-                if neighbor not in visited:
-                    queue.append((neighbor, path + [link]))
+    def _fresh_path(self, src: SubstrateNode, dst: SubstrateNode, bandwidth: float, used_bw_links: Dict) -> List[SubstrateLink]:
+        # Tạm trừ used_bw_links để lọc link, không lưu vào cache
+        self.profiler.count("forest_builds")
+        for link, bw in used_bw_links.items():
+            link.available_bw -= bw
+        try:
+            return _SpanningForest(self._get_sorted_links(), bandwidth).path(src, dst)
+        finally:
+            for link, bw in used_bw_links.items():
+                link.available_bw += bw
 
-        return None
+    def _get_sorted_links(self) -> List:
+        num_links = sum(len(domain.links) for domain in self.substrate.domains) + len(self.substrate.links)
+        if len(self._sorted_links) != num_links:
+            links = [link for domain in self.substrate.domains for link in domain.links] + list(self.substrate.links)
+            self._sorted_links = sorted(links, key=lambda l: getattr(l, "cost_per_unit", 1.0))
+            self._forests.clear()
+        return self._sorted_links
 
+    def _adjust_bw(self, link, delta: float) -> None:
+        """Cập nhật available_bw và huỷ các forest mà link vượt qua ngưỡng bandwidth."""
+        old_bw = link.available_bw
+        new_bw = old_bw + delta
+        link.available_bw = new_bw
+        self.bottleneck.bandwidth_changed(link, old_bw)
+        for bucket, forest in list(self._forests.items()):
+            if new_bw < old_bw:
+                # Link không thuộc cây bị loại khỏi tập lọc -> forest vẫn là MST
+                if link in forest.tree_links and new_bw < forest.threshold:
+                    del self._forests[bucket]
+            elif old_bw < forest.threshold <= new_bw:
+                del self._forests[bucket]
 
     # ---------------- RESOURCES ----------------
     def reserve_resources(self, node_mapping, link_mapping):
@@ -166,7 +296,7 @@ class MC_VNM:
             snode.available_cpu -= vnode.cpu_demand
         for [vlink, path] in link_mapping.items():
             for link in path:
-                link.available_bw -= getattr(vlink, "bandwidth", 0)
+                self._adjust_bw(link, -getattr(vlink, "bandwidth", 0))
 
     # ---------------- COST FUNCTION ----------------
     def compute_cost(self, node_mapping, link_mapping) -> float:
@@ -177,13 +307,24 @@ class MC_VNM:
 
     # ---------------- RELEASE EXPIRED ----------------
     def release_expired_requests(self, current_time: float):
-        expired_ids = [rid for rid, info in self._active_mappings.items() if info["expire_time"] <= current_time]
-        for rid in expired_ids:
-            info = self._active_mappings.pop(rid)
+        with self.profiler.phase("release_expired_requests"):
+            self._release_expired_requests(current_time)
+
+    def _release_expired_requests(self, current_time: float):
+        nodes = self.substrate.node_store.entities
+        links = self.substrate.link_store.entities
+        while self._expiry_heap and self._expiry_heap[0][0] <= current_time:
+            _, _, rid = heapq.heappop(self._expiry_heap)
+            info = self._active_mappings.pop(rid, None)
+            if info is None:
+                continue
             # release CPU
-            for vnode, snode in info["node_mapping"].items():
-                snode.available_cpu += vnode.cpu_demand
+            for idx, cpu in info["node_mapping"]:
+                nodes[idx].available_cpu += cpu
             # release bandwidth
-            for path in info["link_mapping"].values():
-                for link in path:
-                    link.available_bw += getattr(link, "bandwidth", 0)
+            for idx, bw in info["link_mapping"]:
+                self._adjust_bw(links[idx], bw)
+
+    def next_expiry(self) -> Optional[float]:
+        """Thời điểm mapping sớm nhất hết hạn, None nếu không còn mapping nào."""
+        return self._expiry_heap[0][0] if self._expiry_heap else None
@@ -0,0 +1,120 @@
+from typing import Callable, Dict, List, Optional, Tuple
+from src.algorithms.MP_VNE.local_controller import LocalController
+from src.types.substrate import SubstrateNetwork, SubstrateNode, SubstrateLink
+
+# Số entry (ngưỡng bandwidth khác nhau) tối đa giữ cho mỗi cặp boundary node
+MAX_ENTRIES_PER_PAIR = 8
+
+
+class _IntraPath:
+    """
+    Đường đi nội miền giữa hai boundary node, tính với ngưỡng bandwidth `threshold`.
+
+    Path tối ưu trên tập link có available_bw >= threshold nên cũng tối ưu cho mọi
+    bw trong [threshold, bottleneck]: tập link tương ứng nhỏ hơn nhưng vẫn chứa path.
+    path = None nghĩa là không có đường đi (đúng với mọi bw >= threshold).
+    """
+
+    def __init__(self, threshold: float, path: Optional[List[SubstrateLink]]):
+        self.threshold = threshold
+        self.path = path
+        if path:
+            self.bottleneck = min(link.available_bw for link in path)
+            self.delay = sum(link.delay for link in path)
+            self.cost = sum(link.cost_per_unit for link in path)
+        else:
+            self.bottleneck = float('inf')
+            self.delay = 0.0
+            self.cost = 0.0
+
+    def covers(self, bw_required: float) -> bool:
+        return self.threshold <= bw_required <= self.bottleneck
+
+
+class BoundaryOverlay:
+    """
+    Overlay graph persistent giữa các boundary node; GlobalController._layered_shortest_path
+    duyệt các domain trung gian qua neighbors().
+
+    - Cạnh inter-domain: lấy trực tiếp từ SubstrateNetwork.adjacency, lọc theo bandwidth khi query.
+    - Cạnh nội miền boundary <-> boundary: path từ LocalController.shortest_path, cache theo
+      ngưỡng bandwidth và chỉ bị huỷ khi bandwidth của một link liên quan vượt qua ngưỡng đó
+      (xem bandwidth_changed).
+    """
+
+    def __init__(self, snetwork: SubstrateNetwork, get_local_controller: Callable[[int], LocalController]):
+        self.snetwork = snetwork
+        self._get_local_controller = get_local_controller
+        # domain_id -> {(b_src, b_dst): [_IntraPath]}
+        self._entries: Dict[int, Dict[Tuple[SubstrateNode, SubstrateNode], List[_IntraPath]]] = {}
+
+    # ---------------- Public interface ----------------
+    def neighbors(self, u: SubstrateNode, bw_required: float):
+        """Các cạnh overlay kề u: (v, weight, links) với weight = sum(delay + cost_per_unit * bw)."""
+        for link in self.snetwork.adjacency.get(u, ()):
+            if link.available_bw >= bw_required:
+                v = link.dst if link.src == u else link.src
+                yield v, link.delay + link.cost_per_unit * bw_required, [link]
+        yield from self.intra_edges(u, bw_required)
+
+    def intra_edges(self, u: SubstrateNode, bw_required: float):
+        """Cạnh nội miền từ boundary node u tới các boundary node khác cùng domain."""
+        if u.domain_id is None:
+            return
+        b_nodes = self._get_local_controller(u.domain_id).domain.boundary_nodes
+        if u not in b_nodes:
+            return
+        for v in b_nodes:
+            if v == u:
+                continue
+            entry = self._lookup(u, v, bw_required)
+            if entry.path:
+                path = entry.path if u.node_id < v.node_id else entry.path[::-1]
+                yield v, entry.delay + entry.cost * bw_required, path
+
+    def bandwidth_changed(self, link: SubstrateLink, old_bw: float) -> None:
+        """
+        Gọi sau mỗi lần available_bw của link thay đổi (từ old_bw sang link.available_bw).
+        Chỉ huỷ các entry mà ngưỡng bandwidth của chúng bị link vượt qua.
+        """
+        if link.src.domain_id != link.dst.domain_id:
+            return  # inter-domain link được lọc trực tiếp khi query
+        pairs = self._entries.get(link.src.domain_id)
+        if not pairs:
+            return
+        new_bw = link.available_bw
+
+        for key, entries in pairs.items():
+            kept = []
+            for entry in entries:
+                if new_bw > old_bw:
+                    # Link mới đủ điều kiện cho ngưỡng này -> có thể có path tốt hơn
+                    if old_bw < entry.threshold <= new_bw:
+                        continue
+                elif entry.path and link in entry.path:
+                    if new_bw < entry.threshold:
+                        continue
+                    entry.bottleneck = min(entry.bottleneck, new_bw)
+                kept.append(entry)
+            pairs[key] = kept
+
+    def clear(self) -> None:
+        self._entries.clear()
+
+    # ---------------- Internal helpers ----------------
+    def _lookup(self, u: SubstrateNode, v: SubstrateNode, bw_required: float) -> _IntraPath:
+        # Path vô hướng: dùng chung entry cho (u, v) và (v, u)
+        key = (u, v) if u.node_id < v.node_id else (v, u)
+        pairs = self._entries.setdefault(u.domain_id, {})
+        entries = pairs.setdefault(key, [])
+        for entry in entries:
+            if entry.covers(bw_required):
+                return entry
+
+        lc = self._get_local_controller(u.domain_id)
+        path = lc.shortest_path(key[0], key[1], bw_required=bw_required)
+        entry = _IntraPath(bw_required, path or None)
+        entries.append(entry)
+        if len(entries) > MAX_ENTRIES_PER_PAIR:
+            entries.pop(0)
+        return entry
@@ -1,16 +1,36 @@
-from typing import List, Dict
+from typing import List, Dict, Tuple
 import heapq
+from itertools import chain
+from src.algorithms.bottleneck_index import BottleneckIndex
+from src.algorithms.MP_VNE.boundary_overlay import BoundaryOverlay
 from src.algorithms.MP_VNE.local_controller import LocalController
-from src.types.substrate import SubstrateNetwork, SubstrateNode, InterLink
+from src.algorithms.MP_VNE.path_cost_cache import MISS, PathCostCache
+from src.types.substrate import SubstrateDomain, SubstrateNetwork, SubstrateNode, InterLink
 from src.types.virtual import VirtualLink, VirtualNetwork, VirtualNode
+from src.utils.profiler import NULL_PROFILER, Profiler
 
 
 class GlobalController:
-    def __init__(self, snetwork: SubstrateNetwork):
+    def __init__(self, snetwork: SubstrateNetwork, bw_bucket_size: float = 1.0, profiler: Profiler = NULL_PROFILER):
         self.snetwork = snetwork
-        self.local_controllers: List[LocalController] = [LocalController(d) for d in snetwork.domains]
+        self.profiler = profiler
+        self.local_controllers: List[LocalController] = [LocalController(d, profiler) for d in snetwork.domains]
+        # domain_id -> LocalController; node -> domain tra qua SubstrateNode.domain_id
+        self._controllers: Dict[int, LocalController] = {lc.domain.domain_id: lc for lc in self.local_controllers}
+        self.overlay = BoundaryOverlay(snetwork, self._get_local_controller)
+        self.path_cache = PathCostCache(bucket_size=bw_bucket_size)
+        # Loại các cặp node không nối được ở ngưỡng bandwidth trước khi chạy Dijkstra
+        self.bottleneck = BottleneckIndex(snetwork, profiler)
 
     # ---------------- Public interface ----------------
+    def add_domain(self, domain: SubstrateDomain) -> LocalController:
+        """Thêm domain vào substrate và tạo LocalController tương ứng."""
+        self.snetwork.add_domain(domain)
+        lc = LocalController(domain, self.profiler)
+        self.local_controllers.append(lc)
+        self._controllers[domain.domain_id] = lc
+        return lc
+
     def process_request(self, request: VirtualNetwork) -> List[List[SubstrateNode]]:
         """Tìm candidate nodes cho từng vnode của request."""
         all_candidates = []
@@ -46,7 +66,7 @@ class GlobalController:
                 for link in path:
                     if link.available_bw < vlink.bandwidth:
                         raise ValueError(f"Insufficient BW on link {link.src.node_id}->{link.dst.node_id}")
-                    link.available_bw -= vlink.bandwidth
+                    self._adjust_bw(link, -vlink.bandwidth)
                     allocated_bw[link] = allocated_bw.get(link, 0) + vlink.bandwidth
                 vlink_paths[vlink] = path  # lưu snapshot path
 
@@ -55,7 +75,7 @@ class GlobalController:
             for snode, cpu in allocated_cpu.items():
                 snode.available_cpu += cpu
             for link, bw in allocated_bw.items():
-                link.available_bw += bw
+                self._adjust_bw(link, bw)
             raise e
 
         return vlink_paths  # trả về để MP_VNE lưu
@@ -71,7 +91,7 @@ class GlobalController:
         # Free BW
         for vlink, path in vlink_paths.items():
             for link in path:
-                link.available_bw += vlink.bandwidth
+                self._adjust_bw(link, vlink.bandwidth)
 
     def release_resources(self):
         """Reset toàn bộ resources (dùng khi muốn xóa hết tất cả mapping)."""
@@ -79,115 +99,189 @@ class GlobalController:
             lc.reset_allocations()
         for link in self.snetwork.links:
             link.available_bw = link.bandwidth
+        self.overlay.clear()
+        self.path_cache.clear()
+        self.bottleneck.invalidate()
 
     # ---------------- Internal helpers ----------------
     def _get_local_controller(self, domain_id: int) -> LocalController:
-        for lc in self.local_controllers:
-            if lc.domain.domain_id == domain_id:
-                return lc
-        raise ValueError(f"No LocalController for domain {domain_id}")
+        lc = self._controllers.get(domain_id)
+        if lc is None and self._sync_controllers():
+            lc = self._controllers.get(domain_id)
+        if lc is None:
+            raise ValueError(f"No LocalController for domain {domain_id}")
+        return lc
 
-    def _interdomain_shortest_path(self, src_boundary: SubstrateNode, dst_boundary: SubstrateNode, bw_required: float = 0.0) -> List[InterLink]:
-        """Dijkstra trên InterLink giữa boundary nodes khác domain."""
-        graph: Dict[SubstrateNode, List[tuple]] = {}
-        nodes = set()
+    def _sync_controllers(self) -> bool:
+        """Tạo LocalController cho các domain được thêm thẳng vào snetwork. Trả về True nếu có thay đổi."""
+        changed = False
+        for domain in self.snetwork.domains:
+            if domain.domain_id not in self._controllers:
+                lc = LocalController(domain, self.profiler)
+                self.local_controllers.append(lc)
+                self._controllers[domain.domain_id] = lc
+                changed = True
+        return changed
 
-        # Xây graph chỉ gồm inter-domain links đủ BW
-        for link in self.snetwork.links:
-            if link.available_bw >= bw_required:
-                graph.setdefault(link.src, []).append((link.dst, link))
-                graph.setdefault(link.dst, []).append((link.src, link))
-                nodes.add(link.src)
-                nodes.add(link.dst)
-
-        # Thêm đường đi nội bộ boundary nodes từ LocalController
-        for lc in self.local_controllers:
-            b_nodes = lc.domain.boundary_nodes
-            for i in range(len(b_nodes)):
-                for j in range(i+1, len(b_nodes)):
-                    src_b, dst_b = b_nodes[i], b_nodes[j]
-                    path = lc.shortest_path(src_b, dst_b, bw_required=bw_required)
-                    if not path:
-                        continue
-                    total_delay = sum(l.delay for l in path)
-                    total_cost = sum(l.cost_per_unit * bw_required for l in path)
-                    temp_link_1 = InterLink(src=src_b, dst=dst_b, bandwidth=float('inf'), cost_per_unit=total_cost, delay=total_delay, 
-                            src_domain=lc.domain.domain_id,
-                            dst_domain=lc.domain.domain_id)
-                    temp_link_2 = InterLink(src=dst_b, dst=src_b, bandwidth=float('inf'), cost_per_unit=total_cost, delay=total_delay, 
-                            src_domain=lc.domain.domain_id,
-                            dst_domain=lc.domain.domain_id)
-                    graph.setdefault(src_b, []).append((dst_b, temp_link_1))
-                    graph.setdefault(dst_b, []).append((src_b, temp_link_2))
-                    nodes.add(src_b)
-                    nodes.add(dst_b)
-
-        # Dijkstra
-        dist = {n: float('inf') for n in nodes}
-        prev_link = {n: None for n in nodes}
-        dist[src_boundary] = 0
-        pq = [(0, src_boundary)]
-
-        while pq:
-            cost_u, u = heapq.heappop(pq)
-            if u == dst_boundary:
-                break
-            for v, link in graph.get(u, []):
-                alt = dist[u] + link.delay + link.cost_per_unit * bw_required
-                if alt < dist[v]:
-                    dist[v] = alt
-                    prev_link[v] = link
-                    heapq.heappush(pq, (alt, v))
-
-        # Reconstruct path
-        path: List[InterLink] = []
-        node = dst_boundary
-        while node != src_boundary:
-            link = prev_link[node]
-            if link is None:
-                return []  # Không có path
-            path.append(link)
-            node = link.src if link.dst == node else link.dst
-        path.reverse()
-        return path
+    def _adjust_bw(self, link, delta: float) -> None:
+        """Cập nhật available_bw và báo cho các cache phụ thuộc bandwidth."""
+        old_bw = link.available_bw
+        link.available_bw = old_bw + delta
+        self.overlay.bandwidth_changed(link, old_bw)
+        self.path_cache.bandwidth_changed(link, old_bw)
+        self.bottleneck.bandwidth_changed(link, old_bw)
 
     def shortest_path(self, src: SubstrateNode, dst: SubstrateNode, bw_required: float = 0.0) -> List[InterLink]:
         """Return shortest path kết hợp intra-domain và inter-domain."""
+        with self.profiler.phase("shortest_path"):
+            return self._shortest_path(src, dst, bw_required)
+
+    def _shortest_path(self, src: SubstrateNode, dst: SubstrateNode, bw_required: float) -> List[InterLink]:
         src_domain = self._get_domain_id(src)
         dst_domain = self._get_domain_id(dst)
         if src_domain == dst_domain:
             lc = self._get_local_controller(src_domain)
             return lc.shortest_path(src, dst, bw_required=bw_required)
 
-        # Ghép path: src->boundary + inter-domain + boundary->dst
-        lc_src = self._get_local_controller(src_domain)
-        lc_dst = self._get_local_controller(dst_domain)
-        boundary_src_nodes = lc_src.domain.boundary_nodes
-        boundary_dst_nodes = lc_dst.domain.boundary_nodes
-
-        best_cost = float('inf')
-        best_path: List[InterLink] = []
-
-        for b_src in boundary_src_nodes:
-            path_src = lc_src.shortest_path(src, b_src, bw_required=bw_required)
-            for b_dst in boundary_dst_nodes:
-                path_dst = lc_dst.shortest_path(b_dst, dst, bw_required=bw_required)
-                inter_path = self._interdomain_shortest_path(b_src, b_dst, bw_required=bw_required)
-                if not inter_path:
-                    continue
-                total_path = path_src + inter_path + path_dst
-                total_cost = sum(l.delay + l.cost_per_unit * bw_required for l in total_path)
-                if total_cost < best_cost:
-                    best_cost = total_cost
-                    best_path = total_path
-        
-        if best_cost == float('inf'):
+        path = self._layered_shortest_path(src, dst, bw_required=bw_required)
+        if path is None:
             raise Exception("Cannot find optimal path")
-        
-        return best_path
+        return path
+
+    def shortest_path_cost(self, src: SubstrateNode, dst: SubstrateNode, bw_required: float = 0.0) -> float:
+        """
+        Chi phí sum(delay + cost_per_unit * bw_required) của shortest path, inf nếu không có path.
+        Path được cache theo (src, dst, bandwidth bucket) trong self.path_cache.
+        """
+        if src == dst:
+            return 0.0
+        key = self.path_cache.key(src, dst, bw_required)
+        entry = self.path_cache.lookup(key)
+        if entry is MISS:
+            self.profiler.count("path_cache_misses")
+            entry = self.path_cache.store(key, self._find_path(src, dst, self.path_cache.threshold(key)))
+        else:
+            self.profiler.count("path_cache_hits")
+        if entry.path is None:
+            return float('inf')
+        return entry.delay + entry.cost * bw_required
+
+    def shortest_path_costs(self, queries: List[Tuple[SubstrateNode, SubstrateNode, float]], evaluator=None) -> List[float]:
+        """
+        Phiên bản batch của shortest_path_cost cho queries (src, dst, bw_required).
+        Các path chưa có trong cache được tính bằng evaluator.shortest_paths (vd. ParallelPathEvaluator)
+        nếu có, ngược lại tính tuần tự bằng shortest_path.
+        """
+        costs = [0.0] * len(queries)
+        pending: Dict[Tuple, List[int]] = {}
+        for i, (src, dst, bw) in enumerate(queries):
+            if src == dst:
+                continue
+            key = self.path_cache.key(src, dst, bw)
+            if key in pending:
+                pending[key].append(i)
+                continue
+            entry = self.path_cache.lookup(key)
+            if entry is MISS:
+                pending[key] = [i]
+            else:
+                costs[i] = float('inf') if entry.path is None else entry.delay + entry.cost * bw
+
+        self.profiler.count("path_cache_misses", len(pending))
+        self.profiler.count("path_cache_hits", len(queries) - sum(len(idx) for idx in pending.values()))
+        if not pending:
+            return costs
+        # Cặp không nối được ở ngưỡng của bucket: biết ngay là không có path, không gửi cho evaluator
+        keys = []
+        for key in pending:
+            if self.bottleneck.connected(key[0], key[1], self.path_cache.threshold(key)):
+                keys.append(key)
+                continue
+            self.profiler.count("bottleneck_pruned")
+            self.path_cache.store(key, None)
+            for i in pending[key]:
+                costs[i] = float('inf')
+        if not keys:
+            return costs
+        if evaluator is None:
+            paths = [self._find_path(key[0], key[1], self.path_cache.threshold(key)) for key in keys]
+        else:
+            with self.profiler.phase("parallel_shortest_paths"):
+                paths = evaluator.shortest_paths([(key[0], key[1], self.path_cache.threshold(key)) for key in keys])
+        for key, path in zip(keys, paths):
+            entry = self.path_cache.store(key, path or None)
+            for i in pending[key]:
+                costs[i] = float('inf') if entry.path is None else entry.delay + entry.cost * queries[i][2]
+        return costs
+
+    def _find_path(self, src: SubstrateNode, dst: SubstrateNode, bw_required: float):
+        """shortest_path nhưng trả về None thay vì raise / [] khi không có path (bottleneck index loại trước Dijkstra)."""
+        if not self.bottleneck.connected(src, dst, bw_required):
+            self.profiler.count("bottleneck_pruned")
+            return None
+        try:
+            return self.shortest_path(src, dst, bw_required=bw_required) or None
+        except Exception:
+            return None
+
+    def _layered_shortest_path(self, src: SubstrateNode, dst: SubstrateNode, bw_required: float = 0.0):
+        """
+        Một lần Dijkstra trên layered graph: domain nguồn -> overlay boundary -> domain đích.
+
+        Trong domain nguồn và đích duyệt trực tiếp các link nội miền; ở các domain trung gian
+        chỉ đi qua cạnh boundary <-> boundary của overlay. Mọi cạnh có trọng số
+        delay + cost_per_unit * bw_required, cùng công thức dùng để so sánh path trước đây.
+        Trả về None nếu không có path.
+        """
+        endpoint_adjacency = {
+            src.domain_id: self._get_local_controller(src.domain_id).domain.adjacency,
+            dst.domain_id: self._get_local_controller(dst.domain_id).domain.adjacency,
+        }
+        inter_adjacency = self.snetwork.adjacency
+
+        dist = {src: 0}
+        prev: Dict[SubstrateNode, tuple] = {}
+        pq = [(0, src.node_id, src)]
+        pops = 0
+
+        while pq:
+            cost_u, _, u = heapq.heappop(pq)
+            pops += 1
+            if u == dst:
+                break
+            if cost_u > dist[u]:
+                continue
+
+            intra_adjacency = endpoint_adjacency.get(u.domain_id)
+            if intra_adjacency is None:
+                edges = self.overlay.neighbors(u, bw_required)
+            else:
+                edges = (
+                    (link.dst if link.src == u else link.src, link.delay + link.cost_per_unit * bw_required, (link,))
+                    for link in chain(intra_adjacency.get(u, ()), inter_adjacency.get(u, ()))
+                    if link.available_bw >= bw_required
+                )
+
+            for v, weight, links in edges:
+                alt = cost_u + weight
+                if alt < dist.get(v, float('inf')):
+                    dist[v] = alt
+                    prev[v] = (u, links)
+                    heapq.heappush(pq, (alt, v.node_id, v))
+
+        self.profiler.count("layered_dijkstra_calls")
+        self.profiler.count("layered_dijkstra_heap_pops", pops)
+        if dst not in prev:
+            return None
+        segments = []
+        node = dst
+        while node != src:
+            node, links = prev[node]
+            segments.append(links)
+        segments.reverse()
+        return [link for links in segments for link in links]
 
     def _get_domain_id(self, node: SubstrateNode) -> int:
-        for lc in self.local_controllers:
-            if node in lc.domain.nodes:
-                return lc.domain.domain_id
-        raise ValueError(f"Node {node.node_id} not found in any domain")
\ No newline at end of file
+        if node.domain_id is None:
+            raise ValueError(f"Node {node.node_id} not found in any domain")
+        return node.domain_id
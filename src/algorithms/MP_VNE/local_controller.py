@@ -1,51 +1,51 @@
 from typing import List
 import heapq
 from src.types.substrate import SubstrateDomain, SubstrateNode, SubstrateLink
+from src.utils.profiler import NULL_PROFILER, Profiler
 
 # ---------------- Local Controller ----------------
 class LocalController:
-    def __init__(self, domain: SubstrateDomain):
+    def __init__(self, domain: SubstrateDomain, profiler: Profiler = NULL_PROFILER):
         self.domain = domain
+        self.profiler = profiler
 
     def get_candidates(self, vnode) -> List[SubstrateNode]:
-        candidates = []
-        for node in self.domain.nodes:
-            if node.available_cpu >= vnode.cpu_demand:
-                candidates.append(node)
-        return candidates
+        """Các node đủ CPU cho vnode, theo available_cpu tăng dần (tra từ capacity index của domain)."""
+        return self.domain.nodes_with_cpu(vnode.cpu_demand)
 
     def shortest_path(self, src: SubstrateNode, dst: SubstrateNode, bw_required: float = 0.0) -> List[SubstrateLink]:
         if src.node_id == dst.node_id:
             return []
 
-        dist = {node: float('inf') for node in self.domain.nodes}
-        prev = {node: None for node in self.domain.nodes}
-        dist[src] = 0
-        pq = [(0, src)]
+        adjacency = self.domain.adjacency
+        dist = {src: 0}
+        prev = {}
+        pq = [(0, src.node_id, src)]
+        pops = 0
 
         while pq:
-            cost_u, u = heapq.heappop(pq)
+            cost_u, _, u = heapq.heappop(pq)
+            pops += 1
             if u == dst:
                 break
-            for link in self.domain.links:
-                if link.src == u:
-                    v = link.dst
-                elif link.dst == u:
-                    v = link.src
-                else:
-                    continue
+            if cost_u > dist[u]:
+                continue
+            for link in adjacency.get(u, ()):
                 if link.available_bw < bw_required:
                     continue
-                alt = dist[u] + link.delay + link.cost_per_unit
-                if alt < dist[v]:
+                v = link.dst if link.src == u else link.src
+                alt = cost_u + link.delay + link.cost_per_unit
+                if alt < dist.get(v, float('inf')):
                     dist[v] = alt
                     prev[v] = link
-                    heapq.heappush(pq, (alt, v))
+                    heapq.heappush(pq, (alt, v.node_id, v))
 
+        self.profiler.count("local_dijkstra_calls")
+        self.profiler.count("local_dijkstra_heap_pops", pops)
         path = []
         node = dst
         while node != src:
-            link = prev[node]
+            link = prev.get(node)
             if link is None:
                 return []
             path.append(link)
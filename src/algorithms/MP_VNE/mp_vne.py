@@ -1,27 +1,62 @@
-import random
+import heapq
 import time
 import uuid
-from typing import List, Dict
+from typing import List, Dict, Optional, Tuple
 from collections import OrderedDict
 
+import numpy as np
+
+from src.algorithms.admission import AdmissionControl
 from src.algorithms.MP_VNE.global_controller import GlobalController
+from src.algorithms.MP_VNE.parallel_fitness import ParallelPathEvaluator
+from src.algorithms.MP_VNE.pso_config import PSOConfig
+from src.algorithms.MP_VNE.swarm_fitness import SwarmFitness
 from src.types.substrate import SubstrateNetwork, SubstrateNode
 from src.types.virtual import VirtualNetwork, VirtualNode, VirtualLink
 from src.types.request import VirtualRequest
+from src.utils.profiler import NULL_PROFILER, Profiler
 
 
 class MP_VNE:
-    def __init__(self, snetwork: SubstrateNetwork) -> None:
-        self.global_controller: GlobalController = GlobalController(snetwork)
-        self._active_mappings: Dict[str, Dict] = OrderedDict()  # request_id -> {"mapping", "vlinks", "vlink_paths", "expire_time"}
+    def __init__(self, snetwork: SubstrateNetwork, pso_config: Optional[PSOConfig] = None, seed: Optional[int] = None,
+                 path_evaluator: Optional[ParallelPathEvaluator] = None, profiler: Optional[Profiler] = None,
+                 admission: bool = True) -> None:
+        # Timer / counter theo phase (tắt mặc định), dùng chung với GlobalController và các LocalController
+        self.profiler: Profiler = profiler if profiler is not None else NULL_PROFILER
+        self.global_controller: GlobalController = GlobalController(snetwork, profiler=self.profiler)
+        # Loại request chắc chắn không map được trước process_request + PSO (None = tắt).
+        # Candidate lấy từ mọi domain và commit trừ CPU lần lượt nên CPU cộng dồn giữa các vnode.
+        self.admission: Optional[AdmissionControl] = (
+            AdmissionControl(snetwork, respect_domains=False, accumulate_cpu=True,
+                             bottleneck=self.global_controller.bottleneck) if admission else None
+        )
+        # Nếu có, các path cost còn thiếu của mỗi thế hệ PSO được tính song song
+        self.path_evaluator = path_evaluator
+        self.pso_config: PSOConfig = pso_config if pso_config is not None else PSOConfig()
+        self.rng: np.random.Generator = np.random.default_rng(seed)
+        self._active_mappings: Dict[str, Dict] = OrderedDict()  # request_id -> {"mapping", "vlinks", "vlink_paths", "expire_time", "pso"}
+        # Min-heap (expire_time, seq, request_id): release chỉ tốn chi phí cho các mapping thực sự hết hạn
+        self._expiry_heap: List[Tuple[float, int, str]] = []
+        self._expiry_seq: int = 0
 
     def handle_mapping_request(self, request: VirtualRequest, current_time: float):
+        with self.profiler.phase("handle_mapping_request"):
+            return self._handle_mapping_request(request, current_time)
+
+    def _handle_mapping_request(self, request: VirtualRequest, current_time: float):
         request_id = str(uuid.uuid4())
         vnetwork = request["vnetwork"]
         lifetime = request.get("lifetime", 1000)
+        profiler = self.profiler
 
-        candidate_nodes = self.global_controller.process_request(vnetwork)
-        best_particle_idx = self.pso(candidate_nodes, request)
+        if self.admission is not None:
+            with profiler.phase("admission"):
+                self.admission.check(vnetwork)
+        with profiler.phase("process_request"):
+            candidate_nodes = self.global_controller.process_request(vnetwork)
+        with profiler.phase("pso"):
+            best_particle_idx, pso_info = self.pso(candidate_nodes, request)
+        profiler.count("pso_iterations", pso_info["iterations"])
 
         best_mapping = {
             vnode: candidate_nodes[i][idx]
@@ -30,7 +65,8 @@ class MP_VNE:
         vlinks = getattr(vnetwork, "links", [])
         # Commit và lấy snapshot path
         try:
-            vlink_paths = self.global_controller.commit_mapping(best_mapping, vlinks=vlinks)
+            with profiler.phase("commit_mapping"):
+                vlink_paths = self.global_controller.commit_mapping(best_mapping, vlinks=vlinks)
         except ValueError:
             raise
 
@@ -39,80 +75,115 @@ class MP_VNE:
             "mapping": best_mapping,
             "vlinks": vlinks,
             "vlink_paths": vlink_paths,  # snapshot path
-            "expire_time": current_time + lifetime
+            "expire_time": current_time + lifetime,
+            "pso": pso_info  # {"iterations", "stop_reason", "best_fitness"}
         }
+        heapq.heappush(self._expiry_heap, (current_time + lifetime, self._expiry_seq, request_id))
+        self._expiry_seq += 1
 
-        cost = self.fitness(best_particle_idx, candidate_nodes, request)
+        with profiler.phase("fitness"):
+            cost = self.fitness(best_particle_idx, candidate_nodes, request)
         return request_id, cost, self._active_mappings[request_id]
 
     def release_expired_requests(self, current_time: float) -> None:
-        """Giải phóng các mapping hết lifetime"""
-        expired_ids = [rid for rid, info in self._active_mappings.items() if info["expire_time"] <= current_time]
-        for rid in expired_ids:
-            info = self._active_mappings.pop(rid)
-            self.global_controller.release_mapping(info["mapping"], info["vlink_paths"])  # dùng snapshot path
+        """Giải phóng các mapping hết lifetime, theo thứ tự expire_time (cùng thời điểm: theo thứ tự map)."""
+        with self.profiler.phase("release_expired_requests"):
+            while self._expiry_heap and self._expiry_heap[0][0] <= current_time:
+                _, _, rid = heapq.heappop(self._expiry_heap)
+                info = self._active_mappings.pop(rid, None)
+                if info is not None:
+                    self.global_controller.release_mapping(info["mapping"], info["vlink_paths"])  # dùng snapshot path
+
+    def next_expiry(self) -> Optional[float]:
+        """Thời điểm mapping sớm nhất hết hạn, None nếu không còn mapping nào."""
+        return self._expiry_heap[0][0] if self._expiry_heap else None
 
     # ---------------- PSO & mapping ----------------
-    def pso(self, candidates: List[List[SubstrateNode]], request: VirtualRequest) -> List[int]:
-        num_particles: int = 50
-        num_iterations: int = 30
+    def pso(self, candidates: List[List[SubstrateNode]], request: VirtualRequest) -> Tuple[List[int], Dict]:
+        """
+        Trả về (gbest, info) với info = {"iterations", "stop_reason", "best_fitness"}.
+        stop_reason: "max_iterations" | "stalled" | "target_fitness" | "time_budget".
+        """
+        config = self.pso_config
+        num_particles: int = config.num_particles
         num_vnode: int = len(candidates)
-
-        population: List[List[int]] = [
-            [random.randint(0, len(candidates[j]) - 1) for j in range(num_vnode)]
-            for _ in range(num_particles)
-        ]
-        velocities: List[List[float]] = [[0.0 for _ in range(num_vnode)] for _ in range(num_particles)]
-
-        pbest: List[List[int]] = [p[:] for p in population]
-        pbest_score: List[float] = [self.fitness(p, candidates, request) for p in population]
-
-        gbest_idx: int = pbest_score.index(min(pbest_score))
-        gbest: List[int] = pbest[gbest_idx][:]
-        gbest_score: float = pbest_score[gbest_idx]
-
-        w, c1, c2 = 0.7, 1.5, 1.5
-
-        for _ in range(num_iterations):
-            for i in range(num_particles):
-                for j in range(num_vnode):
-                    r1, r2 = random.random(), random.random()
-                    velocities[i][j] = (
-                        w * velocities[i][j]
-                        + c1 * r1 * (pbest[i][j] - population[i][j])
-                        + c2 * r2 * (gbest[j] - population[i][j])
-                    )
-                    new_idx: int = int(round(population[i][j] + velocities[i][j])) % len(candidates[j])
-                    population[i][j] = new_idx
-
-                if random.random() < 0.1:
-                    mut_idx = random.randint(0, num_vnode - 1)
-                    population[i][mut_idx] = random.randint(0, len(candidates[mut_idx]) - 1)
-
-                score: float = self.fitness(population[i], candidates, request)
-                if score < pbest_score[i]:
-                    pbest[i] = population[i][:]
-                    pbest_score[i] = score
-
-            current_best_score: float = min(pbest_score)
-            if current_best_score < gbest_score:
-                gbest = pbest[pbest_score.index(current_best_score)][:]
-                gbest_score = current_best_score
-            
-        return gbest
+        rng = self.rng
+        start = time.perf_counter()
+
+        sizes = np.array([len(c) for c in candidates])
+        if (sizes == 0).any():
+            raise ValueError("No candidate substrate node for some virtual node")
+        swarm_fitness = SwarmFitness(self.global_controller, candidates, request, path_evaluator=self.path_evaluator)
+
+        # Swarm dạng mảng (num_particles, num_vnode), mỗi phần tử là chỉ số candidate
+        population: np.ndarray = rng.integers(0, sizes, size=(num_particles, num_vnode))
+        velocities: np.ndarray = np.zeros((num_particles, num_vnode))
+
+        pbest: np.ndarray = population.copy()
+        pbest_score: np.ndarray = swarm_fitness(population)
+
+        gbest_idx: int = int(np.argmin(pbest_score))
+        gbest: np.ndarray = pbest[gbest_idx].copy()
+        gbest_score: float = float(pbest_score[gbest_idx])
+
+        w, c1, c2 = config.w, config.c1, config.c2
+        iterations: int = 0
+        stall: int = 0
+        stop_reason: str = self._stop_reason(gbest_score, stall, start) or "max_iterations"
+
+        while stop_reason == "max_iterations" and iterations < config.num_iterations:
+            r1 = rng.random((num_particles, num_vnode))
+            r2 = rng.random((num_particles, num_vnode))
+            velocities = w * velocities + c1 * r1 * (pbest - population) + c2 * r2 * (gbest - population)
+            population = np.rint(population + velocities).astype(np.int64) % sizes
+
+            # Đột biến: mỗi particle có xác suất mutation_rate đổi ngẫu nhiên một vnode
+            mutated = np.flatnonzero(rng.random(num_particles) < config.mutation_rate)
+            if mutated.size:
+                mut_idx = rng.integers(0, num_vnode, size=mutated.size)
+                population[mutated, mut_idx] = rng.integers(0, sizes[mut_idx])
+
+            scores: np.ndarray = swarm_fitness(population)
+            improved = scores < pbest_score
+            pbest[improved] = population[improved]
+            pbest_score[improved] = scores[improved]
+
+            best_idx = int(np.argmin(pbest_score))
+            if pbest_score[best_idx] < gbest_score:
+                gbest = pbest[best_idx].copy()
+                gbest_score = float(pbest_score[best_idx])
+                stall = 0
+            else:
+                stall += 1
+            iterations += 1
+            stop_reason = self._stop_reason(gbest_score, stall, start) or "max_iterations"
+
+        info = {"iterations": iterations, "stop_reason": stop_reason, "best_fitness": gbest_score}
+        return gbest.tolist(), info
+
+    def _stop_reason(self, gbest_score: float, stall: int, start: float) -> Optional[str]:
+        config = self.pso_config
+        if config.target_fitness is not None and gbest_score <= config.target_fitness:
+            return "target_fitness"
+        if config.stall_iterations is not None and stall >= config.stall_iterations:
+            return "stalled"
+        if config.time_budget is not None and time.perf_counter() - start >= config.time_budget:
+            return "time_budget"
+        return None
 
     def fitness(self, particle_idx: List[int], candidates: List[List[SubstrateNode]], request: VirtualRequest) -> float:
         vnetwork: VirtualNetwork = request["vnetwork"]
         vnodes: List[VirtualNode] = vnetwork.nodes
-        vlinks: List[VirtualLink] = getattr(vnetwork, "vlinks", [])
+        vlinks: List[VirtualLink] = vnetwork.links
 
         mapping: List[SubstrateNode] = [candidates[i][idx] for i, idx in enumerate(particle_idx)]
+        position: Dict[VirtualNode, int] = {vnode: i for i, vnode in enumerate(vnodes)}
 
         node_cost: float = sum(vnode.cpu_demand * snode.cost_per_unit for vnode, snode in zip(vnodes, mapping))
         link_cost: float = 0.0
         for vlink in vlinks:
-            src_node: SubstrateNode = mapping[vnodes.index(vlink.src)]
-            dst_node: SubstrateNode = mapping[vnodes.index(vlink.dst)]
+            src_node: SubstrateNode = mapping[position[vlink.src]]
+            dst_node: SubstrateNode = mapping[position[vlink.dst]]
             link_cost += self.global_controller.shortest_path_cost(src_node, dst_node, bw_required=vlink.bandwidth)
 
-        return node_cost + link_cost
\ No newline at end of file
+        return node_cost + link_cost
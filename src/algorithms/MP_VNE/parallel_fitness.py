@@ -0,0 +1,256 @@
+import heapq
+import os
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+from src.types.substrate import SubstrateNetwork, SubstrateNode
+
+# Dưới số query này thì tính luôn trong process chính, không gửi sang worker
+MIN_PARALLEL_QUERIES = 16
+
+
+class SubstrateSnapshot:
+    """
+    Snapshot read-only, gọn của topology substrate để gửi sang worker.
+
+    Chỉ gồm mảng NumPy (node_id / domain của node, đầu mút / delay / cost của link, adjacency
+    dạng CSR) và danh sách boundary node theo domain, nên pickle một lần khi khởi tạo pool thay vì pickle cả object graph cho mỗi lần gọi.
+    available_bw thay đổi theo thời gian nên được gửi riêng theo từng batch.
+
+    Topology (node, link) được coi là cố định sau khi tạo snapshot.
+    """
+
+    def __init__(self, snetwork: SubstrateNetwork):
+        nodes = [node for domain in snetwork.domains for node in domain.nodes]
+        links = [link for domain in snetwork.domains for link in domain.links] + list(snetwork.links)
+        index = {node: i for i, node in enumerate(nodes)}
+
+        # Chỉ số dense của link trong snetwork.link_store -> gather trực tiếp từ mảng
+        self._link_store = snetwork.link_store
+        self._link_idx = np.fromiter((link._idx for link in links), dtype=np.int64, count=len(links))
+
+        self.node_id = np.array([node.node_id for node in nodes], dtype=np.int64)
+        self.node_domain = np.array([node.domain_id for node in nodes], dtype=np.int64)
+        self.link_src = np.array([index[link.src] for link in links], dtype=np.int64)
+        self.link_dst = np.array([index[link.dst] for link in links], dtype=np.int64)
+        self.link_delay = self._link_store.delay[self._link_idx]
+        self.link_cost = self._link_store.cost_per_unit[self._link_idx]
+        # links = intra (theo domain) + inter: link_id >= num_intra là inter-domain link
+        self.num_intra = len(links) - len(snetwork.links)
+        # domain_id -> boundary node theo đúng thứ tự domain.boundary_nodes (thứ tự duyệt của overlay)
+        self.boundary = {domain.domain_id: [index[node] for node in domain.boundary_nodes] for domain in snetwork.domains}
+
+        # CSR adjacency: các link kề node i là adj_link[indptr[i]:indptr[i + 1]], theo link_id tăng dần
+        # (intra trước inter, cùng thứ tự với domain.adjacency / snetwork.adjacency)
+        ends = np.concatenate([self.link_src, self.link_dst])
+        link_ids = np.concatenate([np.arange(len(links)), np.arange(len(links))])
+        others = np.concatenate([self.link_dst, self.link_src])
+        order = np.lexsort((link_ids, ends))
+        self.indptr = np.concatenate([[0], np.cumsum(np.bincount(ends, minlength=len(nodes)))]).astype(np.int64)
+        self.adj_link = link_ids[order]
+        self.adj_node = others[order]
+
+        # Chỉ tồn tại ở process chính, không pickle
+        self._nodes: List[SubstrateNode] = nodes
+        self._links: List = links
+        self._index: Dict[SubstrateNode, int] = index
+        self._lists = None
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        state["_nodes"] = state["_links"] = state["_index"] = state["_lists"] = state["_link_store"] = None
+        return state
+
+    # ---------------- Main process side ----------------
+    def available_bw(self) -> np.ndarray:
+        return self._link_store.available_bw[self._link_idx]
+
+    def encode(self, src: SubstrateNode, dst: SubstrateNode) -> Tuple[int, int]:
+        return self._index[src], self._index[dst]
+
+    def decode_path(self, link_ids: Optional[List[int]]) -> Optional[List]:
+        if link_ids is None:
+            return None
+        return [self._links[i] for i in link_ids]
+
+    # ---------------- Worker side ----------------
+    def solve(self, available_bw, queries: List[Tuple[int, int, float]]) -> List[Optional[List[int]]]:
+        """queries: (src_idx, dst_idx, bw_required) -> path dạng danh sách chỉ số link, None nếu không có."""
+        if isinstance(available_bw, np.ndarray):
+            available_bw = available_bw.tolist()
+        if self._lists is None:
+            self._lists = (self.node_id.tolist(), self.node_domain.tolist(), self.indptr.tolist(),
+                           self.adj_link.tolist(), self.adj_node.tolist(), self.link_delay.tolist(),
+                           self.link_cost.tolist())
+        transit: Dict[Tuple[int, int, float], Optional[List[int]]] = {}  # path nội miền boundary <-> boundary của batch
+        return [self._shortest_path(available_bw, src, dst, bw, transit) for src, dst, bw in queries]
+
+    def _shortest_path(self, avail: List[float], src: int, dst: int, bw_required: float,
+                       transit: Dict) -> Optional[List[int]]:
+        """
+        Cùng routing với GlobalController.shortest_path để fitness không phụ thuộc việc có evaluator:
+        - cùng domain: như LocalController.shortest_path (trọng số delay + cost_per_unit);
+        - khác domain: như GlobalController._layered_shortest_path - domain nguồn / đích duyệt
+          trực tiếp, domain trung gian chỉ qua inter link và cạnh boundary <-> boundary của
+          overlay (path nội miền như trên), trọng số delay + cost_per_unit * bw_required.
+        Heap phá hoà theo node_id và cạnh duyệt theo cùng thứ tự như phía controller.
+        """
+        if self._lists[1][src] == self._lists[1][dst]:
+            return self._intra_path(avail, src, dst, bw_required)
+        return self._layered_path(avail, src, dst, bw_required, transit)
+
+    def _intra_path(self, avail: List[float], src: int, dst: int, bw_required: float) -> Optional[List[int]]:
+        node_id, _, indptr, adj_link, adj_node, delay, cost = self._lists
+        num_intra = self.num_intra
+        dist = {src: 0}
+        prev: Dict[int, Tuple[int, int]] = {}
+        pq = [(0, node_id[src], src)]
+        while pq:
+            cost_u, _, u = heapq.heappop(pq)
+            if u == dst:
+                break
+            if cost_u > dist[u]:
+                continue
+            for k in range(indptr[u], indptr[u + 1]):
+                link = adj_link[k]
+                if link >= num_intra or avail[link] < bw_required:
+                    continue
+                v = adj_node[k]
+                alt = cost_u + delay[link] + cost[link]
+                if alt < dist.get(v, float('inf')):
+                    dist[v] = alt
+                    prev[v] = (u, link)
+                    heapq.heappush(pq, (alt, node_id[v], v))
+
+        if dst not in prev:
+            return None
+        path = []
+        node = dst
+        while node != src:
+            node, link = prev[node]
+            path.append(link)
+        path.reverse()
+        return path
+
+    def _transit_edges(self, avail: List[float], u: int, bw_required: float, transit: Dict):
+        """Cạnh overlay kề boundary node u của domain trung gian (như BoundaryOverlay.neighbors)."""
+        node_id, node_domain, indptr, adj_link, adj_node, delay, cost = self._lists
+        for k in range(indptr[u], indptr[u + 1]):
+            link = adj_link[k]
+            if link >= self.num_intra and avail[link] >= bw_required:
+                yield adj_node[k], delay[link] + cost[link] * bw_required, (link,)
+        boundary = self.boundary.get(node_domain[u], ())
+        if u not in boundary:
+            return
+        for v in boundary:
+            if v == u:
+                continue
+            a, b = (u, v) if node_id[u] < node_id[v] else (v, u)
+            key = (a, b, bw_required)
+            if key not in transit:
+                transit[key] = self._intra_path(avail, a, b, bw_required)
+            path = transit[key]
+            if path:
+                weight = sum(delay[link] for link in path) + sum(cost[link] for link in path) * bw_required
+                yield v, weight, path if a == u else path[::-1]
+
+    def _layered_path(self, avail: List[float], src: int, dst: int, bw_required: float,
+                      transit: Dict) -> Optional[List[int]]:
+        node_id, node_domain, indptr, adj_link, adj_node, delay, cost = self._lists
+        endpoints = (node_domain[src], node_domain[dst])
+        dist = {src: 0}
+        prev: Dict[int, Tuple[int, Tuple]] = {}
+        pq = [(0, node_id[src], src)]
+        while pq:
+            cost_u, _, u = heapq.heappop(pq)
+            if u == dst:
+                break
+            if cost_u > dist[u]:
+                continue
+            if node_domain[u] in endpoints:
+                edges = (
+                    (adj_node[k], delay[adj_link[k]] + cost[adj_link[k]] * bw_required, (adj_link[k],))
+                    for k in range(indptr[u], indptr[u + 1]) if avail[adj_link[k]] >= bw_required
+                )
+            else:
+                edges = self._transit_edges(avail, u, bw_required, transit)
+            for v, weight, links in edges:
+                alt = cost_u + weight
+                if alt < dist.get(v, float('inf')):
+                    dist[v] = alt
+                    prev[v] = (u, links)
+                    heapq.heappush(pq, (alt, node_id[v], v))
+
+        if dst not in prev:
+            return None
+        segments = []
+        node = dst
+        while node != src:
+            node, links = prev[node]
+            segments.append(links)
+        segments.reverse()
+        return [link for links in segments for link in links]
+
+
+# Snapshot của worker process, gán bởi _init_worker
+_WORKER_SNAPSHOT: Optional[SubstrateSnapshot] = None
+
+
+def _init_worker(snapshot: SubstrateSnapshot) -> None:
+    global _WORKER_SNAPSHOT
+    _WORKER_SNAPSHOT = snapshot
+
+
+def _solve_in_worker(available_bw: np.ndarray, queries: List[Tuple[int, int, float]]) -> List[Optional[List[int]]]:
+    return _WORKER_SNAPSHOT.solve(available_bw, queries)
+
+
+class ParallelPathEvaluator:
+    """
+    Tính song song các shortest path còn thiếu của một thế hệ PSO.
+
+    kind = "process": ProcessPoolExecutor, snapshot gửi một lần qua initializer.
+    kind = "thread":  ThreadPoolExecutor dùng chung snapshot (hữu ích khi GIL được nhả / free-threaded).
+
+    Dùng làm context manager hoặc gọi close() khi xong.
+    """
+
+    def __init__(self, snetwork: SubstrateNetwork, max_workers: Optional[int] = None, kind: str = "process"):
+        if kind not in ("process", "thread"):
+            raise ValueError(f"Unknown executor kind '{kind}'")
+        self.snapshot = SubstrateSnapshot(snetwork)
+        self.kind = kind
+        self.max_workers = max_workers or os.cpu_count() or 1
+        if kind == "process":
+            self.executor: Executor = ProcessPoolExecutor(self.max_workers, initializer=_init_worker, initargs=(self.snapshot,))
+        else:
+            self.executor = ThreadPoolExecutor(self.max_workers)
+
+    def shortest_paths(self, queries: List[Tuple[SubstrateNode, SubstrateNode, float]]) -> List[Optional[List]]:
+        """queries: (src, dst, bw_required) -> path (danh sách link thật) hoặc None."""
+        encoded = [(*self.snapshot.encode(src, dst), bw) for src, dst, bw in queries]
+        available_bw = self.snapshot.available_bw()
+
+        if len(encoded) < MIN_PARALLEL_QUERIES:
+            results = self.snapshot.solve(available_bw, encoded)
+        else:
+            chunk = -(-len(encoded) // self.max_workers)
+            chunks = [encoded[i:i + chunk] for i in range(0, len(encoded), chunk)]
+            if self.kind == "process":
+                futures = [self.executor.submit(_solve_in_worker, available_bw, c) for c in chunks]
+            else:
+                futures = [self.executor.submit(self.snapshot.solve, available_bw, c) for c in chunks]
+            results = [path for future in futures for path in future.result()]
+
+        return [self.snapshot.decode_path(path) for path in results]
+
+    def close(self) -> None:
+        self.executor.shutdown()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
@@ -0,0 +1,93 @@
+import math
+from typing import Dict, List, Optional, Set, Tuple
+from src.types.substrate import SubstrateNode
+
+# Giá trị trả về khi key chưa có trong cache (None = đã biết không có path)
+MISS = object()
+
+
+class _CachedPath:
+    def __init__(self, path: Optional[List]):
+        self.path = path
+        self.delay = sum(link.delay for link in path) if path else 0.0
+        self.cost = sum(link.cost_per_unit for link in path) if path else 0.0
+
+
+class PathCostCache:
+    """
+    Cache (src, dst, bandwidth bucket) -> path cho GlobalController.shortest_path_cost.
+
+    Mỗi bucket có ngưỡng threshold = ceil(bw / bucket_size) * bucket_size và path được
+    tính với bw_required = threshold, nên dùng được cho mọi bw trong bucket. Entry chỉ bị
+    huỷ khi một link vượt qua ngưỡng của nó:
+    - link trên path giảm xuống dưới threshold (path không còn khả thi);
+    - link bất kỳ tăng từ dưới lên trên threshold (có thể xuất hiện path tốt hơn).
+    """
+
+    def __init__(self, bucket_size: float = 1.0):
+        self.bucket_size = bucket_size
+        self._entries: Dict[Tuple[SubstrateNode, SubstrateNode, int], _CachedPath] = {}
+        # Reverse index: link -> các key có path đi qua link
+        self._by_link: Dict[object, Set[Tuple]] = {}
+        # bucket -> các key thuộc bucket đó
+        self._by_bucket: Dict[int, Set[Tuple]] = {}
+        self.hits = 0
+        self.misses = 0
+
+    # ---------------- Public interface ----------------
+    def key(self, src: SubstrateNode, dst: SubstrateNode, bw_required: float) -> Tuple[SubstrateNode, SubstrateNode, int]:
+        bucket = math.ceil(bw_required / self.bucket_size) if bw_required > 0 else 0
+        # Path vô hướng: (src, dst) và (dst, src) dùng chung entry
+        if src.node_id > dst.node_id:
+            src, dst = dst, src
+        return src, dst, bucket
+
+    def threshold(self, key: Tuple) -> float:
+        return key[2] * self.bucket_size
+
+    def lookup(self, key: Tuple):
+        entry = self._entries.get(key)
+        if entry is None:
+            self.misses += 1
+            return MISS
+        self.hits += 1
+        return entry
+
+    def store(self, key: Tuple, path: Optional[List]) -> _CachedPath:
+        entry = _CachedPath(path)
+        self._entries[key] = entry
+        self._by_bucket.setdefault(key[2], set()).add(key)
+        for link in path or ():
+            self._by_link.setdefault(link, set()).add(key)
+        return entry
+
+    def bandwidth_changed(self, link, old_bw: float) -> None:
+        """Gọi sau khi available_bw của link đổi từ old_bw sang link.available_bw."""
+        new_bw = link.available_bw
+        if new_bw < old_bw:
+            for key in list(self._by_link.get(link, ())):
+                if new_bw < self.threshold(key):
+                    self._invalidate(key)
+        elif new_bw > old_bw:
+            for bucket, keys in list(self._by_bucket.items()):
+                if old_bw < bucket * self.bucket_size <= new_bw:
+                    for key in list(keys):
+                        self._invalidate(key)
+
+    def clear(self) -> None:
+        self._entries.clear()
+        self._by_link.clear()
+        self._by_bucket.clear()
+
+    # ---------------- Internal helpers ----------------
+    def _invalidate(self, key: Tuple) -> None:
+        entry = self._entries.pop(key, None)
+        if entry is None:
+            return
+        self._by_bucket[key[2]].discard(key)
+        for link in entry.path or ():
+            keys = self._by_link.get(link)
+            if keys is not None:
+                keys.discard(key)
+                if not keys:
+                    del self._by_link[link]
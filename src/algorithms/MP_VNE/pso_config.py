@@ -0,0 +1,38 @@
+from typing import Optional
+
+
+class PSOConfig:
+    """
+    Tham số PSO cho MP_VNE.
+
+    Điều kiện dừng sớm (None = tắt):
+        stall_iterations: dừng khi gbest không cải thiện sau bấy nhiêu iteration liên tiếp.
+        target_fitness:   dừng khi gbest_score <= target_fitness.
+        time_budget:      thời gian tối đa (giây) cho PSO của một request.
+    """
+
+    def __init__(
+        self,
+        num_particles: int = 50,
+        num_iterations: int = 30,
+        w: float = 0.7,
+        c1: float = 1.5,
+        c2: float = 1.5,
+        mutation_rate: float = 0.1,
+        stall_iterations: Optional[int] = None,
+        target_fitness: Optional[float] = None,
+        time_budget: Optional[float] = None,
+    ):
+        if num_particles < 1:
+            raise ValueError("num_particles must be >= 1")
+        if num_iterations < 0:
+            raise ValueError("num_iterations must be >= 0")
+        self.num_particles = num_particles
+        self.num_iterations = num_iterations
+        self.w = w
+        self.c1 = c1
+        self.c2 = c2
+        self.mutation_rate = mutation_rate
+        self.stall_iterations = stall_iterations
+        self.target_fitness = target_fitness
+        self.time_budget = time_budget
@@ -0,0 +1,82 @@
+from typing import Dict, List
+import numpy as np
+from src.types.substrate import SubstrateNode
+from src.types.virtual import VirtualNode
+from src.types.request import VirtualRequest
+
+# Ma trận path-cost dày tối đa (số phần tử) cho một vlink; lớn hơn thì dùng dict
+MAX_DENSE_PAIRS = 1_000_000
+
+
+class SwarmFitness:
+    """
+    Tính fitness cho cả swarm PSO cùng lúc.
+
+    - Node cost: ma trận (num_vnode, max_candidates) với cpu_demand * cost_per_unit, tính trước.
+    - Link cost: với mỗi vlink một ma trận (|candidates_src|, |candidates_dst|) chứa
+      shortest_path_cost, điền lazy (NaN = chưa tính) khi particle lần đầu chạm tới cặp đó.
+      Các cặp còn thiếu của cả thế hệ được gom lại và tính trong một lần gọi
+      GlobalController.shortest_path_costs (song song nếu có path_evaluator).
+    """
+
+    def __init__(self, global_controller, candidates: List[List[SubstrateNode]], request: VirtualRequest, path_evaluator=None):
+        self.global_controller = global_controller
+        self.path_evaluator = path_evaluator
+        self.candidates = candidates
+        vnetwork = request["vnetwork"]
+        vnodes: List[VirtualNode] = vnetwork.nodes
+        position: Dict[VirtualNode, int] = {vnode: i for i, vnode in enumerate(vnodes)}
+
+        max_len = max(len(c) for c in candidates)
+        node_cost_column = global_controller.snetwork.node_store.cost_per_unit
+        self.node_costs = np.full((len(vnodes), max_len), np.inf)
+        for i, (vnode, cands) in enumerate(zip(vnodes, candidates)):
+            idx = np.fromiter((snode._idx for snode in cands), dtype=np.int64, count=len(cands))
+            self.node_costs[i, :len(cands)] = vnode.cpu_demand * node_cost_column[idx]
+        self._rows = np.arange(len(vnodes))
+
+        self.vlinks = [(position[vlink.src], position[vlink.dst], vlink.bandwidth) for vlink in vnetwork.links]
+        self.link_costs = []
+        for i, j, _ in self.vlinks:
+            shape = (len(candidates[i]), len(candidates[j]))
+            self.link_costs.append(np.full(shape, np.nan) if shape[0] * shape[1] <= MAX_DENSE_PAIRS else {})
+
+    def __call__(self, population: np.ndarray) -> np.ndarray:
+        """population: (num_particles, num_vnode) chỉ số candidate -> fitness (num_particles,)."""
+        with self.global_controller.profiler.phase("swarm_fitness"):
+            return self._evaluate(population)
+
+    def _evaluate(self, population: np.ndarray) -> np.ndarray:
+        scores = self.node_costs[self._rows, population].sum(axis=1)
+        self._fill_missing(population)
+        for (i, j, _), costs in zip(self.vlinks, self.link_costs):
+            src_idx = population[:, i]
+            dst_idx = population[:, j]
+            if isinstance(costs, dict):
+                scores += [costs[(a, b)] for a, b in zip(src_idx.tolist(), dst_idx.tolist())]
+            else:
+                scores += costs[src_idx, dst_idx]
+        return scores
+
+    # ---------------- Internal helpers ----------------
+    def _fill_missing(self, population: np.ndarray) -> None:
+        missing = []  # (vlink index, a, b)
+        for k, ((i, j, _), costs) in enumerate(zip(self.vlinks, self.link_costs)):
+            src_idx = population[:, i]
+            dst_idx = population[:, j]
+            if isinstance(costs, dict):
+                pairs = {(a, b) for a, b in zip(src_idx.tolist(), dst_idx.tolist()) if (a, b) not in costs}
+            else:
+                unknown = np.isnan(costs[src_idx, dst_idx])
+                pairs = set(zip(src_idx[unknown].tolist(), dst_idx[unknown].tolist()))
+            missing.extend((k, a, b) for a, b in pairs)
+        if not missing:
+            return
+
+        queries = []
+        for k, a, b in missing:
+            i, j, bw = self.vlinks[k]
+            queries.append((self.candidates[i][a], self.candidates[j][b], bw))
+        values = self.global_controller.shortest_path_costs(queries, evaluator=self.path_evaluator)
+        for (k, a, b), value in zip(missing, values):
+            self.link_costs[k][a, b] = value
@@ -0,0 +1,139 @@
+"""
+Kiểm tra nhanh tính khả thi của request trước khi chạy phần tìm kiếm tốn kém (PSO / Kruskal).
+
+Chỉ dùng các aggregate được duy trì tăng dần trên substrate: tổng available_cpu
+(SubstrateDomain.free_cpu cộng qua các domain), node nhiều CPU nhất của domain (capacity index), available_bw
+lớn nhất trong link_store và (nếu có) BottleneckIndex cho liên thông giữa các candidate node
+của hai đầu vlink ở ngưỡng bandwidth của vlink. Mọi điều kiện đều là điều kiện cần của thuật toán tương ứng, nên
+request bị từ chối ở đây chắc chắn cũng thất bại nếu chạy tìm kiếm đầy đủ.
+"""
+from typing import Dict, Iterable, List, Optional
+
+import numpy as np
+
+from src.algorithms.bottleneck_index import BottleneckIndex
+from src.types.substrate import SubstrateDomain, SubstrateNetwork
+from src.types.virtual import VirtualLink, VirtualNetwork, VirtualNode
+
+# Lý do từ chối (AdmissionRejected.reason)
+NODE_CPU = "node_cpu"      # không domain được phép nào còn node đủ CPU cho một vnode
+TOTAL_CPU = "total_cpu"    # tổng CPU của request vượt tổng free CPU của substrate
+LINK_BW = "link_bw"        # vlink bắt buộc đi qua substrate link nhưng không link nào đủ available_bw
+BW_CONNECTIVITY = "bw_connectivity"  # không cặp candidate node nào của hai đầu vlink nối được với đủ bandwidth
+
+# Sai số tích luỹ của free_cpu (cộng trừ float nhiều lần) không được làm từ chối nhầm
+_TOLERANCE = 1e-9
+
+
+class AdmissionRejected(ValueError):
+    """Request bị từ chối bởi admission check; reason là một trong các hằng lý do ở đầu module."""
+
+    def __init__(self, reason: str, message: str):
+        super().__init__(message)
+        self.reason = reason
+
+
+def _exceeds(demand: float, available: float) -> bool:
+    return demand > available + _TOLERANCE * max(1.0, abs(available))
+
+
+class AdmissionControl:
+    """
+    respect_domains: vnode chỉ được đặt ở các domain trong vnode.domains (rỗng = mọi domain).
+    accumulate_cpu:  các vnode cùng request cộng dồn CPU khi đặt chung node / domain
+                     (MP_VNE trừ CPU lần lượt khi commit; MC_VNM chọn node cho từng vnode độc lập).
+    bottleneck:      index liên thông theo bandwidth của thuật toán (dùng chung, không dựng riêng);
+                     candidate của vnode là các node đủ CPU trong domain được phép.
+    """
+
+    def __init__(self, substrate: SubstrateNetwork, respect_domains: bool = True, accumulate_cpu: bool = True,
+                 bottleneck: Optional[BottleneckIndex] = None):
+        self.substrate = substrate
+        self.respect_domains = respect_domains
+        self.accumulate_cpu = accumulate_cpu
+        self.bottleneck = bottleneck
+
+    def check(self, vnetwork: VirtualNetwork) -> None:
+        """Raise AdmissionRejected nếu request chắc chắn không map được."""
+        max_cpu = {domain.domain_id: self._max_cpu(domain) for domain in self.substrate.domains}
+
+        for vnode in vnetwork.nodes:
+            if _exceeds(vnode.cpu_demand, self._max_cpu_of(vnode, max_cpu)):
+                raise AdmissionRejected(NODE_CPU, f"No substrate node has {vnode.cpu_demand} free CPU for vnode {vnode.id}")
+
+        if self.accumulate_cpu:
+            self._check_cpu_totals(vnetwork)
+
+        must_route = [vlink for vlink in vnetwork.links if self._must_route(vlink, max_cpu)]
+        if must_route:
+            max_bw = self._max_available_bw()
+            for vlink in must_route:
+                if _exceeds(vlink.bandwidth, max_bw):
+                    raise AdmissionRejected(
+                        LINK_BW, f"No substrate link has {vlink.bandwidth} free bandwidth for vlink {vlink.src.id}->{vlink.dst.id}"
+                    )
+            if self.bottleneck is not None:
+                labels: Dict[float, np.ndarray] = {}
+                for vlink in must_route:
+                    if vlink.bandwidth not in labels:
+                        labels[vlink.bandwidth] = self.bottleneck.labels(vlink.bandwidth)
+                    if not self._candidates_connected(vlink, labels[vlink.bandwidth]):
+                        raise AdmissionRejected(
+                            BW_CONNECTIVITY, f"No candidate nodes of vlink {vlink.src.id}->{vlink.dst.id} are connected "
+                                             f"with {vlink.bandwidth} free bandwidth"
+                        )
+
+    # ---------------- Internal helpers ----------------
+    def _allowed(self, vnode: VirtualNode) -> Optional[List[int]]:
+        """domain_id được phép của vnode, None = mọi domain."""
+        if self.respect_domains and vnode.domains:
+            return vnode.domains
+        return None
+
+    def _max_cpu_of(self, vnode: VirtualNode, max_cpu) -> float:
+        allowed = self._allowed(vnode)
+        domain_ids: Iterable[int] = max_cpu if allowed is None else (d for d in allowed if d in max_cpu)
+        return max((max_cpu[d] for d in domain_ids), default=0.0)
+
+    def _check_cpu_totals(self, vnetwork: VirtualNetwork) -> None:
+        total_demand = sum(vnode.cpu_demand for vnode in vnetwork.nodes)
+        if _exceeds(total_demand, self.substrate.free_cpu()):
+            raise AdmissionRejected(TOTAL_CPU, f"Request needs {total_demand} CPU, substrate has {self.substrate.free_cpu()} free")
+
+    def _must_route(self, vlink: VirtualLink, max_cpu) -> bool:
+        """True nếu hai đầu vlink chắc chắn nằm trên hai substrate node khác nhau."""
+        src_allowed, dst_allowed = self._allowed(vlink.src), self._allowed(vlink.dst)
+        if src_allowed is not None and dst_allowed is not None and set(src_allowed).isdisjoint(dst_allowed):
+            return True
+        if not self.accumulate_cpu:
+            return False
+        # Đặt chung một node cần đủ CPU cho cả hai vnode trên cùng node đó
+        shared = set(max_cpu)
+        for allowed in (src_allowed, dst_allowed):
+            if allowed is not None:
+                shared &= set(allowed)
+        best = max((max_cpu[d] for d in shared), default=0.0)
+        return _exceeds(vlink.src.cpu_demand + vlink.dst.cpu_demand, best)
+
+    def _candidates_connected(self, vlink: VirtualLink, labels: np.ndarray) -> bool:
+        """Có candidate của src và candidate của dst cùng thành phần liên thông (labels theo chỉ số dense)."""
+        src_labels = labels[self._candidate_indices(vlink.src)]
+        dst_labels = labels[self._candidate_indices(vlink.dst)]
+        return np.intersect1d(src_labels, dst_labels).size > 0
+
+    def _candidate_indices(self, vnode: VirtualNode) -> np.ndarray:
+        allowed = self._allowed(vnode)
+        return np.fromiter(
+            (snode._idx for domain in self.substrate.domains if allowed is None or domain.domain_id in allowed
+             for snode in domain.nodes_with_cpu(vnode.cpu_demand)),
+            dtype=np.int64,
+        )
+
+    @staticmethod
+    def _max_cpu(domain: SubstrateDomain) -> float:
+        snode = domain.max_cpu_node()
+        return snode.available_cpu if snode is not None else 0.0
+
+    def _max_available_bw(self) -> float:
+        column = self.substrate.link_store.column("available_bw")
+        return float(column.max()) if len(column) else 0.0
@@ -0,0 +1,169 @@
+"""
+Index trả lời nhanh "u và v có nối được chỉ bằng các link có available_bw >= B không".
+
+Maximum spanning forest theo available_bw trên mọi link của substrate (nội miền và liên miền)
+được lưu dưới dạng Kruskal reconstruction tree: mỗi lần Kruskal (bandwidth giảm dần) nối hai
+cây sẽ tạo một node mới có weight = bandwidth của link đó, làm cha của hai gốc cũ. Weight
+không tăng khi đi lên, nên u, v nối được ở ngưỡng B khi và chỉ khi tổ tiên cao nhất có
+weight >= B của u và của v trùng nhau; tổ tiên đó tìm bằng binary lifting, O(log n) mỗi truy vấn.
+
+Đây là cache dựng lại lazy, không phải index cập nhật tăng dần: cây không bao giờ được sửa
+tại chỗ. bandwidth_changed chỉ ghi lại khoảng ngưỡng bị ảnh hưởng. Link đổi từ old sang new
+chỉ làm đổi tập {link: bw >= B} với B trong (min(old, new), max(old, new)]. Vì vậy chỉ truy vấn
+có ngưỡng rơi vào một khoảng stale mới dựng lại cây; mọi ngưỡng khác vẫn dùng cây cũ và cho
+kết quả đúng. Hai loại thay đổi không ghi khoảng nào vì không đổi liên thông ở mọi ngưỡng:
+  - link ngoài forest giảm bandwidth;
+  - link ngoài forest tăng bandwidth mà hai đầu đã nối được ở ngưỡng mới.
+Quá MAX_STALE_INTERVALS khoảng thì đánh dấu dirty, truy vấn kế tiếp dựng lại bất kể ngưỡng.
+"""
+from typing import List, Tuple
+
+import numpy as np
+
+from src.types.substrate import SubstrateNetwork, SubstrateNode
+from src.utils.profiler import NULL_PROFILER, Profiler
+
+MAX_STALE_INTERVALS = 32
+
+
+class BottleneckIndex:
+    def __init__(self, substrate: SubstrateNetwork, profiler: Profiler = NULL_PROFILER):
+        self.substrate = substrate
+        self.profiler = profiler
+        self.dirty = True
+        self._num_nodes = -1
+        self._num_links = -1
+        self._stale: List[Tuple[float, float]] = []  # khoảng ngưỡng (lo, hi] mà cây không còn đúng
+        self._src_idx: List[int] = []
+        self._dst_idx: List[int] = []
+        self._in_tree = np.zeros(0, dtype=bool)
+        # Kruskal reconstruction tree: node 0..n-1 là substrate node (weight = inf), còn lại là node nối
+        self._weight: List[float] = []
+        self._up: List[List[int]] = []  # _up[k][x]: tổ tiên thứ 2^k của x (gốc trỏ về chính nó)
+        self._weight_array = np.zeros(0)
+        self._up_arrays: List[np.ndarray] = []
+
+    # ---------------- Truy vấn ----------------
+    def connected(self, src: SubstrateNode, dst: SubstrateNode, bandwidth: float) -> bool:
+        """True nếu có đường src -> dst chỉ gồm các link có available_bw >= bandwidth."""
+        if src == dst:
+            return True
+        self._ensure_built(bandwidth)
+        return self._component(src._idx, bandwidth) == self._component(dst._idx, bandwidth)
+
+    def labels(self, bandwidth: float) -> np.ndarray:
+        """Nhãn thành phần liên thông của mọi node (theo chỉ số dense trong node_store) ở ngưỡng bandwidth."""
+        self._ensure_built(bandwidth)
+        weight = self._weight_array
+        x = np.arange(self.substrate.node_store.size)
+        for up in reversed(self._up_arrays):
+            ancestor = up[x]
+            x = np.where(weight[ancestor] >= bandwidth, ancestor, x)
+        return x
+
+    # ---------------- Cập nhật ----------------
+    def bandwidth_changed(self, link, old_bw: float) -> None:
+        """Gọi sau khi available_bw của link đổi từ old_bw."""
+        if self.dirty:
+            return
+        new_bw = link.available_bw
+        if new_bw == old_bw:
+            return
+        idx = link._idx
+        if idx >= len(self._in_tree) or self._outdated():
+            self.dirty = True
+            return
+        if not self._in_tree[idx]:
+            if new_bw < old_bw:
+                return
+            # Cây chỉ trả lời đúng ở new_bw nếu new_bw không nằm trong khoảng stale
+            if not self._is_stale(new_bw) and (self._component(link.src._idx, new_bw)
+                                               == self._component(link.dst._idx, new_bw)):
+                return
+        if len(self._stale) >= MAX_STALE_INTERVALS:
+            self.dirty = True
+        else:
+            self._stale.append((min(old_bw, new_bw), max(old_bw, new_bw)))
+
+    def invalidate(self) -> None:
+        self.dirty = True
+
+    # ---------------- Internal helpers ----------------
+    def _outdated(self) -> bool:
+        # Node / link được thêm vào substrate sau lần dựng trước cũng làm forest lỗi thời
+        return (self._num_links != self.substrate.link_store.size
+                or self._num_nodes != self.substrate.node_store.size)
+
+    def _is_stale(self, bandwidth: float) -> bool:
+        return any(lo < bandwidth <= hi for lo, hi in self._stale)
+
+    def _ensure_built(self, bandwidth: float) -> None:
+        if self.dirty or self._outdated() or self._is_stale(bandwidth):
+            self._rebuild()
+
+    def _component(self, x: int, bandwidth: float) -> int:
+        weight = self._weight
+        for up in reversed(self._up):
+            ancestor = up[x]
+            if weight[ancestor] >= bandwidth:
+                x = ancestor
+        return x
+
+    def _rebuild(self) -> None:
+        with self.profiler.phase("bottleneck_rebuild"):
+            store = self.substrate.link_store
+            if store.size != self._num_links:
+                self._num_links = store.size
+                self._src_idx = [link.src._idx for link in store.entities]
+                self._dst_idx = [link.dst._idx for link in store.entities]
+
+            n = self._num_nodes = self.substrate.node_store.size
+            bw = store.column("available_bw")
+            bw_list = bw.tolist()
+            src_idx, dst_idx = self._src_idx, self._dst_idx
+
+            uf = list(range(n))           # union-find trên substrate node
+            tree_of = list(range(n))      # gốc union-find -> gốc cây reconstruction
+            size = [1] * n
+            parent = list(range(2 * n))
+            weight = [float("inf")] * n + [0.0] * n
+            in_tree = np.zeros(store.size, dtype=bool)
+
+            def find(u):
+                root = u
+                while uf[root] != root:
+                    root = uf[root]
+                while uf[u] != root:
+                    uf[u], u = root, uf[u]
+                return root
+
+            next_id = n
+            for e in np.argsort(-bw, kind="stable").tolist():
+                ru, rv = find(src_idx[e]), find(dst_idx[e])
+                if ru == rv:
+                    continue
+                if size[ru] > size[rv]:
+                    ru, rv = rv, ru
+                uf[ru] = rv
+                size[rv] += size[ru]
+                parent[tree_of[ru]] = parent[tree_of[rv]] = next_id
+                parent[next_id] = next_id
+                weight[next_id] = bw_list[e]
+                tree_of[rv] = next_id
+                in_tree[e] = True
+                next_id += 1
+                if next_id == 2 * n - 1:
+                    break
+
+            del parent[next_id:], weight[next_id:]
+            up = [np.asarray(parent, dtype=np.int64)]
+            for _ in range(max(1, int(np.ceil(np.log2(max(next_id, 2)))))):
+                up.append(up[-1][up[-1]])
+            self._up_arrays = up
+            self._up = [level.tolist() for level in up]
+            self._weight = weight
+            self._weight_array = np.asarray(weight)
+            self._in_tree = in_tree
+            self._stale = []
+            self.dirty = False
+        self.profiler.count("bottleneck_rebuilds")
@@ -0,0 +1,254 @@
+import hashlib
+import json
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from src.algorithms.MC_VNM.mc_vnm import MC_VNM
+from src.algorithms.MP_VNE.mp_vne import MP_VNE
+from src.simulation.simulator import Simulator
+from src.utils.columnar_dataset import load_dataset
+from src.utils.profiler import Profiler
+from src.utils.results_store import ResultsStore
+
+# Tên thuật toán -> hàm tạo instance từ (substrate_network, seed, profiler)
+ALGORITHMS: Dict[str, Callable[[Any, Optional[int], Optional[Profiler]], Any]] = {
+    "MP_VNE": lambda snetwork, seed, profiler: MP_VNE(snetwork, seed=seed, profiler=profiler),
+    "MC_VNM": lambda snetwork, seed, profiler: MC_VNM(snetwork, profiler=profiler),
+}
+
+
+def dataset_name(dataset_path: str) -> str:
+    """Tên ngắn của dataset (bỏ thư mục và đuôi .json / .jsonl)."""
+    name = os.path.basename(os.path.normpath(dataset_path))
+    for ext in (".jsonl", ".json"):
+        if name.endswith(ext):
+            return name[:-len(ext)]
+    return name
+
+
+def dataset_key(dataset_path: str) -> str:
+    """
+    Tên ngắn kèm hash của đường dẫn tuyệt đối, dùng đặt tên shard / file record:
+    a/small_1.json và b/small_1.json không ghi đè (hay bị bỏ qua nhầm) lẫn nhau.
+    """
+    digest = hashlib.sha1(os.path.abspath(dataset_path).encode()).hexdigest()[:8]
+    return f"{dataset_name(dataset_path)}-{digest}"
+
+
+def shard_path(shard_dir: str, run_id: str, dataset_path: str, algorithm: str) -> str:
+    return os.path.join(shard_dir, run_id, f"{dataset_key(dataset_path)}__{algorithm}.json")
+
+
+def records_path(records_dir: str, run_id: str, dataset_path: str, algorithm: str) -> str:
+    """Mỗi run_id một thư mục con, nên run mới không đụng tới record của run cũ."""
+    return os.path.join(records_dir, run_id, f"{dataset_key(dataset_path)}__{algorithm}.jsonl")
+
+
+def run_shard(
+    dataset_path: str,
+    tasks: List[Tuple[str, str, Optional[str]]],
+    seed: Optional[int] = None,
+    profile: bool = False,
+    run_id: Optional[str] = None,
+    keep_series: bool = True,
+) -> List[str]:
+    """
+    Chạy các thuật toán trong tasks [(thuật toán, shard, file record hoặc None)] trên một
+    dataset, ghi mỗi thuật toán ra shard riêng.
+
+    Dataset được load một lần; mỗi thuật toán chạy trên substrate riêng lấy bằng
+    SubstrateNetwork.fork() (dùng chung cột tĩnh, chỉ copy available_cpu / available_bw)
+    và các thuật toán đi chung một lượt request, nên trace JSONL dạng generator cũng chỉ
+    được đọc một lần. Shard được ghi ra file tạm rồi os.replace, nên một shard tồn tại
+    luôn là shard hoàn chỉnh. profile=True: stats có thêm "profile" theo phase.
+    File record (nếu có): từng request được ghi ngay vào kho JSONL (src/utils/results_store.py).
+    File thuộc riêng (run_id, dataset, thuật toán) và được ghi lại từ đầu mỗi lần task chạy,
+    nên chạy lại sau khi bị ngắt không sinh record trùng và không xoá record của run khác.
+    keep_series=False: stats chỉ giữ aggregate (xem Simulator), bộ nhớ không tăng theo trace.
+    """
+    dataset = load_dataset(dataset_path)
+    substrate = dataset["substrate_network"]
+    # Fork trước khi tạo instance nào: constructor có thể ghi vào tài nguyên của substrate
+    substrates = [substrate] + [substrate.fork() for _ in tasks[1:]]
+    instances = {
+        algorithm: ALGORITHMS[algorithm](snetwork, seed, Profiler() if profile else None)
+        for (algorithm, _, _), snetwork in zip(tasks, substrates)
+    }
+
+    stores = {
+        algorithm: ResultsStore(records_file, run_id, dataset_key(dataset_path), truncate=True)
+        for algorithm, _, records_file in tasks if records_file is not None
+    }
+
+    def on_result(name, *result):
+        if name in stores:
+            stores[name].on_result(name, *result)
+
+    try:
+        simulator = Simulator(instances, on_result=on_result if stores else None, keep_series=keep_series)
+        stats = simulator.run(dataset["virtual_requests"])
+    finally:
+        for store in stores.values():
+            store.close()
+
+    for algorithm, output_path, _ in tasks:
+        shard = {"dataset": dataset_path, "algorithm": algorithm, "stats": stats[algorithm]}
+        tmp_path = output_path + ".tmp"
+        with open(tmp_path, "w") as f:
+            json.dump(shard, f)
+        os.replace(tmp_path, output_path)
+    return [output_path for _, output_path, _ in tasks]
+
+
+class ExperimentRunner:
+    """
+    Chạy nhiều dataset x thuật toán song song trên một process pool.
+
+    Mỗi cặp (dataset, thuật toán) là một task, ghi một shard trong <shard_dir>/<run_id>/;
+    các task cùng dataset được gom thành một job (xem jobs()). Khi resume=True, các shard
+    đã có của run được bỏ qua nên có thể chạy lại sau khi bị ngắt. run_id mặc định được sinh một lần và lưu trong shard_dir/run_id,
+    nên các lần resume tiếp tục cùng run_id; resume=False mà không truyền run_id thì bắt đầu run mới.
+    records_dir: nếu có, kết quả từng request được ghi dần vào
+    <records_dir>/<run_id>/<dataset>__<thuật toán>.jsonl, mỗi record mang run_id.
+    keep_series=False: shard chỉ chứa stats aggregate, dữ liệu từng request nằm trong kho record.
+    merge() gộp các shard của run (chỉ run này) thành danh sách theo schema simulation_data.json:
+        [{"dataset": path, "run_id": run_id, "<algorithm>": stats, ...}, ...]
+    """
+
+    def __init__(
+        self,
+        datasets: List[str],
+        algorithms: List[str],
+        shard_dir: str,
+        max_workers: Optional[int] = None,
+        resume: bool = True,
+        seed: Optional[int] = None,
+        profile: bool = False,
+        records_dir: Optional[str] = None,
+        run_id: Optional[str] = None,
+        keep_series: bool = True,
+    ):
+        unknown = [name for name in algorithms if name not in ALGORITHMS]
+        if unknown:
+            raise ValueError(f"Unknown algorithms: {unknown}")
+        self.datasets = datasets
+        self.algorithms = algorithms
+        self.shard_dir = shard_dir
+        self.max_workers = max_workers or os.cpu_count() or 1
+        self.resume = resume
+        self.seed = seed
+        self.profile = profile
+        self.records_dir = records_dir
+        self.run_id = run_id
+        self.keep_series = keep_series
+
+    def _resolve_run_id(self) -> str:
+        """run_id được truyền vào, hoặc run_id đã lưu khi resume, hoặc một id mới theo thời gian."""
+        os.makedirs(self.shard_dir, exist_ok=True)
+        path = os.path.join(self.shard_dir, "run_id")
+        if self.run_id is None and self.resume and os.path.exists(path):
+            with open(path, "r") as f:
+                self.run_id = f.read().strip()
+        if self.run_id is None:
+            self.run_id = time.strftime("%Y%m%d-%H%M%S")
+        with open(path, "w") as f:
+            f.write(self.run_id)
+        return self.run_id
+
+    def _job_args(self, dataset_path: str, tasks: List[Tuple[str, str]]) -> Tuple[Any, ...]:
+        shard_tasks = [
+            (algorithm, path,
+             records_path(self.records_dir, self.run_id, dataset_path, algorithm) if self.records_dir is not None else None)
+            for algorithm, path in tasks
+        ]
+        return dataset_path, shard_tasks, self.seed, self.profile, self.run_id, self.keep_series
+
+    def jobs(self, tasks: List[Tuple[str, str, str]]) -> List[Tuple[str, List[Tuple[str, str]]]]:
+        """
+        Gom task theo dataset: mỗi job load dataset một lần và fork substrate cho từng thuật toán.
+        Khi số dataset ít hơn số worker, mỗi (dataset, thuật toán) là một job để không mất song song.
+        """
+        by_dataset: Dict[str, List[Tuple[str, str]]] = {}
+        for dataset_path, algorithm, path in tasks:
+            by_dataset.setdefault(dataset_path, []).append((algorithm, path))
+        if len(by_dataset) >= self.max_workers:
+            return list(by_dataset.items())
+        return [(dataset_path, [task]) for dataset_path, group in by_dataset.items() for task in group]
+
+    def pending_tasks(self) -> List[Tuple[str, str, str]]:
+        """Các task (dataset, thuật toán, shard) chưa có shard trong run (hoặc tất cả nếu resume=False)."""
+        if self.run_id is None:
+            self._resolve_run_id()
+        tasks = []
+        for dataset_path in self.datasets:
+            for algorithm in self.algorithms:
+                path = shard_path(self.shard_dir, self.run_id, dataset_path, algorithm)
+                if not (self.resume and os.path.exists(path)):
+                    tasks.append((dataset_path, algorithm, path))
+        return tasks
+
+    def run(self) -> None:
+        self._resolve_run_id()
+        os.makedirs(os.path.join(self.shard_dir, self.run_id), exist_ok=True)
+        if self.records_dir is not None:
+            os.makedirs(self.records_dir, exist_ok=True)
+        tasks = self.pending_tasks()
+        skipped = len(self.datasets) * len(self.algorithms) - len(tasks)
+        if skipped:
+            print(f"Resuming: skipping {skipped} finished shards")
+
+        jobs = self.jobs(tasks)
+        if self.max_workers == 1:
+            for i, (dataset_path, group) in enumerate(jobs, 1):
+                run_shard(*self._job_args(dataset_path, group))
+                print(f"[{i}/{len(jobs)}] Finished {', '.join(a for a, _ in group)} on {dataset_path}")
+            return
+
+        with ProcessPoolExecutor(self.max_workers) as executor:
+            futures = {
+                executor.submit(run_shard, *self._job_args(dataset_path, group)): (dataset_path, group)
+                for dataset_path, group in jobs
+            }
+            for i, future in enumerate(as_completed(futures), 1):
+                dataset_path, group = futures[future]
+                future.result()
+                print(f"[{i}/{len(jobs)}] Finished {', '.join(a for a, _ in group)} on {dataset_path}")
+
+    def merged_path(self) -> str:
+        """File gộp mặc định của run: <shard_dir>/<run_id>/merged.json."""
+        if self.run_id is None:
+            self._resolve_run_id()
+        return os.path.join(self.shard_dir, self.run_id, "merged.json")
+
+    def merge(self, output_path: Optional[str] = None) -> List[Dict[str, Any]]:
+        """
+        Gộp shard của run theo thứ tự dataset; bỏ qua dataset còn thiếu shard.
+
+        Kết quả chỉ của run này được ghi ra output_path (mặc định merged_path()), không đọc
+        lại hay ghi đè file của run khác: chi phí không tăng theo lịch sử và hai run merge
+        cùng lúc không giẫm lên nhau. Merge lại sau resume ghi đè đúng file của run.
+        """
+        if self.run_id is None:
+            self._resolve_run_id()
+        results = []
+        for dataset_path in self.datasets:
+            entry: Dict[str, Any] = {"dataset": dataset_path, "run_id": self.run_id}
+            for algorithm in self.algorithms:
+                path = shard_path(self.shard_dir, self.run_id, dataset_path, algorithm)
+                if not os.path.exists(path):
+                    break
+                with open(path, "r") as f:
+                    entry[algorithm] = json.load(f)["stats"]
+            else:
+                results.append(entry)
+
+        if output_path is None:
+            output_path = self.merged_path()
+        os.makedirs(os.path.dirname(output_path) or ".", exist_ok=True)
+        tmp_path = output_path + ".tmp"
+        with open(tmp_path, "w") as f:
+            json.dump(results, f, indent=4)
+        os.replace(tmp_path, output_path)
+        return results
@@ -0,0 +1,140 @@
+import time
+from collections.abc import Sequence
+from typing import Any, Callable, Dict, Iterable, Iterator, Optional
+
+import numpy as np
+
+from src.algorithms.MC_VNM.mc_vnm import MC_VNM
+from src.types.request import VirtualRequest
+
+
+def new_algorithm_stats(keep_series: bool = True) -> Dict[str, Any]:
+    # rejections: lý do -> số request thất bại (AdmissionRejected.reason, còn lại là "mapping_failed")
+    if not keep_series:
+        # Chỉ aggregate (bộ nhớ hằng số); time tính cả request bị từ chối, cost chỉ request được chấp nhận
+        return {"accepted": 0, "failed": 0, "total_time": 0.0, "max_time": 0.0, "total_cost": 0.0, "rejections": {}}
+    return {"accepted": 0, "failed": 0, "times": [], "costs": [], "per_request_time": [], "per_request_cost": [], "success": [],
+            "rejections": {}}
+
+
+class Simulator:
+    """
+    Discrete-event simulator cho các thuật toán VNE.
+
+    Thay vì tăng current_time theo từng time step, simulator nhảy thẳng tới event
+    kế tiếp: arrival của request sau, hoặc next_expiry() của thuật toán (mỗi thuật
+    toán tự giữ heap expire_time). Chi phí mỗi lần chạy tỉ lệ với số request chứ
+    không với độ dài horizon.
+
+    Request được tiêu thụ lazy theo thứ tự arrival: trước mỗi arrival, các expiry
+    có thời điểm <= arrival được xử lý trước (tài nguyên giải phóng trước khi map
+    request mới). Vì vậy có thể truyền generator (vd. iter_requests_from_jsonl)
+    và chạy trace rất dài mà không giữ toàn bộ request trong bộ nhớ.
+
+    algorithms: {tên thuật toán: instance (MP_VNE / MC_VNM)}
+    on_result:  nếu có, được gọi sau mỗi lần map với
+                (tên thuật toán, request, accepted, elapsed giây, cost hoặc None),
+                kể cả request bị từ chối.
+    keep_series: False = stats chỉ giữ aggregate (total_time, max_time, total_cost) thay cho
+                 các list theo request, nên bộ nhớ không tăng theo độ dài trace; dữ liệu từng
+                 request khi đó lấy qua on_result (vd. ResultsStore).
+    Thuật toán có profiler bật (xem src/utils/profiler.py) được xuất thêm stats[name]["profile"].
+    """
+
+    def __init__(self, algorithms: Dict[str, Any],
+                 on_result: Optional[Callable[[str, VirtualRequest, bool, float, Optional[float]], None]] = None,
+                 keep_series: bool = True):
+        self.algorithms = algorithms
+        self.on_result = on_result
+        self.keep_series = keep_series
+        self.current_time: float = 0.0
+
+    # ---------------- Public interface ----------------
+    def run(self, virtual_requests: Iterable[VirtualRequest]) -> Dict[str, Dict[str, Any]]:
+        """
+        Chạy toàn bộ request, trả về stats theo từng thuật toán.
+
+        virtual_requests: Sequence (list, ColumnarRequests) - được duyệt theo thứ tự
+        arrival_time (sắp xếp ổn định); hoặc iterator/generator - phải đã theo thứ tự
+        arrival_time, ValueError nếu không.
+        """
+        stats = {name: new_algorithm_stats(self.keep_series) for name in self.algorithms}
+
+        last_arrival = float("-inf")
+        for req in self._in_arrival_order(virtual_requests):
+            arrival_time = req["arrival_time"]
+            if arrival_time < last_arrival:
+                raise ValueError(
+                    f"Requests must be ordered by arrival_time ({arrival_time} arrives after {last_arrival})"
+                )
+            last_arrival = arrival_time
+            self._process_expiries(arrival_time)
+            self.current_time = arrival_time
+            self._handle_arrival(req, stats)
+
+        self._process_expiries(float("inf"))
+        for name, algorithm in self.algorithms.items():
+            profiler = getattr(algorithm, "profiler", None)
+            if profiler is not None and profiler.enabled:
+                stats[name]["profile"] = profiler.snapshot()
+        return stats
+
+    # ---------------- Internal helpers ----------------
+    @staticmethod
+    def _in_arrival_order(virtual_requests: Iterable[VirtualRequest]) -> Iterator[VirtualRequest]:
+        if not isinstance(virtual_requests, Sequence):
+            return iter(virtual_requests)
+        # ColumnarRequests có sẵn cột arrival_times, khỏi dựng request chỉ để sắp xếp
+        arrival_times = getattr(virtual_requests, "arrival_times", None)
+        if arrival_times is None:
+            arrival_times = [req["arrival_time"] for req in virtual_requests]
+        order = np.argsort(np.asarray(arrival_times, dtype=np.float64), kind="stable")
+        return (virtual_requests[i] for i in order.tolist())
+
+    def _process_expiries(self, until: float) -> None:
+        """Giải phóng các mapping có expire_time <= until (theo thứ tự expire_time trong thuật toán)."""
+        for algorithm in self.algorithms.values():
+            next_expiry = algorithm.next_expiry()
+            if next_expiry is not None and next_expiry <= until:
+                algorithm.release_expired_requests(until)
+
+    def _handle_arrival(self, req: VirtualRequest, stats: Dict[str, Dict[str, Any]]) -> None:
+        for name, algorithm in self.algorithms.items():
+            alg_stats = stats[name]
+            t0 = time.perf_counter()
+            try:
+                _, cost, _ = self._map_request(algorithm, req)
+                t1 = time.perf_counter()
+            except Exception as e:
+                t1 = time.perf_counter()
+                reason = getattr(e, "reason", "mapping_failed")
+                alg_stats["rejections"][reason] = alg_stats["rejections"].get(reason, 0) + 1
+                alg_stats["failed"] += 1
+                self._record(alg_stats, False, t1 - t0, None)
+                if self.on_result is not None:
+                    self.on_result(name, req, False, t1 - t0, None)
+                continue
+
+            alg_stats["accepted"] += 1
+            self._record(alg_stats, True, t1 - t0, cost)
+            if self.on_result is not None:
+                self.on_result(name, req, True, t1 - t0, cost)
+
+    def _record(self, alg_stats: Dict[str, Any], accepted: bool, elapsed: float, cost: Optional[float]) -> None:
+        if not self.keep_series:
+            alg_stats["total_time"] += elapsed
+            alg_stats["max_time"] = max(alg_stats["max_time"], elapsed)
+            if accepted:
+                alg_stats["total_cost"] += cost
+            return
+        if accepted:
+            alg_stats["times"].append(elapsed)
+            alg_stats["costs"].append(cost)
+        alg_stats["per_request_time"].append(elapsed if accepted else None)
+        alg_stats["per_request_cost"].append(cost)
+        alg_stats["success"].append(accepted)
+
+    def _map_request(self, algorithm: Any, req: VirtualRequest):
+        if isinstance(algorithm, MC_VNM):
+            return algorithm.handle_mapping_request(req["vnetwork"], self.current_time, req["lifetime"])
+        return algorithm.handle_mapping_request(req, self.current_time)
@@ -0,0 +1,71 @@
+from typing import Any, List, Tuple
+
+import numpy as np
+
+
+class ColumnStore:
+    """
+    Bảng struct-of-arrays có thể mở rộng: mỗi field là một mảng float64 dùng chung,
+    mỗi entity (node / link) giữ một chỉ số dense vào các mảng đó.
+
+    Entity vẫn giữ giá trị của mình ở slot (đường đọc nóng như Dijkstra không đi qua
+    NumPy); store là bản dạng cột cho các phép vectorized. append chép giá trị field
+    từ entity, field thay đổi được (available_*) do setter của entity ghi xuyên vào cột.
+
+    Các field truy cập như thuộc tính: store.available_cpu[idx]. Chỉ `size` phần tử
+    đầu tiên là hợp lệ; dùng store.column(name) để lấy view vừa đúng kích thước.
+    """
+
+    def __init__(self, fields: Tuple[str, ...], capacity: int = 16):
+        self.fields = fields
+        self.size = 0
+        self.entities: List[Any] = []
+        for name in fields:
+            setattr(self, name, np.zeros(max(capacity, 1), dtype=np.float64))
+
+    def append(self, entity: Any) -> int:
+        """Thêm một hàng với giá trị các field đọc từ entity, trả về chỉ số dense của entity."""
+        idx = self.size
+        if idx == len(getattr(self, self.fields[0])):
+            self._grow()
+        for name in self.fields:
+            getattr(self, name)[idx] = getattr(entity, name)
+        self.entities.append(entity)
+        self.size += 1
+        return idx
+
+    def adopt(self, entity: Any) -> None:
+        """Chuyển entity (đang dùng store khác) sang store này, giữ nguyên giá trị các field."""
+        if entity._store is self:
+            return
+        entity._idx = self.append(entity)
+        entity._store = self
+
+    def column(self, name: str) -> np.ndarray:
+        return getattr(self, name)[:self.size]
+
+    def fork(self, mutable: Tuple[str, ...]) -> "ColumnStore":
+        """
+        Store mới cùng chỉ số: các field trong `mutable` được copy, các field còn lại
+        dùng chung mảng với store gốc (coi là read-only). `entities` để rỗng, caller
+        điền entity mới đúng theo chỉ số cũ.
+
+        Mảng dùng chung được cắt đúng `size` nên append ở bất kỳ bên nào cũng phải
+        _grow (cấp mảng mới) thay vì ghi đè vùng nhớ của bên kia.
+        """
+        clone = ColumnStore.__new__(ColumnStore)
+        clone.fields = self.fields
+        clone.size = self.size
+        clone.entities = []
+        for name in self.fields:
+            column = self.column(name)
+            setattr(clone, name, column.copy() if name in mutable else column)
+        return clone
+
+    def _grow(self) -> None:
+        for name in self.fields:
+            old = getattr(self, name)
+            new = np.zeros(max(len(old) * 2, 1), dtype=np.float64)
+            new[:len(old)] = old
+            setattr(self, name, new)
+
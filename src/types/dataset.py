@@ -1,8 +1,9 @@
-from typing import List, TypedDict
+from typing import List, NotRequired, TypedDict
 from src.types.request import VirtualRequest
 from src.types.substrate import SubstrateNetwork
 
 
 class Dataset(TypedDict):
     substrate_network: SubstrateNetwork
-    virtual_requests: List[VirtualRequest]
\ No newline at end of file
+    virtual_requests: List[VirtualRequest]
+    load_time: NotRequired[float]  # giây, do các loader điền
@@ -1,22 +1,72 @@
 import random
-from typing import List, Dict
+from bisect import bisect_left
+from operator import attrgetter
+from typing import List, Dict, Optional, Tuple
+
+import numpy as np
+
+from src.types.column_store import ColumnStore
+
+NODE_FIELDS = ("cpu_capacity", "cost_per_unit", "delay", "available_cpu")
+LINK_FIELDS = ("bandwidth", "cost_per_unit", "delay", "available_bw")
 
 class SubstrateNode:
-    def __init__(self, node_id: int, cpu_capacity: float, cost_per_unit: float, delay: float = 0.0):
+    """
+    Node vật lý. Các field là slot thường (đọc nhanh, trả về float Python); bản dạng cột
+    nằm trong ColumnStore của SubstrateNetwork theo chỉ số dense `_idx` để xử lý vectorized.
+    Field tĩnh được ghi vào cột khi node vào store, available_cpu được ghi xuyên qua
+    setter nên cột luôn đồng bộ. Node tạo riêng lẻ dùng store riêng cho tới khi được thêm vào network.
+    """
+    __slots__ = ("node_id", "domain_id", "cpu_capacity", "cost_per_unit", "delay", "_available_cpu",
+                 "_domain", "_store", "_idx")
+
+    def __init__(self, node_id: int, cpu_capacity: float, cost_per_unit: float, delay: float = 0.0, store: Optional[ColumnStore] = None):
         self.node_id = node_id
+        self.domain_id: Optional[int] = None  # gán bởi SubstrateDomain.add_node
         self.cpu_capacity = cpu_capacity
         self.cost_per_unit = cost_per_unit
         self.delay = delay
-        self.available_cpu = cpu_capacity
+        self._available_cpu = cpu_capacity
+        self._domain: Optional["SubstrateDomain"] = None
+        self._store = store if store is not None else ColumnStore(NODE_FIELDS, capacity=1)
+        self._idx = self._store.append(self)
 
-class SubstrateLink:
-    def __init__(self, src: SubstrateNode, dst: SubstrateNode, bandwidth: float, cost_per_unit: float, delay: float = 0.0):
-        self.src = src
-        self.dst = dst
+    def _set_available_cpu(self, value: float):
+        old_cpu = self._available_cpu
+        self._available_cpu = value = float(value)
+        self._store.available_cpu[self._idx] = value
+        if self._domain is not None:
+            self._domain._cpu_changed(self, old_cpu)
+
+    # getter bằng attrgetter (C) vì available_cpu được đọc trong mọi vòng lọc node
+    available_cpu = property(attrgetter("_available_cpu"), _set_available_cpu)
+
+class _LinkState:
+    """bandwidth, cost_per_unit, delay, available_bw của link; available_bw ghi xuyên vào ColumnStore."""
+    __slots__ = ("bandwidth", "cost_per_unit", "delay", "_available_bw", "_store", "_idx")
+
+    def _init_state(self, bandwidth: float, cost_per_unit: float, delay: float, store: Optional[ColumnStore]):
         self.bandwidth = bandwidth
         self.cost_per_unit = cost_per_unit
         self.delay = delay
-        self.available_bw = bandwidth
+        self._available_bw = bandwidth
+        self._store = store if store is not None else ColumnStore(LINK_FIELDS, capacity=1)
+        self._idx = self._store.append(self)
+
+    def _set_available_bw(self, value: float):
+        self._available_bw = value = float(value)
+        self._store.available_bw[self._idx] = value
+
+    # getter bằng attrgetter (C) vì available_bw được đọc ở mỗi cạnh Dijkstra / Kruskal
+    available_bw = property(attrgetter("_available_bw"), _set_available_bw)
+
+class SubstrateLink(_LinkState):
+    __slots__ = ("src", "dst")
+
+    def __init__(self, src: SubstrateNode, dst: SubstrateNode, bandwidth: float, cost_per_unit: float, delay: float = 0.0, store: Optional[ColumnStore] = None):
+        self.src = src
+        self.dst = dst
+        self._init_state(bandwidth, cost_per_unit, delay, store)
 
 class SubstrateDomain:
     def __init__(self, domain_id: int):
@@ -24,34 +74,165 @@ class SubstrateDomain:
         self.nodes: List[SubstrateNode] = []
         self.links: List[SubstrateLink] = []
         self.boundary_nodes: List[SubstrateNode] = []
+        # node -> các link nội miền kề với node, cập nhật bởi add_node/add_link
+        self.adjacency: Dict[SubstrateNode, List[SubstrateLink]] = {}
+        # Index theo available_cpu tăng dần: key (available_cpu, -vị trí node), cập nhật khi CPU đổi
+        self._cpu_keys: List[Tuple[float, int]] = []
+        self._cpu_nodes: List[SubstrateNode] = []
+        self._positions: Dict[SubstrateNode, int] = {}
+        # Tổng available_cpu của domain, cập nhật cùng capacity index
+        self.free_cpu: float = 0.0
+        self._network: Optional["SubstrateNetwork"] = None
 
     def add_node(self, snode: SubstrateNode):
+        if self._network is not None:
+            self._network.node_store.adopt(snode)
+        snode.domain_id = self.domain_id
+        snode._domain = self
+        self._positions[snode] = len(self.nodes)
         self.nodes.append(snode)
+        self.adjacency.setdefault(snode, [])
+        self._index_insert(snode)
+        self.free_cpu += snode.available_cpu
 
     def add_link(self, slink: SubstrateLink):
+        if self._network is not None:
+            self._network.link_store.adopt(slink)
         self.links.append(slink)
+        self.adjacency.setdefault(slink.src, []).append(slink)
+        self.adjacency.setdefault(slink.dst, []).append(slink)
 
     def set_boundary_nodes(self, boundary_nodes: List[SubstrateNode]):
         self.boundary_nodes = boundary_nodes
 
-class InterLink:
-    def __init__(self, src_domain: SubstrateDomain, dst_domain: SubstrateDomain, src: SubstrateNode, dst: SubstrateNode, bandwidth: float, cost_per_unit: float, delay: float = 0.0):
+    def node_indices(self) -> np.ndarray:
+        """Chỉ số dense của các node trong domain (dùng với SubstrateNetwork.node_store)."""
+        return np.fromiter((n._idx for n in self.nodes), dtype=np.int64, count=len(self.nodes))
+
+    # ---------------- Capacity index ----------------
+    def nodes_with_cpu(self, min_cpu: float) -> List[SubstrateNode]:
+        """Các node có available_cpu >= min_cpu, theo available_cpu tăng dần. O(log n + k)."""
+        i = bisect_left(self._cpu_keys, (min_cpu, float('-inf')))
+        return self._cpu_nodes[i:]
+
+    def max_cpu_node(self) -> Optional[SubstrateNode]:
+        """Node có available_cpu lớn nhất (bằng nhau thì node thêm vào trước), None nếu domain rỗng."""
+        return self._cpu_nodes[-1] if self._cpu_nodes else None
+
+    def _index_insert(self, snode: SubstrateNode):
+        key = (snode.available_cpu, -self._positions[snode])
+        i = bisect_left(self._cpu_keys, key)
+        self._cpu_keys.insert(i, key)
+        self._cpu_nodes.insert(i, snode)
+
+    def _cpu_changed(self, snode: SubstrateNode, old_cpu: float):
+        i = bisect_left(self._cpu_keys, (old_cpu, -self._positions[snode]))
+        del self._cpu_keys[i]
+        del self._cpu_nodes[i]
+        self._index_insert(snode)
+        self.free_cpu += snode.available_cpu - old_cpu
+
+    def _fork_into(self, clone: "SubstrateDomain", nodes: List[SubstrateNode], links: List) -> None:
+        """Điền clone bằng cấu trúc của domain này; nodes / links: entity mới theo chỉ số dense."""
+        clone.nodes = [nodes[n._idx] for n in self.nodes]
+        clone.links = [links[l._idx] for l in self.links]
+        clone.boundary_nodes = [nodes[n._idx] for n in self.boundary_nodes]
+        clone.adjacency = {nodes[n._idx]: [links[l._idx] for l in adj] for n, adj in self.adjacency.items()}
+        clone._cpu_keys = list(self._cpu_keys)
+        clone._cpu_nodes = [nodes[n._idx] for n in self._cpu_nodes]
+        clone._positions = {nodes[n._idx]: pos for n, pos in self._positions.items()}
+        clone.free_cpu = self.free_cpu
+        for snode in clone.nodes:
+            snode._domain = clone
+
+class InterLink(_LinkState):
+    __slots__ = ("src_domain", "dst_domain", "src", "dst")
+
+    def __init__(self, src_domain: SubstrateDomain, dst_domain: SubstrateDomain, src: SubstrateNode, dst: SubstrateNode, bandwidth: float, cost_per_unit: float, delay: float = 0.0, store: Optional[ColumnStore] = None):
         self.src_domain = src_domain
         self.dst_domain = dst_domain
         self.src = src
         self.dst = dst
-        self.bandwidth = bandwidth
-        self.cost_per_unit = cost_per_unit
-        self.delay = delay
-        self.available_bw = bandwidth
+        self._init_state(bandwidth, cost_per_unit, delay, store)
 
 class SubstrateNetwork:
     def __init__(self):
         self.domains: List[SubstrateDomain] = []
         self.links: List[InterLink] = []
+        # boundary node -> các inter-domain link kề với node
+        self.adjacency: Dict[SubstrateNode, List[InterLink]] = {}
+        # Trạng thái của mọi node / link (cả intra và inter-domain), đánh chỉ số dense
+        self.node_store = ColumnStore(NODE_FIELDS)
+        self.link_store = ColumnStore(LINK_FIELDS)
 
     def add_domain(self, domain: SubstrateDomain):
+        domain._network = self
+        for snode in domain.nodes:
+            self.node_store.adopt(snode)
+        for slink in domain.links:
+            self.link_store.adopt(slink)
         self.domains.append(domain)
 
+    def free_cpu(self) -> float:
+        """Tổng available_cpu của mọi domain (từ tổng theo domain, không duyệt node)."""
+        return sum(domain.free_cpu for domain in self.domains)
+
     def add_link(self, inter_link: InterLink):
+        self.link_store.adopt(inter_link)
         self.links.append(inter_link)
+        self.adjacency.setdefault(inter_link.src, []).append(inter_link)
+        self.adjacency.setdefault(inter_link.dst, []).append(inter_link)
+
+    def fork(self) -> "SubstrateNetwork":
+        """
+        Bản sao độc lập về tài nguyên, thay cho copy.deepcopy.
+
+        Các cột tĩnh (cpu_capacity, bandwidth, cost_per_unit, delay) dùng chung mảng với
+        network gốc; chỉ available_cpu / available_bw được copy. Node, link, domain là
+        object mới (giữ nguyên chỉ số dense) nên cấp / giải phóng tài nguyên trên bản fork
+        không ảnh hưởng network gốc. Không sửa các thuộc tính tĩnh sau khi fork.
+        """
+        network = SubstrateNetwork.__new__(SubstrateNetwork)
+        network.node_store = self.node_store.fork(mutable=("available_cpu",))
+        network.link_store = self.link_store.fork(mutable=("available_bw",))
+        network.domains = [SubstrateDomain(domain.domain_id) for domain in self.domains]
+        domain_map = dict(zip(self.domains, network.domains))
+
+        nodes = network.node_store.entities
+        for snode in self.node_store.entities:
+            clone = SubstrateNode.__new__(SubstrateNode)
+            clone.node_id = snode.node_id
+            clone.domain_id = snode.domain_id
+            clone.cpu_capacity = snode.cpu_capacity
+            clone.cost_per_unit = snode.cost_per_unit
+            clone.delay = snode.delay
+            clone._available_cpu = snode._available_cpu
+            clone._domain = None
+            clone._store = network.node_store
+            clone._idx = snode._idx
+            nodes.append(clone)
+
+        links = network.link_store.entities
+        for slink in self.link_store.entities:
+            if isinstance(slink, InterLink):
+                clone = InterLink.__new__(InterLink)
+                clone.src_domain = domain_map[slink.src_domain]
+                clone.dst_domain = domain_map[slink.dst_domain]
+            else:
+                clone = SubstrateLink.__new__(SubstrateLink)
+            clone.src = nodes[slink.src._idx]
+            clone.dst = nodes[slink.dst._idx]
+            clone.bandwidth = slink.bandwidth
+            clone.cost_per_unit = slink.cost_per_unit
+            clone.delay = slink.delay
+            clone._available_bw = slink._available_bw
+            clone._store = network.link_store
+            clone._idx = slink._idx
+            links.append(clone)
+
+        for domain, clone in domain_map.items():
+            domain._fork_into(clone, nodes, links)
+            clone._network = network
+        network.links = [links[l._idx] for l in self.links]
+        network.adjacency = {nodes[n._idx]: [links[l._idx] for l in adj] for n, adj in self.adjacency.items()}
+        return network
@@ -1,12 +1,16 @@
 from typing import List
 
 class VirtualNode:
+    __slots__ = ("id", "cpu_demand", "domains")
+
     def __init__(self, node_id: int, cpu_demand: float, domains: List[int]):
         self.id = node_id
         self.cpu_demand = cpu_demand
         self.domains = domains
 
 class VirtualLink:
+    __slots__ = ("src", "dst", "bandwidth")
+
     def __init__(self, src: VirtualNode, dst: VirtualNode, bandwidth: float):
         self.src = src
         self.dst = dst
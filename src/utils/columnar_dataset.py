@@ -0,0 +1,295 @@
+"""
+Định dạng dataset dạng cột (columnar): một thư mục gồm các file .npy phẳng
+(bảng node, link, inter-link, request, vnode, vlink) cùng một file meta.json.
+
+Mọi mảng được mở bằng np.load(mmap_mode="r") nên việc load gần như tức thời,
+các worker process mở cùng dataset dùng chung page cache của OS, và request chỉ
+được dựng thành object khi truy cập (ColumnarRequests[i]).
+
+Quan hệ một-nhiều (domain -> node, request -> vnode, ...) lưu theo kiểu CSR:
+mảng `*_ptr` độ dài n + 1, phần tử của hàng i nằm trong [ptr[i], ptr[i + 1]).
+
+Chuyển đổi:
+    json_to_columnar("datasets/small_1.json", "datasets/small_1.cols")
+    columnar_to_json("datasets/small_1.cols", "small_1.json")
+"""
+import json
+import os
+import time
+from collections.abc import Sequence
+from typing import Any, Dict, Iterator, List
+
+import numpy as np
+
+from src.types.substrate import SubstrateNetwork
+from src.types.request import VirtualRequest
+from src.utils.jsonl_trace import load_jsonl_trace
+from src.utils.load_dataset_from_json import (
+    load_dataset_from_json,
+    parse_json_file,
+    substrate_network_from_dict,
+    virtual_request_from_dict
+)
+
+FORMAT_VERSION = 1
+
+NODE_COLUMNS = ("cpu_capacity", "cost_per_unit", "delay", "available_cpu")
+LINK_COLUMNS = ("bandwidth", "cost_per_unit", "delay", "available_bw")
+
+
+# ---------------- JSON schema -> columnar ----------------
+def _csr_ptr(counts: List[int]) -> np.ndarray:
+    ptr = np.zeros(len(counts) + 1, dtype=np.int64)
+    np.cumsum(counts, out=ptr[1:])
+    return ptr
+
+
+def _float_column(rows: List[Dict[str, Any]], key: str, fallback: str = None) -> np.ndarray:
+    if fallback is None:
+        return np.array([r[key] for r in rows], dtype=np.float64)
+    return np.array([r.get(key, r[fallback]) for r in rows], dtype=np.float64)
+
+
+def dict_to_columns(data: Dict[str, Any]) -> Dict[str, np.ndarray]:
+    """Chuyển dataset theo schema JSON (như dataset_to_json ghi ra) thành các mảng cột."""
+    substrate = data["substrate_network"]
+    domains = substrate["domains"]
+    nodes = [n for d in domains for n in d["nodes"]]
+    links = [l for d in domains for l in d["links"]]
+    inter_links = substrate.get("inter_domain_links", [])
+
+    columns = {
+        "domain_id": np.array([d["domain_id"] for d in domains], dtype=np.int64),
+        "domain_node_ptr": _csr_ptr([len(d["nodes"]) for d in domains]),
+        "domain_link_ptr": _csr_ptr([len(d["links"]) for d in domains]),
+        "domain_boundary_ptr": _csr_ptr([len(d.get("boundary_nodes", [])) for d in domains]),
+        "boundary_node_id": np.array([nid for d in domains for nid in d.get("boundary_nodes", [])], dtype=np.int64),
+        "node_id": np.array([n["node_id"] for n in nodes], dtype=np.int64),
+        "link_src": np.array([l["src"] for l in links], dtype=np.int64),
+        "link_dst": np.array([l["dst"] for l in links], dtype=np.int64),
+        "inter_src_domain": np.array([l["src_domain"] for l in inter_links], dtype=np.int64),
+        "inter_dst_domain": np.array([l["dst_domain"] for l in inter_links], dtype=np.int64),
+        "inter_src": np.array([l["src"] for l in inter_links], dtype=np.int64),
+        "inter_dst": np.array([l["dst"] for l in inter_links], dtype=np.int64),
+    }
+    for name in NODE_COLUMNS:
+        fallback = "cpu_capacity" if name == "available_cpu" else None
+        columns["node_" + name] = _float_column(nodes, name, fallback)
+    for name in LINK_COLUMNS:
+        fallback = "bandwidth" if name == "available_bw" else None
+        columns["link_" + name] = _float_column(links, name, fallback)
+        columns["inter_" + name] = _float_column(inter_links, name, fallback)
+
+    requests = data["virtual_requests"]
+    vnodes = [n for r in requests for n in r["vnetwork"]["nodes"]]
+    vlinks = [l for r in requests for l in r["vnetwork"]["links"]]
+    columns.update({
+        "req_arrival_time": _float_column(requests, "arrival_time"),
+        "req_lifetime": _float_column(requests, "lifetime"),
+        "req_vnode_ptr": _csr_ptr([len(r["vnetwork"]["nodes"]) for r in requests]),
+        "req_vlink_ptr": _csr_ptr([len(r["vnetwork"]["links"]) for r in requests]),
+        "vnode_id": np.array([n["id"] for n in vnodes], dtype=np.int64),
+        "vnode_cpu_demand": _float_column(vnodes, "cpu_demand"),
+        "vnode_domain_ptr": _csr_ptr([len(n.get("domains", [])) for n in vnodes]),
+        "vnode_domain": np.array([d for n in vnodes for d in n.get("domains", [])], dtype=np.int64),
+        "vlink_src": np.array([l["src"] for l in vlinks], dtype=np.int64),
+        "vlink_dst": np.array([l["dst"] for l in vlinks], dtype=np.int64),
+        "vlink_bandwidth": _float_column(vlinks, "bandwidth"),
+    })
+    return columns
+
+
+def save_columns(columns: Dict[str, np.ndarray], path: str) -> None:
+    """Ghi mỗi cột ra path/<tên>.npy, meta.json ghi sau cùng (đánh dấu dataset hoàn chỉnh)."""
+    os.makedirs(path, exist_ok=True)
+    for name, array in columns.items():
+        np.save(os.path.join(path, name + ".npy"), np.ascontiguousarray(array))
+    meta = {
+        "format_version": FORMAT_VERSION,
+        "columns": sorted(columns),
+        "num_nodes": int(len(columns["node_id"])),
+        "num_requests": int(len(columns["req_arrival_time"])),
+    }
+    with open(os.path.join(path, "meta.json"), "w") as f:
+        json.dump(meta, f, indent=4)
+
+
+def json_to_columnar(json_file: str, path: str) -> None:
+    """Chuyển file dataset JSON sang thư mục columnar."""
+    save_columns(dict_to_columns(parse_json_file(json_file)), path)
+    print(f"Columnar dataset saved to {path}")
+
+
+# ---------------- Columnar -> objects / JSON schema ----------------
+def open_columns(path: str) -> Dict[str, np.ndarray]:
+    """Mở tất cả các cột ở chế độ memory-mapped, chỉ đọc."""
+    with open(os.path.join(path, "meta.json"), "r") as f:
+        meta = json.load(f)
+    if meta.get("format_version") != FORMAT_VERSION:
+        raise ValueError(f"Unsupported columnar dataset version {meta.get('format_version')} in {path}")
+    return {name: np.load(os.path.join(path, name + ".npy"), mmap_mode="r") for name in meta["columns"]}
+
+
+def substrate_to_dict(columns: Dict[str, np.ndarray]) -> Dict[str, Any]:
+    """Dựng lại phần "substrate_network" theo schema JSON từ các cột."""
+    node_ptr = columns["domain_node_ptr"].tolist()
+    link_ptr = columns["domain_link_ptr"].tolist()
+    boundary_ptr = columns["domain_boundary_ptr"].tolist()
+    node_id = columns["node_id"].tolist()
+    boundary_id = columns["boundary_node_id"].tolist()
+    link_src = columns["link_src"].tolist()
+    link_dst = columns["link_dst"].tolist()
+    node_values = [columns["node_" + name].tolist() for name in NODE_COLUMNS]
+    link_values = [columns["link_" + name].tolist() for name in LINK_COLUMNS]
+    inter_values = [columns["inter_" + name].tolist() for name in LINK_COLUMNS]
+
+    domains = []
+    for d, domain_id in enumerate(columns["domain_id"].tolist()):
+        nodes = []
+        for i in range(node_ptr[d], node_ptr[d + 1]):
+            node = {"node_id": node_id[i]}
+            node.update(zip(NODE_COLUMNS, (values[i] for values in node_values)))
+            nodes.append(node)
+        links = []
+        for i in range(link_ptr[d], link_ptr[d + 1]):
+            link = {"src": link_src[i], "dst": link_dst[i]}
+            link.update(zip(LINK_COLUMNS, (values[i] for values in link_values)))
+            links.append(link)
+        domains.append({
+            "domain_id": domain_id,
+            "nodes": nodes,
+            "links": links,
+            "boundary_nodes": boundary_id[boundary_ptr[d]:boundary_ptr[d + 1]]
+        })
+
+    inter_links = []
+    endpoints = zip(columns["inter_src_domain"].tolist(), columns["inter_dst_domain"].tolist(),
+                    columns["inter_src"].tolist(), columns["inter_dst"].tolist())
+    for i, (src_domain, dst_domain, src, dst) in enumerate(endpoints):
+        link = {"src_domain": src_domain, "dst_domain": dst_domain, "src": src, "dst": dst}
+        link.update(zip(LINK_COLUMNS, (values[i] for values in inter_values)))
+        inter_links.append(link)
+
+    return {"domains": domains, "inter_domain_links": inter_links}
+
+
+class ColumnarRequests(Sequence):
+    """
+    Danh sách virtual request đọc lazy từ các cột memory-mapped.
+
+    Mỗi lần truy cập requests[i] dựng một VirtualRequest mới chỉ từ các hàng của
+    request đó; không có object nào được giữ lại giữa các lần truy cập. Duyệt tuần tự
+    (for req in requests) đọc các cột theo từng khối CHUNK_SIZE request.
+    """
+
+    CHUNK_SIZE = 4096
+
+    def __init__(self, columns: Dict[str, np.ndarray]):
+        self.columns = columns
+        self.arrival_times = columns["req_arrival_time"]
+        self.lifetimes = columns["req_lifetime"]
+
+    def __len__(self) -> int:
+        return len(self.arrival_times)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(len(self)))]
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError("request index out of range")
+        return virtual_request_from_dict(self.to_dict(index))
+
+    def __iter__(self) -> Iterator[VirtualRequest]:
+        for raw in self.iter_dicts():
+            yield virtual_request_from_dict(raw)
+
+    def to_dict(self, index: int) -> Dict[str, Any]:
+        """Request thứ index theo schema JSON."""
+        return next(self.iter_dicts(index, index + 1))
+
+    def iter_dicts(self, start: int = 0, stop: int = None) -> Iterator[Dict[str, Any]]:
+        """Các request trong [start, stop) theo schema JSON, đọc cột theo từng khối."""
+        stop = len(self) if stop is None else stop
+        for chunk_start in range(start, stop, self.CHUNK_SIZE):
+            yield from self._chunk_dicts(chunk_start, min(chunk_start + self.CHUNK_SIZE, stop))
+
+    def _chunk_dicts(self, start: int, stop: int) -> Iterator[Dict[str, Any]]:
+        c = self.columns
+        vnode_ptr = c["req_vnode_ptr"][start:stop + 1].tolist()
+        vlink_ptr = c["req_vlink_ptr"][start:stop + 1].tolist()
+        n0, n1 = vnode_ptr[0], vnode_ptr[-1]
+        l0, l1 = vlink_ptr[0], vlink_ptr[-1]
+
+        # Chỉ số trong các list dưới đây tương đối so với đầu khối
+        domain_ptr = c["vnode_domain_ptr"][n0:n1 + 1].tolist()
+        domains = c["vnode_domain"][domain_ptr[0]:domain_ptr[-1]].tolist()
+        d0 = domain_ptr[0]
+        vnode_id = c["vnode_id"][n0:n1].tolist()
+        vnode_cpu = c["vnode_cpu_demand"][n0:n1].tolist()
+        vlink_src = c["vlink_src"][l0:l1].tolist()
+        vlink_dst = c["vlink_dst"][l0:l1].tolist()
+        vlink_bw = c["vlink_bandwidth"][l0:l1].tolist()
+        arrival_times = self.arrival_times[start:stop].tolist()
+        lifetimes = self.lifetimes[start:stop].tolist()
+
+        for r in range(stop - start):
+            nodes = [
+                {"id": vnode_id[k], "cpu_demand": vnode_cpu[k],
+                 "domains": domains[domain_ptr[k] - d0:domain_ptr[k + 1] - d0]}
+                for k in range(vnode_ptr[r] - n0, vnode_ptr[r + 1] - n0)
+            ]
+            links = [
+                {"src": vlink_src[k], "dst": vlink_dst[k], "bandwidth": vlink_bw[k]}
+                for k in range(vlink_ptr[r] - l0, vlink_ptr[r + 1] - l0)
+            ]
+            yield {
+                "vnetwork": {"nodes": nodes, "links": links},
+                "arrival_time": arrival_times[r],
+                "lifetime": lifetimes[r]
+            }
+
+
+def load_columnar_dataset(path: str) -> Dict[str, Any]:
+    """
+    Load dataset columnar. Substrate được dựng thành object ngay (nhỏ), còn request
+    được giữ dạng memory-mapped và dựng lazy.
+
+    Returns:
+        {
+            "substrate_network": SubstrateNetwork,
+            "virtual_requests": ColumnarRequests,  # Sequence[VirtualRequest]
+            "load_time": float
+        }
+    """
+    t0 = time.perf_counter()
+    columns = open_columns(path)
+    substrate_network: SubstrateNetwork = substrate_network_from_dict(substrate_to_dict(columns))
+    return {
+        "substrate_network": substrate_network,
+        "virtual_requests": ColumnarRequests(columns),
+        "load_time": time.perf_counter() - t0
+    }
+
+
+def columnar_to_json(path: str, json_file: str, indent: int = 4) -> None:
+    """Chuyển thư mục columnar về file dataset JSON (schema của dataset_to_json)."""
+    columns = open_columns(path)
+    requests = ColumnarRequests(columns)
+    json_data = {
+        "substrate_network": substrate_to_dict(columns),
+        "virtual_requests": list(requests.iter_dicts())
+    }
+    with open(json_file, "w") as f:
+        json.dump(json_data, f, indent=indent)
+    print(f"Dataset saved to {json_file}")
+
+
+def load_dataset(path: str) -> Dict[str, Any]:
+    """Load dataset theo định dạng: thư mục columnar, trace JSONL (streaming) hoặc file JSON."""
+    if os.path.isdir(path):
+        return load_columnar_dataset(path)
+    if path.endswith(".jsonl"):
+        return load_jsonl_trace(path)
+    return load_dataset_from_json(path)
@@ -1,9 +1,36 @@
-from typing import Callable, List
+from functools import partial
+from typing import Any, Callable, Dict, List
 import numpy as np
 from src.types.substrate import SubstrateNetwork, SubstrateDomain
 from src.types.virtual import VirtualNetwork
 from src.types.dataset import Dataset
 from src.types.request import VirtualRequest
+from src.utils.generate_substrate_network import generate_substrate_network
+from src.utils.generate_virtual_network import generate_virtual_network_test
+
+# Cấu hình theo kích thước: tham số của generate_substrate_network, generate_virtual_network_test
+# và generate_dataset. "small" trùng với tham số mặc định (datasets/small_*.json).
+PRESETS: Dict[str, Dict[str, Dict[str, Any]]] = {
+    "small": {
+        "substrate": {"num_domains": 4, "num_nodes": 30, "num_boundary_nodes": 2, "link_connection_rate": 50},
+        "virtual": {"num_nodes": 6, "num_domains": 4, "link_connection_rate": 50},
+        "dataset": {"total_time_units": 10000, "avg_requests": 200, "avg_lifetime": 1000},
+    },
+    "medium": {
+        # ~1k node, Waxman bậc trung bình ~5 trong mỗi domain
+        "substrate": {"num_domains": 8, "num_nodes": 1000, "num_boundary_nodes": 4, "topology": "waxman",
+                      "link_connection_rate": 50, "waxman_beta": 0.1, "inter_link_connection_rate": 50},
+        "virtual": {"num_nodes": 10, "num_domains": 8, "link_connection_rate": 30},
+        "dataset": {"total_time_units": 10000, "avg_requests": 5000, "avg_lifetime": 1000},
+    },
+    "large": {
+        # 10k node, Barabási–Albert (bậc trung bình ~6) trong mỗi domain
+        "substrate": {"num_domains": 16, "num_nodes": 10000, "num_boundary_nodes": 8, "topology": "barabasi_albert",
+                      "ba_edges_per_node": 3, "inter_link_connection_rate": 25},
+        "virtual": {"num_nodes": 12, "num_domains": 16, "link_connection_rate": 25},
+        "dataset": {"total_time_units": 10000, "avg_requests": 50000, "avg_lifetime": 1000},
+    },
+}
 
 
 def generate_dataset(
@@ -12,7 +39,7 @@ def generate_dataset(
     total_time_units: float = 10000,
     avg_requests: float = 10,
     avg_lifetime: float = 1000,
-    seed: int | None = None
+    seed: int | np.random.Generator | None = None
 ) -> Dataset:
     """
     Generate dataset using existing substrate_generator() and virtual_generator().
@@ -47,3 +74,18 @@ def generate_dataset(
         substrate_network=substrate_network,
         virtual_requests=virtual_requests
     )
+
+
+def generate_preset_dataset(preset: str, seed: int | None = None) -> Dataset:
+    """Generate dataset theo một preset trong PRESETS ("small", "medium", "large")."""
+    if preset not in PRESETS:
+        raise ValueError(f"Unknown preset '{preset}', expected one of {list(PRESETS)}")
+    config = PRESETS[preset]
+    # Ba luồng ngẫu nhiên độc lập cho substrate, virtual network và arrival/lifetime
+    substrate_rng, virtual_rng, arrival_rng = (np.random.default_rng(s) for s in np.random.SeedSequence(seed).spawn(3))
+    return generate_dataset(
+        substrate_generator=partial(generate_substrate_network, seed=substrate_rng, **config["substrate"]),
+        virtual_generator=partial(generate_virtual_network_test, rng=virtual_rng, **config["virtual"]),
+        seed=arrival_rng,
+        **config["dataset"]
+    )
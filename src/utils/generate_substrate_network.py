@@ -1,7 +1,9 @@
-import random
-from typing import List
+from typing import List, Optional
+
+import numpy as np
 
 from src.types.substrate import InterLink, SubstrateDomain, SubstrateLink, SubstrateNetwork, SubstrateNode
+from src.utils.sparse_graph import barabasi_albert_edges, bipartite_edges, erdos_renyi_edges, waxman_edges
 
 def generate_substrate_network(
     num_domains: int = 4,
@@ -16,18 +18,29 @@ def generate_substrate_network(
     inter_link_delay_range: tuple = (10, 30),
     num_boundary_nodes: int = 2,
     link_connection_rate: float = 50,
-    seed: int = None
+    seed: int | np.random.Generator | None = None,
+    topology: str = "erdos_renyi",
+    waxman_beta: float = 0.4,
+    ba_edges_per_node: int = 2,
+    inter_link_connection_rate: Optional[float] = None
 ):
     """
     Generate a SubstrateNetwork using your classes:
     - num_nodes is TOTAL nodes across all domains (will be split evenly)
     - domains store nodes as list (SubstrateDomain.nodes: List[SubstrateNode])
     - inter-domain links use inter_link_cost_range / inter_link_delay_range
-    """
 
-    if seed is not None:
-        random.seed(seed)
+    Intra-domain topology (sampled sparsely with NumPy, see src/utils/sparse_graph.py):
+    - "erdos_renyi":     each node pair is linked with probability link_connection_rate (%)
+    - "waxman":          link_connection_rate (%) is alpha, waxman_beta is beta
+    - "barabasi_albert": each new node attaches to ba_edges_per_node existing nodes
+    Boundary node pairs of two domains are linked with probability
+    inter_link_connection_rate (%), defaulting to link_connection_rate.
+    """
+    if inter_link_connection_rate is None:
+        inter_link_connection_rate = link_connection_rate
 
+    rng = np.random.default_rng(seed)
     network = SubstrateNetwork()
 
     base = num_nodes // num_domains
@@ -41,16 +54,16 @@ def generate_substrate_network(
         domain = SubstrateDomain(domain_id=d)
         count = nodes_per_domain[d]
 
-        for _ in range(count):
-            cpu = random.uniform(*node_resource_range)
-            cost = random.uniform(*node_cost_range)
-            delay = random.uniform(*node_delay_range)
-
+        cpus = rng.uniform(*node_resource_range, size=count).tolist()
+        costs = rng.uniform(*node_cost_range, size=count).tolist()
+        delays = rng.uniform(*node_delay_range, size=count).tolist()
+        for cpu, cost, delay in zip(cpus, costs, delays):
             node = SubstrateNode(
                 node_id=global_node_id,
                 cpu_capacity=cpu,
                 cost_per_unit=cost,
-                delay=delay
+                delay=delay,
+                store=network.node_store
             )
             global_node_id += 1
             domain.add_node(node)
@@ -58,27 +71,26 @@ def generate_substrate_network(
         if len(domain.nodes) < num_boundary_nodes:
             boundary_nodes = list(domain.nodes)
         else:
-            boundary_nodes = random.sample(domain.nodes, num_boundary_nodes)
+            boundary_nodes = [domain.nodes[i] for i in rng.choice(count, num_boundary_nodes, replace=False).tolist()]
 
         domain.set_boundary_nodes(boundary_nodes)
         domain_boundary_nodes.append(boundary_nodes)
 
         nodes = domain.nodes
-        n = len(nodes)
-        for i in range(n):
-            for j in range(i + 1, n):
-                if random.random() <= link_connection_rate / 100.0:
-                    bw = random.uniform(*link_resource_range)
-                    link_cost = random.uniform(*link_cost_range)
-                    link_delay = random.uniform(*link_delay_range)
-                    link = SubstrateLink(
-                        src=nodes[i],
-                        dst=nodes[j],
-                        bandwidth=bw,
-                        cost_per_unit=link_cost,
-                        delay=link_delay
-                    )
-                    domain.add_link(link)
+        src, dst = _intra_domain_edges(count, topology, link_connection_rate / 100.0, waxman_beta, ba_edges_per_node, rng)
+        bws = rng.uniform(*link_resource_range, size=len(src)).tolist()
+        link_costs = rng.uniform(*link_cost_range, size=len(src)).tolist()
+        link_delays = rng.uniform(*link_delay_range, size=len(src)).tolist()
+        for i, j, bw, link_cost, link_delay in zip(src.tolist(), dst.tolist(), bws, link_costs, link_delays):
+            link = SubstrateLink(
+                src=nodes[i],
+                dst=nodes[j],
+                bandwidth=bw,
+                cost_per_unit=link_cost,
+                delay=link_delay,
+                store=network.link_store
+            )
+            domain.add_link(link)
 
         network.add_domain(domain)
 
@@ -87,21 +99,32 @@ def generate_substrate_network(
         for j in range(i + 1, num_domains):
             src_nodes = domain_boundary_nodes[i]
             dst_nodes = domain_boundary_nodes[j]
-            for src in src_nodes:
-                for dst in dst_nodes:
-                    if random.random() <= link_connection_rate / 100.0:
-                        bw = random.uniform(*link_resource_range)
-                        cost = random.uniform(*inter_link_cost_range)
-                        delay = random.uniform(*inter_link_delay_range)
-                        inter_link = InterLink(
-                            src_domain=network.domains[i],
-                            dst_domain=network.domains[j],
-                            src=src,
-                            dst=dst,
-                            bandwidth=bw,
-                            cost_per_unit=cost,
-                            delay=delay
-                        )
-                        network.add_link(inter_link)
+            src, dst = bipartite_edges(len(src_nodes), len(dst_nodes), inter_link_connection_rate / 100.0, rng)
+            bws = rng.uniform(*link_resource_range, size=len(src)).tolist()
+            costs = rng.uniform(*inter_link_cost_range, size=len(src)).tolist()
+            delays = rng.uniform(*inter_link_delay_range, size=len(src)).tolist()
+            for a, b, bw, cost, delay in zip(src.tolist(), dst.tolist(), bws, costs, delays):
+                inter_link = InterLink(
+                    src_domain=network.domains[i],
+                    dst_domain=network.domains[j],
+                    src=src_nodes[a],
+                    dst=dst_nodes[b],
+                    bandwidth=bw,
+                    cost_per_unit=cost,
+                    delay=delay,
+                    store=network.link_store
+                )
+                network.add_link(inter_link)
 
     return network
+
+
+def _intra_domain_edges(n: int, topology: str, p: float, waxman_beta: float, ba_edges_per_node: int,
+                        rng: np.random.Generator):
+    if topology == "erdos_renyi":
+        return erdos_renyi_edges(n, p, rng)
+    if topology == "waxman":
+        return waxman_edges(n, p, waxman_beta, rng)
+    if topology == "barabasi_albert":
+        return barabasi_albert_edges(n, ba_edges_per_node, rng)
+    raise ValueError(f"Unknown topology '{topology}'")
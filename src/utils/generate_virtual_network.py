@@ -1,37 +1,44 @@
-import random
-from typing import List
+from typing import List, Optional
+
+import numpy as np
+
 from src.types.virtual import VirtualLink, VirtualNetwork, VirtualNode
+from src.utils.sparse_graph import erdos_renyi_edges
 
 def generate_virtual_network_test(
     num_nodes: int = 6,
     cpu_range: tuple = (1, 10),
     bandwidth_range: tuple = (1, 10),
     num_domains: int = 4,
-    link_connection_rate: float = 50
+    link_connection_rate: float = 50,
+    rng: Optional[np.random.Generator] = None
 ) -> VirtualNetwork:
     """
     Generate a random VirtualNetwork for testing.
     Each node can be mapped to 1..num_domains candidate domains.
     Nodes are connected randomly according to link_connection_rate (%).
+    Pass rng (np.random.Generator) for reproducible output.
     """
+    if rng is None:
+        rng = np.random.default_rng()
+
     # ---- Create virtual nodes ----
-    vnodes: List[VirtualNode] = []
-    for i in range(num_nodes):
-        domains = random.sample(range(num_domains), random.randint(1, num_domains))
-        node = VirtualNode(node_id=i, cpu_demand=random.uniform(*cpu_range), domains=domains)
-        vnodes.append(node)
+    cpu_demands = rng.uniform(*cpu_range, size=num_nodes).tolist()
+    num_candidates = rng.integers(1, num_domains + 1, size=num_nodes).tolist()
+    # Mỗi hàng là một hoán vị các domain, lấy num_candidates phần tử đầu
+    domain_orders = rng.permuted(np.tile(np.arange(num_domains), (num_nodes, 1)), axis=1).tolist()
+    vnodes: List[VirtualNode] = [
+        VirtualNode(node_id=i, cpu_demand=cpu, domains=order[:k])
+        for i, (cpu, k, order) in enumerate(zip(cpu_demands, num_candidates, domain_orders))
+    ]
 
     # ---- Create virtual links ----
-    vlinks: List[VirtualLink] = []
-    for i in range(num_nodes):
-        for j in range(i + 1, num_nodes):
-            if random.random() <= link_connection_rate / 100.0:
-                link = VirtualLink(
-                    src=vnodes[i],
-                    dst=vnodes[j],
-                    bandwidth=random.uniform(*bandwidth_range)
-                )
-                vlinks.append(link)
+    src, dst = erdos_renyi_edges(num_nodes, link_connection_rate / 100.0, rng)
+    bandwidths = rng.uniform(*bandwidth_range, size=len(src)).tolist()
+    vlinks: List[VirtualLink] = [
+        VirtualLink(src=vnodes[i], dst=vnodes[j], bandwidth=bw)
+        for i, j, bw in zip(src.tolist(), dst.tolist(), bandwidths)
+    ]
 
     # ---- Create virtual network ----
     vnetwork = VirtualNetwork(nodes=vnodes, links=vlinks)
@@ -0,0 +1,90 @@
+"""
+Trace dạng JSONL để đọc request theo kiểu streaming.
+
+Dòng 1:      {"substrate_network": {...}}            (schema như dataset_to_json)
+Các dòng sau: một virtual request mỗi dòng            {"vnetwork", "arrival_time", "lifetime"},
+             sắp xếp tăng dần theo arrival_time.
+
+Substrate được load một lần, request được đọc và dựng lazy qua generator nên
+bộ nhớ không phụ thuộc số request trong trace.
+
+Chuyển đổi:
+    json_to_jsonl("datasets/small_1.json", "datasets/small_1.jsonl")
+"""
+import json
+import time
+from typing import Any, Dict, Iterator
+
+from src.types.request import VirtualRequest
+from src.types.substrate import SubstrateNetwork
+from src.utils.load_dataset_from_json import (
+    orjson,
+    parse_json_file,
+    substrate_network_from_dict,
+    virtual_request_from_dict
+)
+
+_loads = orjson.loads if orjson is not None else json.loads
+
+
+def _dumps(obj: Any) -> bytes:
+    if orjson is not None:
+        return orjson.dumps(obj)
+    return json.dumps(obj, separators=(",", ":")).encode()
+
+
+def json_to_jsonl(json_file: str, jsonl_file: str) -> int:
+    """
+    Chuyển dataset JSON sang trace JSONL trong một lượt: request được sắp xếp
+    (ổn định) theo arrival_time rồi ghi mỗi request một dòng. Trả về số request.
+    """
+    data = parse_json_file(json_file)
+    requests = sorted(data["virtual_requests"], key=lambda req: req["arrival_time"])
+    with open(jsonl_file, "wb") as f:
+        f.write(_dumps({"substrate_network": data["substrate_network"]}) + b"\n")
+        for req in requests:
+            f.write(_dumps(req) + b"\n")
+    print(f"JSONL trace saved to {jsonl_file}")
+    return len(requests)
+
+
+def load_substrate_from_jsonl(jsonl_file: str) -> SubstrateNetwork:
+    """Dựng SubstrateNetwork từ dòng đầu tiên của trace."""
+    with open(jsonl_file, "rb") as f:
+        header = _loads(f.readline())
+    return substrate_network_from_dict(header["substrate_network"])
+
+
+def iter_request_dicts_from_jsonl(jsonl_file: str) -> Iterator[Dict[str, Any]]:
+    """Duyệt các request của trace theo schema JSON (chưa dựng object)."""
+    with open(jsonl_file, "rb") as f:
+        f.readline()  # substrate
+        for line in f:
+            if line.strip():
+                yield _loads(line)
+
+
+def iter_requests_from_jsonl(jsonl_file: str) -> Iterator[VirtualRequest]:
+    """Generator các VirtualRequest theo thứ tự arrival, mỗi lần đọc một dòng."""
+    for raw in iter_request_dicts_from_jsonl(jsonl_file):
+        yield virtual_request_from_dict(raw)
+
+
+def load_jsonl_trace(jsonl_file: str) -> Dict[str, Any]:
+    """
+    Load substrate của trace, request trả về dưới dạng generator (chỉ duyệt được một lần).
+
+    Returns:
+        {
+            "substrate_network": SubstrateNetwork,
+            "virtual_requests": Iterator[VirtualRequest],
+            "load_time": float  # thời gian load substrate
+        }
+    """
+    t0 = time.perf_counter()
+    substrate_network = load_substrate_from_jsonl(jsonl_file)
+    return {
+        "substrate_network": substrate_network,
+        "virtual_requests": iter_requests_from_jsonl(jsonl_file),
+        "load_time": time.perf_counter() - t0
+    }
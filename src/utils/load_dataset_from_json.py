@@ -1,4 +1,6 @@
+import gc
 import json
+import time
 from typing import Dict, Any, List
 from src.types.substrate import (
     SubstrateNetwork,
@@ -13,23 +15,26 @@ from src.types.virtual import (
     VirtualLink
 )
 
-def load_dataset_from_json(filename: str) -> Dict[str, Any]:
-    """
-    Load dataset from JSON file and reconstruct SubstrateNetwork and VirtualNetwork objects.
-    Includes boundary_nodes for each SubstrateDomain.
+try:
+    import orjson  # parser nhanh hơn, tuỳ chọn
+except ImportError:
+    orjson = None
 
-    Returns:
-        {
-            "substrate_network": SubstrateNetwork,
-            "virtual_requests": List[dict]  # each with keys "vnetwork", "arrival_time", "lifetime"
-        }
-    """
+
+def parse_json_file(filename: str) -> Any:
+    """Đọc file JSON, dùng orjson nếu có cài đặt, ngược lại dùng json chuẩn."""
+    if orjson is not None:
+        with open(filename, "rb") as f:
+            return orjson.loads(f.read())
     with open(filename, "r") as f:
-        data = json.load(f)
+        return json.load(f)
 
-    # ---- Reconstruct SubstrateNetwork ----
-    substrate_data = data["substrate_network"]
+
+def substrate_network_from_dict(substrate_data: Dict[str, Any]) -> SubstrateNetwork:
+    """Dựng SubstrateNetwork từ phần "substrate_network" của JSON. Tra endpoint bằng map id -> node."""
     substrate_network = SubstrateNetwork()
+    domains: Dict[int, SubstrateDomain] = {}
+    node_maps: Dict[int, Dict[int, SubstrateNode]] = {}
 
     # Domains
     for d in substrate_data["domains"]:
@@ -41,7 +46,8 @@ def load_dataset_from_json(filename: str) -> Dict[str, Any]:
                 node_id=n["node_id"],
                 cpu_capacity=n["cpu_capacity"],
                 cost_per_unit=n["cost_per_unit"],
-                delay=n["delay"]
+                delay=n["delay"],
+                store=substrate_network.node_store
             )
             node.available_cpu = n.get("available_cpu", node.cpu_capacity)
             domain.add_node(node)
@@ -49,14 +55,13 @@ def load_dataset_from_json(filename: str) -> Dict[str, Any]:
 
         # Links
         for l in d["links"]:
-            src_node = node_map[l["src"]]
-            dst_node = node_map[l["dst"]]
             link = SubstrateLink(
-                src=src_node,
-                dst=dst_node,
+                src=node_map[l["src"]],
+                dst=node_map[l["dst"]],
                 bandwidth=l["bandwidth"],
                 cost_per_unit=l["cost_per_unit"],
-                delay=l["delay"]
+                delay=l["delay"],
+                store=substrate_network.link_store
             )
             link.available_bw = l.get("available_bw", link.bandwidth)
             domain.add_link(link)
@@ -66,43 +71,68 @@ def load_dataset_from_json(filename: str) -> Dict[str, Any]:
         domain.boundary_nodes = [node_map[nid] for nid in boundary_ids]
 
         substrate_network.add_domain(domain)
+        domains[domain.domain_id] = domain
+        node_maps[domain.domain_id] = node_map
 
     # Inter-domain links
     for l in substrate_data.get("inter_domain_links", []):
-        src_domain = substrate_network.domains[l["src_domain"]]
-        dst_domain = substrate_network.domains[l["dst_domain"]]
-        src_node = next(node for node in src_domain.nodes if node.node_id == l["src"])
-        dst_node = next(node for node in dst_domain.nodes if node.node_id == l["dst"])
         inter_link = InterLink(
-            src_domain=src_domain,
-            dst_domain=dst_domain,
-            src=src_node,
-            dst=dst_node,
+            src_domain=domains[l["src_domain"]],
+            dst_domain=domains[l["dst_domain"]],
+            src=node_maps[l["src_domain"]][l["src"]],
+            dst=node_maps[l["dst_domain"]][l["dst"]],
             bandwidth=l["bandwidth"],
             cost_per_unit=l["cost_per_unit"],
-            delay=l["delay"]
+            delay=l["delay"],
+            store=substrate_network.link_store
         )
         inter_link.available_bw = l.get("available_bw", inter_link.bandwidth)
         substrate_network.add_link(inter_link)
 
-    # ---- Reconstruct Virtual Requests ----
-    virtual_requests: List[Dict[str, Any]] = []
-    for req in data["virtual_requests"]:
-        vnodes = [VirtualNode(n["id"], n["cpu_demand"], n.get("domains", [])) for n in req["vnetwork"]["nodes"]]
-        vlinks = []
-        for l in req["vnetwork"]["links"]:
-            src_node = next(n for n in vnodes if n.id == l["src"])
-            dst_node = next(n for n in vnodes if n.id == l["dst"])
-            vlink = VirtualLink(src_node, dst_node, l["bandwidth"])
-            vlinks.append(vlink)
-        vnetwork = VirtualNetwork(nodes=vnodes, links=vlinks)
-        virtual_requests.append({
-            "vnetwork": vnetwork,
-            "arrival_time": req["arrival_time"],
-            "lifetime": req["lifetime"]
-        })
+    return substrate_network
+
+
+def virtual_request_from_dict(req: Dict[str, Any]) -> Dict[str, Any]:
+    """Dựng một virtual request {"vnetwork", "arrival_time", "lifetime"} từ JSON."""
+    vnode_map = {n["id"]: VirtualNode(n["id"], n["cpu_demand"], n.get("domains", [])) for n in req["vnetwork"]["nodes"]}
+    vlinks = [VirtualLink(vnode_map[l["src"]], vnode_map[l["dst"]], l["bandwidth"]) for l in req["vnetwork"]["links"]]
+    return {
+        "vnetwork": VirtualNetwork(nodes=list(vnode_map.values()), links=vlinks),
+        "arrival_time": req["arrival_time"],
+        "lifetime": req["lifetime"]
+    }
+
+
+def load_dataset_from_json(filename: str) -> Dict[str, Any]:
+    """
+    Load dataset from JSON file and reconstruct SubstrateNetwork and VirtualNetwork objects.
+    Includes boundary_nodes for each SubstrateDomain.
+
+    Returns:
+        {
+            "substrate_network": SubstrateNetwork,
+            "virtual_requests": List[dict],  # each with keys "vnetwork", "arrival_time", "lifetime"
+            "load_time": float               # seconds spent parsing + building objects
+        }
+    """
+    t0 = time.perf_counter()
+    # Tạo hàng triệu object không có rác vòng -> tắt cyclic GC trong lúc load (nhanh ~3 lần)
+    gc_was_enabled = gc.isenabled()
+    gc.disable()
+    try:
+        data = parse_json_file(filename)
+
+        # ---- Reconstruct SubstrateNetwork ----
+        substrate_network = substrate_network_from_dict(data["substrate_network"])
+
+        # ---- Reconstruct Virtual Requests ----
+        virtual_requests: List[Dict[str, Any]] = [virtual_request_from_dict(req) for req in data["virtual_requests"]]
+    finally:
+        if gc_was_enabled:
+            gc.enable()
 
     return {
         "substrate_network": substrate_network,
-        "virtual_requests": virtual_requests
+        "virtual_requests": virtual_requests,
+        "load_time": time.perf_counter() - t0
     }
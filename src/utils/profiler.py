@@ -0,0 +1,95 @@
+import time
+from typing import Any, Dict
+
+
+class _Phase:
+    """Context manager đo một lần chạy của phase bằng perf_counter_ns."""
+    __slots__ = ("_profiler", "_name", "_start")
+
+    def __init__(self, profiler: "Profiler", name: str):
+        self._profiler = profiler
+        self._name = name
+
+    def __enter__(self):
+        self._start = time.perf_counter_ns()
+        return self
+
+    def __exit__(self, *exc):
+        self._profiler.add_time(self._name, time.perf_counter_ns() - self._start)
+        return False
+
+
+class Profiler:
+    """
+    Timer và counter theo phase cho hot path của thuật toán.
+
+        with profiler.phase("pso"):
+            ...
+        profiler.count("dijkstra_heap_pops", pops)
+
+    Thời gian của phase là inclusive (phase lồng nhau được tính trong cả phase cha).
+    Dùng NULL_PROFILER (mặc định của các thuật toán) để tắt: mọi lời gọi là no-op.
+    """
+    enabled = True
+
+    def __init__(self):
+        self.phase_ns: Dict[str, int] = {}
+        self.phase_calls: Dict[str, int] = {}
+        self.counters: Dict[str, int] = {}
+
+    def phase(self, name: str) -> _Phase:
+        return _Phase(self, name)
+
+    def add_time(self, name: str, elapsed_ns: int) -> None:
+        self.phase_ns[name] = self.phase_ns.get(name, 0) + elapsed_ns
+        self.phase_calls[name] = self.phase_calls.get(name, 0) + 1
+
+    def count(self, name: str, n: int = 1) -> None:
+        self.counters[name] = self.counters.get(name, 0) + n
+
+    def reset(self) -> None:
+        self.phase_ns.clear()
+        self.phase_calls.clear()
+        self.counters.clear()
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Dạng JSON-serializable: {"phases": {name: {"calls", "total_ms", "mean_us"}}, "counters": {...}}."""
+        phases = {
+            name: {
+                "calls": self.phase_calls[name],
+                "total_ms": total_ns / 1e6,
+                "mean_us": total_ns / 1e3 / self.phase_calls[name],
+            }
+            for name, total_ns in self.phase_ns.items()
+        }
+        return {"phases": phases, "counters": dict(self.counters)}
+
+
+class _NullPhase:
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+_NULL_PHASE = _NullPhase()
+
+
+class NullProfiler(Profiler):
+    """Profiler bị tắt: không đo, không đếm."""
+    enabled = False
+
+    def phase(self, name: str) -> _NullPhase:
+        return _NULL_PHASE
+
+    def add_time(self, name: str, elapsed_ns: int) -> None:
+        pass
+
+    def count(self, name: str, n: int = 1) -> None:
+        pass
+
+
+NULL_PROFILER = NullProfiler()
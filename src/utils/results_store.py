@@ -0,0 +1,125 @@
+"""
+Kho kết quả append-only dạng JSONL: mỗi dòng là kết quả của một request với một thuật toán.
+
+    {"run_id", "dataset", "algorithm", "seq", "arrival_time", "accepted", "time", "cost"}
+
+seq là thứ tự của request trong trace (theo arrival_time). Record được ghi ngay khi
+request được map xong nên một sweep bị ngắt vẫn giữ lại phần đã chạy, và không có lần
+ghi nào phải đọc / ghi lại lịch sử cũ. Đọc bằng iter_records (streaming, lọc theo
+run_id / dataset / algorithm) trên một file hoặc cả cây thư mục *.jsonl
+(runner ghi mỗi run_id vào một thư mục con).
+
+    with ResultsStore(path, run_id="sweep-1", dataset="small_1") as store:
+        simulator = Simulator(algorithms, on_result=store.on_result)
+        simulator.run(requests)
+"""
+import json
+import os
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Union
+
+from src.types.request import VirtualRequest
+from src.utils.load_dataset_from_json import orjson
+
+_loads = orjson.loads if orjson is not None else json.loads
+
+# Số record gom lại trước mỗi lần write(); flush khi close
+WRITE_BATCH = 256
+
+
+def _dumps(obj: Any) -> bytes:
+    if orjson is not None:
+        return orjson.dumps(obj)
+    return json.dumps(obj, separators=(",", ":")).encode()
+
+
+class ResultsStore:
+    """
+    Ghi record kết quả vào một file JSONL (mở ở chế độ append).
+
+    on_result có đúng chữ ký callback của Simulator nên truyền thẳng vào Simulator(on_result=...).
+    truncate=True: xoá nội dung cũ của file (dùng khi chạy lại một task từ đầu).
+    """
+
+    def __init__(self, path: str, run_id: str, dataset: str, truncate: bool = False):
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self.path = path
+        self.run_id = run_id
+        self.dataset = dataset
+        self._file = open(path, "wb" if truncate else "ab")
+        self._buffer: List[bytes] = []
+        self._seq: Dict[str, int] = {}
+
+    def on_result(self, algorithm: str, req: VirtualRequest, accepted: bool, elapsed: float,
+                  cost: Optional[float]) -> None:
+        seq = self._seq.get(algorithm, 0)
+        self._seq[algorithm] = seq + 1
+        self.append({
+            "run_id": self.run_id,
+            "dataset": self.dataset,
+            "algorithm": algorithm,
+            "seq": seq,
+            "arrival_time": float(req["arrival_time"]),
+            "accepted": accepted,
+            "time": elapsed,
+            "cost": None if cost is None else float(cost),
+        })
+
+    def append(self, record: Dict[str, Any]) -> None:
+        self._buffer.append(_dumps(record) + b"\n")
+        if len(self._buffer) >= WRITE_BATCH:
+            self.flush()
+
+    def flush(self) -> None:
+        if self._buffer:
+            self._file.write(b"".join(self._buffer))
+            self._buffer.clear()
+        self._file.flush()
+
+    def close(self) -> None:
+        if not self._file.closed:
+            self.flush()
+            self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+        return False
+
+
+def record_files(path: str) -> List[str]:
+    """Một file JSONL, hoặc mọi file *.jsonl trong cây thư mục (sắp xếp theo đường dẫn)."""
+    if os.path.isdir(path):
+        return sorted(
+            os.path.join(root, name)
+            for root, _, names in os.walk(path) for name in names if name.endswith(".jsonl")
+        )
+    return [path]
+
+
+def iter_records(
+    paths: Union[str, Iterable[str]],
+    run_id: Optional[str] = None,
+    dataset: Optional[str] = None,
+    algorithm: Optional[str] = None,
+) -> Iterator[Dict[str, Any]]:
+    """
+    Duyệt record theo từng dòng (bộ nhớ không phụ thuộc kích thước kho), giữ những
+    record khớp mọi bộ lọc khác None. Dòng cuối bị cắt dở (process chết giữa lúc ghi) được bỏ qua.
+    """
+    if isinstance(paths, str):
+        paths = [paths]
+    filters = [(key, value) for key, value in (("run_id", run_id), ("dataset", dataset), ("algorithm", algorithm))
+               if value is not None]
+    for path in paths:
+        for file_path in record_files(path):
+            with open(file_path, "rb") as f:
+                for line in f:
+                    if not line.endswith(b"\n"):
+                        break
+                    if not line.strip():
+                        continue
+                    record = _loads(line)
+                    if all(record[key] == value for key, value in filters):
+                        yield record
@@ -0,0 +1,114 @@
+"""
+Sinh cạnh cho đồ thị ngẫu nhiên thưa bằng NumPy, tránh duyệt O(n^2) cặp node bằng Python.
+
+Mỗi hàm trả về (src, dst): hai mảng int64 chỉ số node (0..n-1), src < dst, không trùng cạnh.
+"""
+from typing import Tuple
+
+import numpy as np
+
+Edges = Tuple[np.ndarray, np.ndarray]
+
+# Dưới số cặp này, tung xác suất cho mọi cặp (một lần gọi rng) rẻ hơn geometric skipping
+DENSE_PAIR_LIMIT = 4096
+
+
+def _empty_edges() -> Edges:
+    return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.int64)
+
+
+def pair_index_to_edges(k: np.ndarray, n: int) -> Edges:
+    """Chỉ số tuyến tính k của tam giác trên (theo hàng, i < j) -> (i, j)."""
+    k = np.asarray(k, dtype=np.int64)
+    num_pairs = n * (n - 1) // 2
+    i = n - 2 - np.floor(np.sqrt(-8.0 * k + 4.0 * n * (n - 1) - 7) / 2.0 - 0.5).astype(np.int64)
+    # Sửa sai số làm tròn của sqrt khi n lớn: row_start(i) <= k < row_start(i + 1)
+    row_start = lambda r: num_pairs - (n - r) * (n - r - 1) // 2
+    i = np.where(row_start(i) > k, i - 1, i)
+    i = np.where(row_start(i + 1) <= k, i + 1, i)
+    j = k - row_start(i) + i + 1
+    return i, j
+
+
+def erdos_renyi_edges(n: int, p: float, rng: np.random.Generator) -> Edges:
+    """
+    G(n, p) bằng geometric skipping (Batagelj & Brandes): khoảng cách giữa hai cặp được
+    chọn liên tiếp có phân phối hình học, nên chi phí O(n + số cạnh) thay vì O(n^2).
+    """
+    num_pairs = n * (n - 1) // 2
+    if num_pairs == 0 or p <= 0:
+        return _empty_edges()
+    if p >= 1:
+        return pair_index_to_edges(np.arange(num_pairs), n)
+    if num_pairs <= DENSE_PAIR_LIMIT:
+        src, dst = np.triu_indices(n, k=1)
+        keep = rng.random(num_pairs) <= p
+        return src[keep], dst[keep]
+
+    expected = num_pairs * p
+    batch = int(expected + 5 * np.sqrt(expected) + 16)
+    positions = []
+    last = -1
+    while last < num_pairs:
+        chunk = last + np.cumsum(rng.geometric(p, size=batch))
+        positions.append(chunk)
+        last = int(chunk[-1])
+    k = np.concatenate(positions)
+    k = k[k < num_pairs]
+    return pair_index_to_edges(k, n)
+
+
+def waxman_edges(n: int, alpha: float, beta: float, rng: np.random.Generator, positions: np.ndarray = None) -> Edges:
+    """
+    Waxman: node rải đều trong hình vuông đơn vị, cặp (u, v) nối với xác suất
+    alpha * exp(-d(u, v) / (beta * L)), L là khoảng cách lớn nhất. Vì xác suất <= alpha,
+    lấy ứng viên bằng G(n, alpha) rồi giữ lại mỗi ứng viên với xác suất exp(-d / (beta * L)).
+    """
+    if positions is None:
+        positions = rng.random((n, 2))
+    src, dst = erdos_renyi_edges(n, alpha, rng)
+    if len(src) == 0:
+        return src, dst
+    dist = np.linalg.norm(positions[src] - positions[dst], axis=1)
+    max_dist = np.sqrt(2.0)
+    keep = rng.random(len(src)) < np.exp(-dist / (beta * max_dist))
+    return src[keep], dst[keep]
+
+
+def barabasi_albert_edges(n: int, m: int, rng: np.random.Generator) -> Edges:
+    """
+    Barabási–Albert: mỗi node mới nối tới m node cũ khác nhau, chọn theo bậc
+    (lấy mẫu đều trên danh sách đầu mút cạnh). Bắt đầu từ m node đầu tiên.
+    """
+    m = max(1, min(m, n - 1))
+    if n <= 1:
+        return _empty_edges()
+    num_edges = (n - m) * m
+    src = np.empty(num_edges, dtype=np.int64)
+    dst = np.empty(num_edges, dtype=np.int64)
+    # Mỗi node xuất hiện trong `ends` số lần bằng bậc của nó (m node đầu được tính một lần)
+    ends = np.empty(m + 2 * num_edges, dtype=np.int64)
+    ends[:m] = np.arange(m)
+    size = m
+    e = 0
+    for v in range(m, n):
+        targets = set()
+        while len(targets) < m:
+            picks = ends[rng.integers(0, size, size=2 * m)]
+            for t in picks.tolist():
+                targets.add(t)
+                if len(targets) == m:
+                    break
+        for t in targets:
+            src[e], dst[e] = t, v
+            e += 1
+        ends[size:size + m] = list(targets)
+        ends[size + m:size + 2 * m] = v
+        size += 2 * m
+    return src, dst
+
+
+def bipartite_edges(n_left: int, n_right: int, p: float, rng: np.random.Generator) -> Edges:
+    """Mỗi cặp (i, j), i thuộc bên trái, j thuộc bên phải, được nối với xác suất p."""
+    left, right = np.nonzero(rng.random((n_left, n_right)) <= p)
+    return left.astype(np.int64), right.astype(np.int64)
@@ -0,0 +1,161 @@
+"""
+Thống kê một lượt (streaming) theo chỉ số request, bộ nhớ không phụ thuộc số lần chạy.
+
+IndexedStats giữ cho mỗi chỉ số i (vd: request thứ i của trace):
+  - count / mean / M2 theo Welford, cập nhật theo lô bằng công thức gộp của Chan
+    (lô có thể chứa nhiều giá trị cùng chỉ số) -> mean, variance, khoảng tin cậy;
+  - chỉ khi quantiles=True: histogram bucket log (kiểu DDSketch) lưu thưa, mỗi chỉ số một
+    dict bucket -> count gồm các bucket khác 0 -> quantile với sai số tương đối <= relative_accuracy.
+
+Giá trị NaN bị bỏ qua. Chỉ dùng cho giá trị >= 0 (thời gian, cost, tỉ lệ).
+
+    stats = IndexedStats(quantiles=True)
+    for run in runs:
+        stats.update(np.arange(len(run)), run)
+    stats.mean, stats.confidence_interval(0.95), stats.quantile(0.9)
+"""
+from statistics import NormalDist
+from typing import Dict, List, Tuple
+
+import numpy as np
+
+# Giá trị <= MIN_VALUE rơi vào bucket 0; giá trị > MAX_VALUE bị kẹp vào bucket cuối
+MIN_VALUE = 1e-7
+MAX_VALUE = 1e7
+
+
+class IndexedStats:
+    def __init__(self, relative_accuracy: float = 0.02, capacity: int = 64, quantiles: bool = False):
+        self.relative_accuracy = relative_accuracy
+        self._log_gamma = np.log((1 + relative_accuracy) / (1 - relative_accuracy))
+        self.num_buckets = int(np.ceil(np.log(MAX_VALUE / MIN_VALUE) / self._log_gamma)) + 2
+        self.quantiles = quantiles
+        self.size = 0  # chỉ số lớn nhất đã gặp + 1
+        self._count = np.zeros(capacity, dtype=np.int64)
+        self._mean = np.zeros(capacity)
+        self._m2 = np.zeros(capacity)
+        # Sketch thưa theo chỉ số (chỉ khi quantiles=True): _sketch[i] = {bucket: count}
+        self._sketch: List[Dict[int, int]] = []
+
+    # ---------------- Cập nhật ----------------
+    def _grow(self, size: int) -> None:
+        capacity = len(self._count)
+        if size <= capacity:
+            return
+        while capacity < size:
+            capacity *= 2
+        extra = capacity - len(self._count)
+        self._count = np.concatenate([self._count, np.zeros(extra, dtype=np.int64)])
+        self._mean = np.concatenate([self._mean, np.zeros(extra)])
+        self._m2 = np.concatenate([self._m2, np.zeros(extra)])
+
+    def _bucket(self, values: np.ndarray) -> np.ndarray:
+        clipped = np.clip(values, MIN_VALUE, MAX_VALUE)
+        buckets = np.ceil(np.log(clipped / MIN_VALUE) / self._log_gamma).astype(np.int64)
+        return np.where(values <= MIN_VALUE, 0, np.maximum(buckets, 1))
+
+    def update(self, index: np.ndarray, values: np.ndarray) -> None:
+        """Thêm các cặp (index[k], values[k]); một lô có thể lặp chỉ số."""
+        index = np.asarray(index, dtype=np.int64)
+        values = np.asarray(values, dtype=np.float64)
+        keep = ~np.isnan(values)
+        index, values = index[keep], values[keep]
+        if len(index) == 0:
+            return
+        size = max(self.size, int(index.max()) + 1)
+        self._grow(size)
+        self.size = size
+
+        # Thống kê của lô theo chỉ số (hai lượt trong lô cho M2 ổn định số học)
+        n_b = np.bincount(index, minlength=size)
+        seen = n_b > 0
+        mean_b = np.zeros(size)
+        mean_b[seen] = np.bincount(index, weights=values, minlength=size)[seen] / n_b[seen]
+        m2_b = np.bincount(index, weights=(values - mean_b[index]) ** 2, minlength=size)
+
+        # Gộp với trạng thái hiện có (Chan et al.)
+        n_a = self._count[:size]
+        mean_a = self._mean[:size]
+        n = n_a + n_b
+        delta = mean_b - mean_a
+        ratio = n_b / np.maximum(n, 1)
+        self._mean[:size] = mean_a + delta * ratio
+        self._m2[:size] += m2_b + delta ** 2 * n_a * ratio
+        self._count[:size] = n
+
+        if self.quantiles:
+            self._sketch.extend({} for _ in range(size - len(self._sketch)))
+            keys, counts = np.unique(index * self.num_buckets + self._bucket(values), return_counts=True)
+            for key, c in zip(keys.tolist(), counts.tolist()):
+                i, bucket = divmod(key, self.num_buckets)
+                sketch = self._sketch[i]
+                sketch[bucket] = sketch.get(bucket, 0) + c
+
+    def merge(self, other: "IndexedStats") -> None:
+        """Gộp trạng thái của other (cùng relative_accuracy) vào self."""
+        if other.num_buckets != self.num_buckets:
+            raise ValueError("Cannot merge IndexedStats with different relative_accuracy")
+        if other.quantiles != self.quantiles:
+            raise ValueError("Cannot merge IndexedStats with and without quantiles")
+        size = max(self.size, other.size)
+        self._grow(size)
+        k = other.size
+        n_a, n_b = self._count[:k], other._count[:k]
+        n = n_a + n_b
+        delta = other._mean[:k] - self._mean[:k]
+        ratio = n_b / np.maximum(n, 1)
+        self._mean[:k] += delta * ratio
+        self._m2[:k] += other._m2[:k] + delta ** 2 * n_a * ratio
+        self._count[:k] = n
+        if self.quantiles:
+            self._sketch.extend({} for _ in range(size - len(self._sketch)))
+            for sketch, other_sketch in zip(self._sketch, other._sketch):
+                for bucket, c in other_sketch.items():
+                    sketch[bucket] = sketch.get(bucket, 0) + c
+        self.size = size
+
+    # ---------------- Kết quả (mảng độ dài size) ----------------
+    @property
+    def count(self) -> np.ndarray:
+        return self._count[:self.size].copy()
+
+    @property
+    def mean(self) -> np.ndarray:
+        return np.where(self.count > 0, self._mean[:self.size], np.nan)
+
+    @property
+    def variance(self) -> np.ndarray:
+        """Phương sai mẫu (chia n - 1); NaN khi count < 2."""
+        count = self.count
+        with np.errstate(invalid="ignore", divide="ignore"):
+            return np.where(count > 1, self._m2[:self.size] / (count - 1), np.nan)
+
+    @property
+    def std(self) -> np.ndarray:
+        return np.sqrt(self.variance)
+
+    def confidence_interval(self, level: float = 0.95) -> Tuple[np.ndarray, np.ndarray]:
+        """Khoảng tin cậy của mean theo xấp xỉ chuẩn: mean +- z * std / sqrt(n)."""
+        z = NormalDist().inv_cdf(0.5 + level / 2)
+        half = z * self.std / np.sqrt(np.maximum(self.count, 1))
+        return self.mean - half, self.mean + half
+
+    def quantile(self, q: float) -> np.ndarray:
+        """Quantile q (0..1) theo từng chỉ số, sai số tương đối <= relative_accuracy; NaN nếu chưa có dữ liệu."""
+        if not self.quantiles:
+            raise ValueError("IndexedStats was created without quantiles=True")
+        count = self.count
+        target = np.maximum(np.ceil(q * count), 1)
+        bucket = np.zeros(self.size, dtype=np.int64)
+        for i, sketch in enumerate(self._sketch[:self.size]):
+            seen = 0
+            for b in sorted(sketch):
+                seen += sketch[b]
+                if seen >= target[i]:
+                    bucket[i] = b
+                    break
+        # Đại diện của bucket b >= 1 (khoảng (MIN * gamma^(b-1), MIN * gamma^b]) là điểm giữa theo sai số tương đối
+        gamma = np.exp(self._log_gamma)
+        value = MIN_VALUE * np.exp(self._log_gamma * bucket) * 2 / (1 + gamma)
+        value = np.where(bucket == 0, 0.0, value)
+        return np.where(count > 0, value, np.nan)